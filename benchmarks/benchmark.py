@@ -0,0 +1,481 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter, time
+from typing import Any, Callable
+
+# Allow running as a script from the repository
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from simple_status_server._version import __version__
+from simple_status_server.database import Database
+from simple_status_server.database_indexed import IndexedDatabase
+from simple_status_server.database_log import LogDatabase
+from simple_status_server.database_sqlite import SQLiteDatabase
+from simple_status_server.server import Server
+from simple_status_server.probe import create_probes
+from simple_status_server.status import Status
+
+SIZES_DEFAULT = [10, 100, 1000, 10000]
+
+DATABASES = {"json": Database, "indexed": IndexedDatabase, "log": LogDatabase, "sqlite": SQLiteDatabase}
+
+# Check types of synthetic statuses
+TYPES = ["constant", "service", "command", "path", "url", "tcp", "dns"]
+
+# Emulates "systemctl show --property=ActiveState -- units" and "systemctl is-active --quiet unit"
+FAKE_SYSTEMCTL = """#!/bin/sh
+if [ "$1" = "show" ]; then
+    shift 3
+    first=1
+    for unit in "$@"; do
+        [ $first = 1 ] || echo
+        first=0
+        echo "ActiveState=active"
+    done
+    exit 0
+fi
+exit 0
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b"OK"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile
+    >>> percentile([4, 1, 3, 2], 50)
+    2
+    >>> percentile([4, 1, 3, 2], 99)
+    4
+    >>> percentile([], 50)
+    0.0
+
+    Args:
+        values (list[float]): measured values
+        q (float): percentile (0-100)
+
+    Returns:
+        float: percentile of values or 0 if there are no values
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = max(min(int(len(values) * q / 100.0 + 0.999999) - 1, len(values) - 1), 0)
+    return values[index]
+
+
+def summarize(latencies: list[float], seconds: float | None = None) -> dict[str, Any]:
+    """
+    Args:
+        latencies (list[float]): duration of each operation in seconds
+        seconds (float | None, optional): total wall time (for concurrent operations). Defaults to sum of latencies
+
+    Returns:
+        dict[str, Any]: number of operations, total time, throughput (per second), p50 and p99 latency (in ms)
+    """
+    if seconds is None:
+        seconds = sum(latencies)
+    return {
+        "operations": len(latencies),
+        "seconds": round(seconds, 6),
+        "throughput": round(len(latencies) / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+    }
+
+
+def create_statuses(size: int, targets: dict[str, str], bars_max: int) -> list[Status]:
+    """Creates size statuses (evenly distributed across all types) with full history of completed bars
+
+    Args:
+        size (int): total number of statuses
+        targets (dict[str, str]): target of each type
+        bars_max (int): number of bars of each status
+
+    Returns:
+        list[Status]: synthetic statuses
+    """
+    time_start = int(time()) - bars_max * 60
+    statuses = []
+    for i in range(size):
+        type_ = TYPES[i % len(TYPES)]
+        status = Status(
+            f"{type_}-{i}",
+            {
+                "type": type_,
+                "target": True if type_ == "constant" else targets[type_],
+                "target_timeout": "5s",
+                "checks_per_bar": 12,
+                "bars_max": bars_max,
+            },
+        )
+        status.timestamps = [(time_start + j * 60, time_start + j * 60 + 55) for j in range(bars_max)]
+        status.data = [(i + j) % 101 for j in range(bars_max)]
+        status.latency = [(1000, 2000, 3000)] * bars_max
+        statuses.append(status)
+    return statuses
+
+
+def bench_checks(statuses: list[Status], checks_max: int, workdir: str) -> dict[str, Any]:
+    """Checks up to checks_max statuses of each type using the same probes as scheduler
+
+    Args:
+        statuses (list[Status]): statuses to check
+        checks_max (int): maximum number of checked statuses of each type
+        workdir (str): directory with fake systemctl
+
+    Returns:
+        dict[str, Any]: summary of each type
+    """
+
+    async def _run() -> dict[str, Any]:
+        probes = create_probes(
+            statuses, {"service": {"systemctl_path": os.path.join(workdir, "systemctl")}}, lambda status: None
+        )
+        semaphore = asyncio.Semaphore(64)
+
+        async def _check(status: Status, latencies: list[float]) -> None:
+            async with semaphore:
+                time_start = perf_counter()
+                if not (await probes[status.type].probe(status)).ok:
+                    raise Exception(f"Check of {status.id} failed")
+                latencies.append(perf_counter() - time_start)
+
+        results = {}
+        try:
+            for type_, probe in probes.items():
+                checked = [status for status in statuses if status.type == type_][:checks_max]
+                await probe.start(checked)
+                latencies: list[float] = []
+                time_start = perf_counter()
+                await asyncio.gather(*[_check(status, latencies) for status in checked])
+                results[type_] = summarize(latencies, perf_counter() - time_start)
+        finally:
+            for probe in probes.values():
+                await probe.close()
+        return results
+
+    return asyncio.run(_run())
+
+
+def bench_push(statuses: list[Status], pushes: int) -> dict[str, Any]:
+    """
+    Args:
+        statuses (list[Status]): statuses to push checks into
+        pushes (int): number of checks pushed into each status
+
+    Returns:
+        dict[str, Any]: summary of push_new_status() calls
+    """
+    latencies = []
+    for i in range(pushes):
+        for status in statuses:
+            time_start = perf_counter()
+            status.push_new_status(i % 7 != 0, latency=0.001)
+            latencies.append(perf_counter() - time_start)
+    return summarize(latencies)
+
+
+def bench_database(
+    statuses_factory: Callable[[], list[Status]], backend: str, rounds: int, workdir: str
+) -> dict[str, Any]:
+    """Pushes and records one check into each status and saves database (rounds times), then loads it
+
+    Args:
+        statuses_factory (Callable[[], list[Status]]): creates fresh statuses
+        backend (str): one of DATABASES
+        rounds (int): number of saves and loads
+        workdir (str): directory for database files
+
+    Returns:
+        dict[str, Any]: summary of save() and load() calls
+    """
+    database_path = os.path.join(workdir, f"database-{backend}")
+    database_class = DATABASES[backend]
+
+    statuses = statuses_factory()
+    database = database_class(statuses, database_path)
+    database.load()
+    save_latencies = []
+    for _ in range(rounds):
+        for status in statuses:
+            status.push_new_status(True, latency=0.001)
+            database.record(status)
+        time_start = perf_counter()
+        database.save()
+        save_latencies.append(perf_counter() - time_start)
+    database.close()
+    size = sum(
+        os.path.getsize(os.path.join(workdir, file))
+        for file in os.listdir(workdir)
+        if file.startswith(f"database-{backend}")
+    )
+
+    load_latencies = []
+    for _ in range(rounds):
+        database = database_class(statuses_factory(), database_path)
+        time_start = perf_counter()
+        database.load()
+        load_latencies.append(perf_counter() - time_start)
+        database.close()
+
+    return {"save": summarize(save_latencies), "load": summarize(load_latencies), "bytes": size}
+
+
+def bench_api(statuses: list[Status], requests: int) -> dict[str, Any]:
+    """Requests data using Flask test client
+
+    Args:
+        statuses (list[Status]): statuses to serve
+        requests (int): number of requests of each kind
+
+    Returns:
+        dict[str, Any]: summary of cached, uncached (data changed before each request) and delta requests
+    """
+    api_data = {status.id: status.get_data_dict() for status in statuses}
+    server = Server([], None, "Benchmark", None, "Last check:", "turbo", None, api_data)
+    client = server._app.test_client()
+    since = int(time()) - 120
+
+    def _request(json_: dict[str, Any] | None, invalidate: bool) -> float:
+        if invalidate:
+            server.data_updated()
+        time_start = perf_counter()
+        response = client.post("/", json=json_, headers={"Accept-Encoding": "gzip"})
+        latency = perf_counter() - time_start
+        if response.status_code != 200:
+            raise Exception(f"API returned {response.status_code}")
+        return latency
+
+    return {
+        "cached": summarize([_request(None, False) for _ in range(requests)]),
+        "uncached": summarize([_request(None, True) for _ in range(requests)]),
+        "delta": summarize([_request({"since": since}, False) for _ in range(requests)]),
+    }
+
+
+def run_size(args: argparse.Namespace) -> dict[str, Any]:
+    """Runs all benchmarks for args.size statuses (called in a separate process, so peak RSS is per size)
+
+    Args:
+        args (argparse.Namespace): parsed arguments
+
+    Returns:
+        dict[str, Any]: results
+    """
+    workdir = tempfile.mkdtemp(prefix="simple-status-server-benchmark-")
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+    try:
+        systemctl_path = os.path.join(workdir, "systemctl")
+        with open(systemctl_path, "w", encoding="utf-8") as systemctl_io:
+            systemctl_io.write(FAKE_SYSTEMCTL)
+        os.chmod(systemctl_path, 0o755)
+        targets = {
+            "service": "benchmark.service",
+            "command": "true",
+            "path": workdir,
+            "url": f"http://127.0.0.1:{http_server.server_address[1]}/",
+            "tcp": f"127.0.0.1:{http_server.server_address[1]}",
+            "dns": "localhost",
+        }
+
+        def _statuses_factory() -> list[Status]:
+            return create_statuses(args.size, targets, args.bars_max)
+
+        results: dict[str, Any] = {"size": args.size}
+        results["checks"] = bench_checks(_statuses_factory(), args.checks_max, workdir)
+        results["push"] = bench_push(_statuses_factory(), args.pushes)
+        results["database"] = {
+            backend: bench_database(_statuses_factory, backend, args.rounds, workdir) for backend in args.databases
+        }
+        results["api"] = bench_api(_statuses_factory(), args.requests)
+        results["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return results
+
+    finally:
+        http_server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def flatten(results: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    """Flattens nested results into {"path.to.metric": value}
+    >>> flatten({"push": {"p50_ms": 1.0}, "size": 10})
+    {'push.p50_ms': 1.0, 'size': 10}
+
+    Args:
+        results (dict[str, Any]): results of single size
+        prefix (str, optional): path of results. Defaults to ""
+
+    Returns:
+        dict[str, float]: numeric metrics
+    """
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+    """Prints relative change of p50 / p99 latency, throughput and peak RSS of matching sizes
+
+    Args:
+        baseline (dict[str, Any]): previous results
+        current (dict[str, Any]): new results
+    """
+    baseline_sizes = {results["size"]: flatten(results) for results in baseline["results"]}
+    print(f"Comparing with {baseline.get('version')} ({baseline.get('timestamp')})", file=sys.stderr)
+    for results in current["results"]:
+        if results["size"] not in baseline_sizes:
+            continue
+        old = baseline_sizes[results["size"]]
+        for key, value in flatten(results).items():
+            if not key.endswith(("p50_ms", "p99_ms", "throughput", "peak_rss_kb")) or not old.get(key):
+                continue
+            change = (value - old[key]) / old[key] * 100.0
+            print(f"{results['size']:>6} {key:<40} {old[key]:>14} -> {value:<14} {change:+.1f}%", file=sys.stderr)
+
+
+def print_summary(results: dict[str, Any]) -> None:
+    """Prints human-readable p50 / p99 latency and throughput
+
+    Args:
+        results (dict[str, Any]): results of single size
+    """
+    print(f"{results['size']} statuses, peak RSS: {results['peak_rss_kb'] / 1024:.1f} MiB", file=sys.stderr)
+    flat = flatten(results)
+    for key, value in flat.items():
+        if key.endswith("p50_ms"):
+            name = key[: -len(".p50_ms")]
+            print(
+                f"    {name:<24} p50 {value:>10.4f}ms  p99 {flat[name + '.p99_ms']:>10.4f}ms  "
+                f"{flat[name + '.throughput']:>12.2f}/s",
+                file=sys.stderr,
+            )
+
+
+def parse_args() -> argparse.Namespace:
+    """Parses cli arguments
+
+    Returns:
+        argparse.Namespace: parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmarks checks, push_new_status(), database backends and API of simple-status-server"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES_DEFAULT,
+        help=f"total numbers of statuses (evenly distributed across types, default: {SIZES_DEFAULT})",
+    )
+    parser.add_argument("--bars-max", type=int, default=48, help="bars of each status (default: 48)")
+    parser.add_argument(
+        "--checks-max", type=int, default=500, help="maximum number of real checks of each type (default: 500)"
+    )
+    parser.add_argument("--pushes", type=int, default=24, help="checks pushed into each status (default: 24)")
+    parser.add_argument("--rounds", type=int, default=5, help="database saves and loads (default: 5)")
+    parser.add_argument(
+        "--databases",
+        nargs="+",
+        choices=list(DATABASES.keys()),
+        default=list(DATABASES.keys()),
+        help="database backends to benchmark (default: all)",
+    )
+    parser.add_argument("--requests", type=int, default=100, help="API requests of each kind (default: 100)")
+    parser.add_argument("-o", "--output", type=str, help="path to JSON file to write results into (default: stdout)")
+    parser.add_argument("--compare", type=str, metavar="BASELINE", help="path to previous results to compare with")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Runs each size in a separate process and writes results as JSON"""
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, format="[%(asctime)s] [%(levelname).1s] %(message)s")
+
+    # Worker process
+    if args.size is not None:
+        logging.disable(logging.CRITICAL)
+        json.dump(run_size(args), sys.stdout)
+        return
+
+    results = {
+        "version": __version__,
+        "timestamp": int(time()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "size")},
+        "results": [],
+    }
+    for size in args.sizes:
+        print(f"Running benchmarks for {size} statuses...", file=sys.stderr)
+        worker_args = [sys.executable, os.path.abspath(__file__), "--size", str(size)]
+        for key in ("bars_max", "checks_max", "pushes", "rounds", "requests"):
+            worker_args += [f"--{key.replace('_', '-')}", str(getattr(args, key))]
+        worker_args += ["--databases", *args.databases]
+        output = subprocess.run(worker_args, stdout=subprocess.PIPE, check=True).stdout
+        results["results"].append(json.loads(output))
+        print_summary(results["results"][-1])
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_io:
+            json.dump(results, output_io, indent=4)
+    else:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_io:
+            compare(json.load(baseline_io), results)
+
+
+if __name__ == "__main__":
+    main()
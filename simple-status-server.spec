@@ -47,6 +47,17 @@ ICON = None  # [os.path.join("icons", "icon.ico")]
 # INCLUDE_FILES.extend(collect_data_files("certifi"))
 HIDDEN_IMPORTS = []  # = ["certifi"]
 
+# Built-in check types are imported by name on first use (see simple_status_server/probe.py)
+HIDDEN_IMPORTS.extend(
+    [
+        "simple_status_server.command_executor",
+        "simple_status_server.net_probes",
+        "simple_status_server.path_watcher",
+        "simple_status_server.service_collector",
+        "simple_status_server.url_prober",
+    ]
+)
+
 a = Analysis(
     SOURCE_FILES,
     pathex=[],
@@ -20,9 +20,13 @@ OTHER DEALINGS IN THE SOFTWARE.
 
 import argparse
 import logging
+import signal
+import socket
 import sys
 from os import environ, path
-from typing import Any
+from threading import Event, Lock, Thread
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable
 
 from yaml import load
 
@@ -33,12 +37,29 @@ except ImportError:
 
 from simple_status_server._version import __version__
 from simple_status_server.database import Database
-from simple_status_server.server import Server
-from simple_status_server.status import Status
+from simple_status_server.event_stream import EventStream
+from simple_status_server.metrics import Metrics
+from simple_status_server.prefork import create_socket, start_supervisor, stop_workers, wait_workers
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.save_scheduler import SaveScheduler
+from simple_status_server.scheduler import CONFIG_DEFAULT as SCHEDULER_CONFIG_DEFAULT
+from simple_status_server.scheduler import Scheduler
+from simple_status_server.shared_snapshot import SnapshotPublisher, SnapshotReader, SnapshotWriter
+from simple_status_server.status import Status, link_dependencies, parse_time_cfg
+from simple_status_server.probe import ProbeThread, load_plugins
 from simple_status_server.status_worker import StatusWorker
+from simple_status_server.warm_start import get_snapshot_path, load_snapshot, save_snapshot
+
+if TYPE_CHECKING:
+    from simple_status_server.page_renderer import PageRenderer
+    from simple_status_server.static_export import StaticExporter
 
 CONFIG_PATH_DEFAULT = environ.get("CONFIG_PATH", "config.yaml")
 
+# standalone - check statuses and serve them, agent - check shard of statuses and send results to collector,
+# collector - serve statuses checked by agents
+MODES = ["standalone", "agent", "collector"]
+
 # Environment variables / default config
 CONFIG_DEFAULT = {
     "logging": {
@@ -51,6 +72,12 @@ CONFIG_DEFAULT = {
         "port": int(environ.get("PORT", 8080)),
         "api_key": environ.get("API_KEY"),
         "request_limits": ["5 per minute", "1 per second"],
+        "events_port": int(environ["EVENTS_PORT"]) if environ.get("EVENTS_PORT") else None,
+        "events": {},
+        "metrics": True,
+        "workers": int(environ.get("WORKERS", 1)),
+        "fast_start": True,
+        "enabled": True,
     },
     "page": {
         "title": "Status",
@@ -58,8 +85,17 @@ CONFIG_DEFAULT = {
         "last_check_text": "Last check:",
         "color_palette": "RdPu",
         "extra_css": None,
+        "server_rendering": False,
+        "refresh_interval": "1m",
     },
     "database_path": environ.get("DATABASE_PATH", "database.json"),
+    "database_backend": environ.get("DATABASE_BACKEND", "json"),
+    "database_options": {},
+    "scheduler": {},
+    "plugins": [],
+    "export": {},
+    "mode": environ.get("MODE", "standalone"),
+    "agent": {},
     "statuses": {},
 }
 
@@ -115,6 +151,15 @@ def _parse_args() -> argparse.Namespace:
         help=f'server\'s port (PORT env variable, default: {CONFIG_DEFAULT["server"]["port"]})',
         metavar="PORT",
     )
+    parser.add_argument(
+        "--events-port",
+        default=None,
+        type=int,
+        required=False,
+        help="port of Server-Sent Events server that pushes status updates to the page "
+        f'(EVENTS_PORT env variable, default: {CONFIG_DEFAULT["server"]["events_port"]})',
+        metavar="PORT",
+    )
     parser.add_argument(
         "--api-key",
         default=None,
@@ -133,13 +178,181 @@ def _parse_args() -> argparse.Namespace:
         f'(DATABASE_PATH env variable, default: {CONFIG_DEFAULT["database_path"]})',
         metavar="path/to/database.json",
     )
+    parser.add_argument(
+        "--mode",
+        default=None,
+        type=str,
+        required=False,
+        choices=MODES,
+        help=f'run mode (MODE env variable, default: {CONFIG_DEFAULT["mode"]})',
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        type=str,
+        required=False,
+        help="shard of statuses to check in agent mode as INDEX/COUNT, ex. 0/4 "
+        "(overrides agent.shard and agent.shards)",
+        metavar="INDEX/COUNT",
+    )
     parser.add_argument("-v", "--version", action="version", version=__version__)
 
     return parser.parse_args()
 
 
+def _sigterm_handler(signum, frame) -> None:
+    """Stops server on SIGTERM the same way as on CTRL+C"""
+    logging.warning("Received SIGTERM")
+    raise SystemExit(0)
+
+
+def _start_checks(
+    statuses: list[Status],
+    update_callback: Callable[[Status], None],
+    scheduler_config: dict[str, Any],
+    metrics: Metrics | None,
+    state_callback: Callable[[Status], None] | None = None,
+    push_callback: Callable[..., None] | None = None,
+) -> tuple[Scheduler | None, list[StatusWorker], ProbeThread | None]:
+    """Initializes and starts scheduler or workers
+
+    Args:
+        statuses (list[Status]): statuses to check
+        update_callback (Callable[[Status], None]): called after each check
+        scheduler_config (dict[str, Any]): scheduler config
+        metrics (Metrics | None): instance to record checks into
+        state_callback (Callable[[Status], None] | None, optional): called when dependency of status fails
+        or recovers. Defaults to None
+        push_callback (Callable[..., None] | None, optional): pushes check result into status
+        (see Database.push()). Defaults to None
+
+    Returns:
+        tuple[Scheduler | None, list[StatusWorker], ProbeThread | None]: scheduler (asyncio engine)
+        or workers and their probes (threads engine)
+    """
+    scheduler_engine = str(scheduler_config.get("engine", "asyncio")).lower()
+    scheduler: Scheduler | None = None
+    workers: list[StatusWorker] = []
+    probe_thread: ProbeThread | None = None
+    if scheduler_engine == "asyncio":
+        scheduler = Scheduler(statuses, update_callback, scheduler_config, metrics, state_callback, push_callback)
+    elif scheduler_engine == "threads":
+        if any(status.depends_on for status in statuses):
+            logging.warning("depends_on is supported only by asyncio engine. Statuses will be checked regardless")
+        startup_spread = parse_time_cfg(
+            scheduler_config.get("startup_spread", SCHEDULER_CONFIG_DEFAULT["startup_spread"])
+        )
+        probe_thread = ProbeThread(statuses, scheduler_config)
+        for i, status in enumerate(statuses):
+            startup_delay = min(startup_spread, status.interval) * i / len(statuses)
+            workers.append(StatusWorker(status, update_callback, probe_thread, startup_delay, push_callback))
+    else:
+        raise Exception(f"Unknown scheduler engine: {scheduler_engine}")
+
+    # Start scheduler / workers
+    if not statuses:
+        logging.warning("No statuses specified")
+    elif scheduler:
+        logging.info("Starting scheduler")
+        scheduler.start()
+    elif probe_thread:
+        logging.info("Starting workers")
+        probe_thread.start()
+        for worker in workers:
+            worker.start()
+
+    return scheduler, workers, probe_thread
+
+
+def _stop_checks(scheduler: Scheduler | None, workers: list[StatusWorker], probe_thread: ProbeThread | None) -> None:
+    """Stops scheduler or workers
+
+    Args:
+        scheduler (Scheduler | None): scheduler instance
+        workers (list[StatusWorker]): worker instances
+        probe_thread (ProbeThread | None): probes of workers
+    """
+    if scheduler:
+        logging.info("Stopping scheduler")
+        scheduler.stop()
+    elif workers:
+        logging.info("Stopping workers")
+        for worker in workers:
+            worker.stop()
+    if probe_thread:
+        probe_thread.stop()
+
+
+def _run_agent(
+    statuses: list[Status], agent_config: dict[str, Any], api_key: str | None, scheduler_config: dict[str, Any]
+) -> None:
+    """Checks shard of statuses and sends results to collector (blocking)
+
+    Args:
+        statuses (list[Status]): all configured statuses
+        agent_config (dict[str, Any]): agent config (see agent.CONFIG_DEFAULT)
+        api_key (str | None): collector's API key
+        scheduler_config (dict[str, Any]): scheduler config
+    """
+    # Imported here to not import requests in server modes
+    from simple_status_server.agent import CONFIG_DEFAULT as AGENT_CONFIG_DEFAULT
+    from simple_status_server.agent import Agent, assign_shards
+
+    shards = int(agent_config.get("shards", AGENT_CONFIG_DEFAULT["shards"]))
+    shard = int(agent_config.get("shard", AGENT_CONFIG_DEFAULT["shard"]))
+    if shards < 1 or shard < 0 or shard >= shards:
+        raise Exception(f"Wrong shard {shard} of {shards} shards specified")
+    status_shards = assign_shards(statuses, shards)
+    statuses = [status for status in statuses if status_shards[status.id] == shard]
+    logging.info(f"Agent of shard {shard}/{shards}. Statuses to check: {', '.join(status.id for status in statuses)}")
+
+    agent = Agent(agent_config, api_key)
+    agent.start()
+    scheduler, workers, probe_thread = _start_checks(statuses, agent.push, scheduler_config, None)
+    try:
+        Event().wait()
+    finally:
+        _stop_checks(scheduler, workers, probe_thread)
+
+        # Send pending checks
+        agent.stop()
+
+
+def _create_database(
+    backend: str, statuses: list[Status], database_path: str, database_options: dict[str, Any]
+) -> Database:
+    """Initializes database instance (importing only selected backend)
+
+    Args:
+        backend (str): json, indexed, log or sqlite
+        statuses (list[Status]): configured statuses
+        database_path (str): path to database file
+        database_options (dict[str, Any]): backend-specific options
+
+    Returns:
+        Database: database instance (not loaded yet)
+    """
+    if backend == "json":
+        return Database(statuses, database_path)
+    if backend == "indexed":
+        from simple_status_server.database_indexed import IndexedDatabase
+
+        return IndexedDatabase(statuses, database_path)
+    if backend == "log":
+        from simple_status_server.database_log import LogDatabase
+
+        return LogDatabase(statuses, database_path, database_options)
+    if backend == "sqlite":
+        from simple_status_server.database_sqlite import SQLiteDatabase
+
+        return SQLiteDatabase(statuses, database_path, database_options)
+    raise Exception(f"Unknown database backend: {backend}")
+
+
 def main() -> None:
     """Main entrypoint"""
+    # Reference point of startup time measurements
+    time_started = perf_counter()
 
     # Parse CLI args
     args = _parse_args()
@@ -188,72 +401,350 @@ def main() -> None:
     port: int = int(args.port if args.port is not None else _get_config(config, "server", "port"))
     api_key: str | None = args.api_key if args.api_key else _get_config(config, "server", "api_key")
     request_limits: list[str] = _get_config(config, "server", "request_limits")
+    events_port: int | None = (
+        args.events_port if args.events_port is not None else _get_config(config, "server", "events_port")
+    )
+    events_config: dict[str, Any] = _get_config(config, "server", "events")
+    metrics_enabled: bool = _get_config(config, "server", "metrics")
+    server_workers: int = int(_get_config(config, "server", "workers"))
+    fast_start: bool = _get_config(config, "server", "fast_start")
+    server_enabled: bool = _get_config(config, "server", "enabled")
     page_title: str = _get_config(config, "page", "title")
     page_description: str | None = _get_config(config, "page", "description")
     last_check_text: str = _get_config(config, "page", "last_check_text")
     color_palette: str = _get_config(config, "page", "color_palette")
     extra_css: str | None = _get_config(config, "page", "extra_css")
+    server_rendering: bool = _get_config(config, "page", "server_rendering")
+    refresh_interval: int = parse_time_cfg(_get_config(config, "page", "refresh_interval"))
     database_path: str = args.database if args.database else _get_config(config, "database_path")
-
-    # Parse statuses
+    database_backend: str = str(_get_config(config, "database_backend")).lower()
+    database_options: dict[str, Any] = _get_config(config, "database_options")
+    scheduler_config: dict[str, Any] = _get_config(config, "scheduler")
+    export_config: dict[str, Any] = _get_config(config, "export")
+    mode: str = str(args.mode if args.mode else _get_config(config, "mode")).lower()
+    if mode not in MODES:
+        raise Exception(f"Unknown mode: {mode}")
+    if server_workers > 1 and mode == "collector":
+        logging.warning("Collector receives checks in the main process. Ignoring server workers")
+        server_workers = 1
+    if not server_enabled and mode == "collector":
+        logging.warning("Collector receives checks via server. Ignoring server.enabled: false")
+        server_enabled = True
+    if not server_enabled:
+        server_workers = 1
+    agent_config: dict[str, Any] = dict(_get_config(config, "agent"))
+    if args.shard:
+        try:
+            agent_config["shard"], agent_config["shards"] = (int(part) for part in args.shard.split("/"))
+        except ValueError:
+            raise Exception(f"Wrong shard format: {args.shard}. Expected INDEX/COUNT")
+
+    # Parse statuses (types from plugins are registered on their import)
+    load_plugins(_get_config(config, "plugins"))
     statuses_dict = config.get("statuses", {})
     statuses: list[Status] = []
     for status_id, status_config in statuses_dict.items():
         statuses.append(Status(status_id, status_config))
+    link_dependencies(statuses)
+
+    signal.signal(signal.SIGTERM, _sigterm_handler)
+
+    # Agent doesn't serve anything
+    if mode == "agent":
+        _run_agent(statuses, agent_config, api_key, scheduler_config)
+        return
 
     api_data: dict[str, dict[str, Any]] = {}
+    database_loaded = Event()
 
-    def _update_data(status: Status) -> None:
-        """Updates data for server and saves database (called from workers)
+    def _refresh_data(status: Status) -> None:
+        """Updates data for server (called from workers)
 
         Args:
             status (Status): updated status
         """
         api_data[status.id] = status.get_data_dict()
         logging.debug(f"Updated API data for {status.id}: {api_data[status.id]}")
-        database.save()
+        response_cache.invalidate()
+        if static_exporter:
+            static_exporter.notify()
+        if event_stream:
+            event_stream.publish(status.id, status.get_delta_dict())
+
+    def _update_data(status: Status) -> None:
+        """Updates data for server and schedules database save (called from workers after each check)
+
+        Args:
+            status (Status): updated status
+        """
+        _refresh_data(status)
+        save_scheduler.mark_dirty(status)
+
+    statuses_by_id = {status.id: status for status in statuses}
+    ingest_lock = Lock()
+
+    def _ingest(checks: list[dict[str, Any]]) -> int:
+        """Pushes checks received from agent (collector mode)
 
-    # Initialize server, database instances and load database
+        Args:
+            checks (list[dict[str, Any]]): checks in Status.get_last_check_dict() format with "id" key
+
+        Returns:
+            int: number of accepted checks
+        """
+        # Checks can't be pushed until statuses are loaded from database
+        database_loaded.wait()
+        accepted = 0
+        with ingest_lock:
+            for check in checks:
+                status_id = check.get("id") if isinstance(check, dict) else None
+                status = statuses_by_id.get(status_id) if isinstance(status_id, str) else None
+                if status is None:
+                    continue
+                try:
+                    status_value, timestamp, latency, weight = status.parse_check_dict(check)
+                except ValueError as e:
+                    logging.warning(f"Skipping wrong check of {status.id}: {e}")
+                    continue
+                database.push(status, status_value, timestamp, latency, weight)
+                _update_data(status)
+                accepted += 1
+        return accepted
+
+    def _create_page_renderer() -> "PageRenderer":
+        """Creates renderer of status page (jinja2 is imported only if page is rendered on server)"""
+        from simple_status_server.page_renderer import PageRenderer
+
+        return PageRenderer(page_title, page_description, last_check_text, color_palette, extra_css, refresh_interval)
+
+    def _serve(
+        server_metrics: Metrics | None,
+        ingest_callback: Callable[[list[dict[str, Any]]], int] | None,
+        server_response_cache: ResponseCache | SnapshotReader,
+        server_socket: socket.socket | None = None,
+        uptime_callback: Callable[[str, int, int], tuple[int, list[tuple[int, int, int]]]] | None = None,
+    ) -> None:
+        """Initializes and starts server (blocking). Flask is imported only here, so it's not imported
+        by agents and by main process of server workers, and is imported in parallel with database loading
+
+        Args:
+            server_metrics (Metrics | None): instance to record requests into
+            ingest_callback (Callable[[list[dict[str, Any]]], int] | None): see _ingest()
+            server_response_cache (ResponseCache | SnapshotReader): serialized data to serve
+            server_socket (socket.socket | None, optional): shared listening socket. Defaults to None
+            uptime_callback (Callable[[str, int, int], tuple[int, list[tuple[int, int, int]]]] | None, optional):
+            see SQLiteDatabase.query_uptime(). Defaults to None
+        """
+        from simple_status_server.server import Server
+
+        page_renderer = _create_page_renderer() if server_rendering else None
+
+        Server(
+            request_limits,
+            api_key,
+            page_title,
+            page_description,
+            last_check_text,
+            color_palette,
+            extra_css,
+            api_data,
+            events_port,
+            server_metrics,
+            ingest_callback,
+            server_response_cache,
+            time_started,
+            page_renderer,
+            uptime_callback,
+        ).start(host, port, server_socket)
+
+    # Initialize database instance and serialized data
     if api_key:
         logging.warning("API key specified. Make sure server is accessible only via localhost or secured via SSL")
-    server = Server(
-        request_limits,
-        api_key,
-        page_title,
-        page_description,
-        last_check_text,
-        color_palette,
-        extra_css,
-        api_data,
-    )
-    database = Database(statuses, database_path)
-    database.load()
+    metrics = Metrics() if metrics_enabled else None
+    response_cache = ResponseCache(api_data)
+    event_stream = EventStream(response_cache, api_key, events_config) if events_port else None
+
+    # Fork server workers (before starting any threads and opening database). This process keeps checking
+    # statuses and publishes serialized data and metrics into shared snapshots, workers serve them.
+    # Workers are forked by supervisor process which replaces exited ones
+    snapshot_writer: SnapshotWriter | None = None
+    snapshot_publisher: SnapshotPublisher | None = None
+    metrics_writer: SnapshotWriter | None = None
+    metrics_publisher: SnapshotPublisher | None = None
+    worker_pids: list[int] = []
+    if server_workers > 1:
+        snapshot_writer = SnapshotWriter()
+        snapshot_publisher = SnapshotPublisher(response_cache, snapshot_writer)
+        snapshot_path_shared = snapshot_writer.path
+        metrics_path_shared: str | None = None
+        if metrics:
+            metrics_writer = SnapshotWriter()
+            metrics_publisher = SnapshotPublisher(metrics, metrics_writer, 1.0)
+            metrics_path_shared = metrics_writer.path
+        server_socket = create_socket(host, port)
+
+        def _serve_worker(worker_index: int) -> None:
+            """Serves data from shared snapshot (executed in server worker)
+
+            Args:
+                worker_index (int): index of worker (label of its request metrics)
+            """
+            snapshot_reader = SnapshotReader(snapshot_path_shared)
+            snapshot_reader.wait()
+
+            # Requests served by this worker and metrics of main process
+            worker_metrics = None
+            if metrics_path_shared:
+                metrics_reader = SnapshotReader(metrics_path_shared)
+                worker_metrics = Metrics(
+                    lambda: metrics_reader.get()[1].get("identity", b"").decode("utf-8"),
+                    (("worker", str(worker_index)),),
+                )
+
+            # Rollups are read using connection of this worker
+            worker_uptime_callback = None
+            if database_backend == "sqlite":
+                worker_database = _create_database(database_backend, statuses, database_path, database_options)
+                worker_uptime_callback = getattr(worker_database, "query_uptime")
+            _serve(worker_metrics, None, snapshot_reader, server_socket, worker_uptime_callback)
+
+        logging.info(f"Starting {server_workers} server workers on {host}:{port}")
+        worker_pids = [start_supervisor(server_workers, _serve_worker)]
+        server_socket.close()
+
+    database = _create_database(database_backend, statuses, database_path, database_options)
+    snapshot_path = get_snapshot_path(database_path)
+
+    # Static export of page and data (index.html is always rendered on server, because it must work without API)
+    static_exporter: "StaticExporter | None" = None
+    if export_config.get("output_dir"):
+        from simple_status_server.static_export import StaticExporter
+
+        static_exporter = StaticExporter(response_cache, _create_page_renderer(), export_config)
+    elif not server_enabled:
+        raise Exception("Server is disabled and no export.output_dir specified. Nothing would be served")
+
+    def _save_snapshot() -> None:
+        """Saves served data to be served right after the next start (called after each database save)"""
+        save_snapshot(snapshot_path, response_cache)
+
+    save_scheduler = SaveScheduler(database, database_options, metrics, _save_snapshot)
+
+    scheduler: Scheduler | None = None
+    workers: list[StatusWorker] = []
+    probe_thread: ProbeThread | None = None
+
+    def _load_database() -> None:
+        """Loads database and replaces served data with loaded one"""
+        time_start = perf_counter()
+        database.load()
+        for status in statuses:
+            api_data[status.id] = status.get_data_dict()
+        response_cache.invalidate()
+        if static_exporter:
+            static_exporter.notify()
+        database_loaded.set()
+        logging.info(f"Database loaded in {(perf_counter() - time_start) * 1000:.0f}ms")
+
+    def _start_background() -> None:
+        """Starts database saving, events server and checks (statuses are checked by agents in collector mode)"""
+        nonlocal scheduler, workers, probe_thread
+        save_scheduler.start()
+        if event_stream and events_port:
+            event_stream.start(host, int(events_port))
+        if mode == "collector":
+            logging.info("Collector mode. Waiting for checks from agents")
+            if not api_key:
+                logging.warning("No API key specified. Anyone will be able to send checks to /ingest")
+        else:
+            scheduler, workers, probe_thread = _start_checks(
+                statuses, _update_data, scheduler_config, metrics, _refresh_data, database.push
+            )
+        logging.info(f"Started in {(perf_counter() - time_started) * 1000:.0f}ms")
+
+    def _warm_start() -> None:
+        """Loads database and starts checks while server is already serving last-known data"""
+        try:
+            _load_database()
+            _start_background()
+        except Exception as e:
+            logging.error(f"Unable to start: {e}", exc_info=e)
+            signal.raise_signal(signal.SIGTERM)
+
+    # Serve last-known data (keys of api_data must not change after that) or load database before serving
+    if fast_start:
+        api_data.update(load_snapshot(snapshot_path, statuses))
+    else:
+        _load_database()
 
-    # Pre-load API data
-    for status in statuses:
-        api_data[status.id] = status.get_data_dict()
+    # Start serving by server workers as soon as data is ready
+    if snapshot_publisher:
+        snapshot_publisher.publish()
 
-    # Initialize workers
-    workers: list[StatusWorker] = []
-    for status in statuses:
-        workers.append(StatusWorker(status, _update_data))
+    if static_exporter:
+        static_exporter.start()
 
-    # Start workers
-    if workers:
-        logging.info("Starting workers")
-        for worker in workers:
-            worker.start()
+    warm_start_thread: Thread | None = None
+    if fast_start:
+        warm_start_thread = Thread(target=_warm_start, name="warm-start", daemon=True)
+        warm_start_thread.start()
     else:
-        logging.warning("No statuses specified")
+        _start_background()
 
     # Start server (blocking)
-    server.start(host, port)
-
-    # Stop workers after server stop
-    if workers:
-        logging.info("Stopping workers")
-        for worker in workers:
-            worker.stop()
+    try:
+        if snapshot_publisher:
+            snapshot_publisher.start()
+            if metrics_publisher:
+                metrics_publisher.start()
+            wait_workers(worker_pids)
+        elif not server_enabled:
+            logging.info("Server is disabled. Only exporting status page")
+            Event().wait()
+        else:
+            _serve(
+                metrics,
+                _ingest if mode == "collector" else None,
+                response_cache,
+                uptime_callback=getattr(database, "query_uptime", None),
+            )
+
+    finally:
+        # Stop server workers
+        if worker_pids:
+            logging.info("Stopping server workers")
+            stop_workers(worker_pids)
+        if snapshot_publisher:
+            snapshot_publisher.stop()
+        if snapshot_writer:
+            snapshot_writer.close()
+        if metrics_publisher:
+            metrics_publisher.stop()
+        if metrics_writer:
+            metrics_writer.close()
+
+        # Wait for database loading to stop checks that it has started
+        if warm_start_thread is not None and warm_start_thread.is_alive():
+            logging.info("Waiting for database to load")
+            warm_start_thread.join()
+
+        # Stop scheduler / workers after server stop
+        _stop_checks(scheduler, workers, probe_thread)
+
+        if event_stream:
+            event_stream.stop()
+
+        # Export the latest data
+        if static_exporter:
+            static_exporter.stop()
+
+        # Write pending data
+        save_scheduler.stop()
+        database.close()
+        if database_loaded.is_set():
+            _save_snapshot()
+        stats = save_scheduler.get_stats()
+        logging.info(f"Database flushed {stats['flushes']} times ({stats['changes_flushed']} changes)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import random
+from time import monotonic, time
+
+from simple_status_server.status import Status
+
+
+def first_check_delay(status: Status, time_current: float | None = None) -> float:
+    """Calculates delay of the first check after start, so statuses with history are checked when their next
+    check is actually due instead of all at once after one interval
+    >>> status = Status("s", {"type": "constant", "target": True, "interval": 10})
+    >>> first_check_delay(status, 1000)
+    0
+    >>> status.push_new_status(True, timestamp=1000)
+    >>> first_check_delay(status, 1004), first_check_delay(status, 1100)
+    (6, 0)
+
+    Args:
+        status (Status): status to check
+        time_current (float | None, optional): current unix time. Defaults to now
+
+    Returns:
+        float: delay in seconds (0 if status has no history or its check is overdue)
+    """
+    time_last_check = status.current_bar.time_end
+    if len(status.status_values) == 0 or time_last_check is None:
+        return 0
+    if time_current is None:
+        time_current = time()
+    return min(max(status.interval - (time_current - time_last_check), 0), status.interval)
+
+
+class AdaptiveInterval:
+    def __init__(self, status: Status) -> None:
+        """Adaptive check interval of single status
+
+        Failed check is confirmed by up to status.retries re-checks every status.retry_interval (the first
+        successful re-check cancels failure). While target is working, interval grows by status.backoff_factor
+        up to status.interval_max, any failure resets it to status.interval. Each delay is randomized by
+        +-status.jitter
+
+        Each pushed result is weighted by number of status.interval periods it represents, so bars keep covering
+        interval * checks_per_bar seconds regardless of how often target is actually checked
+        >>> status = Status("s", {"type": "constant", "target": True, "interval": 10, "interval_max": 40,
+        ...     "retries": 2, "retry_interval": 1})
+        >>> policy = AdaptiveInterval(status)
+        >>> policy.on_result(True, 0), policy.on_result(True, 20), policy.on_result(True, 60)
+        ((True, 1, 20.0), (True, 2, 40.0), (True, 4, 40.0))
+        >>> policy.on_result(False, 100), policy.on_result(False, 101), policy.on_result(False, 102)
+        ((False, 0, 1.0), (False, 0, 1.0), (True, 4, 10.0))
+
+        Args:
+            status (Status): status to schedule
+        """
+        self._status = status
+        self._interval = float(status.interval)
+        self._retries_left = status.retries
+        self._time_last_push: float | None = None
+        self._carry = 0.0
+
+    def initial_delay(self) -> float:
+        """
+        Returns:
+            float: see first_check_delay() (plus random delay within interval * jitter to spread checks at startup)
+        """
+        return first_check_delay(self._status) + random.uniform(0, self._status.interval * self._status.jitter)
+
+    def on_result(self, result: bool, time_current: float | None = None) -> tuple[bool, int, float]:
+        """Processes result of check
+
+        Args:
+            result (bool): check result
+            time_current (float | None, optional): monotonic time of check. Defaults to now
+
+        Returns:
+            tuple[bool, int, float]: True if result must be pushed (False for unconfirmed failure),
+            weight of pushed result (number of samples) and delay of the next check in seconds
+        """
+        if time_current is None:
+            time_current = monotonic()
+
+        # Confirm failure
+        if not result and self._retries_left > 0:
+            self._retries_left -= 1
+            return False, 0, float(self._status.retry_interval)
+        self._retries_left = self._status.retries
+
+        # Number of intervals passed since previous pushed result. Extra results (ex. triggered checks)
+        # are counted in advance, so the number of samples can't drift away from elapsed time
+        weight = 1
+        if self._time_last_push is not None:
+            self._carry += (time_current - self._time_last_push) / self._status.interval
+            weight = min(max(int(self._carry + 0.5), 1), self._status.checks_per_bar)
+            self._carry = max(self._carry - weight, -1.0)
+        self._time_last_push = time_current
+
+        # Back off while target is working
+        if result:
+            self._interval = min(self._interval * self._status.backoff_factor, float(self._status.interval_max))
+        else:
+            self._interval = float(self._status.interval)
+
+        return True, weight, self._jitter(self._interval)
+
+    def on_skipped(self) -> None:
+        """Forgets previous result when status isn't checked because of failed dependency, so the first result
+        after recovery isn't weighted by the time status wasn't checked
+        >>> status = Status("s", {"type": "constant", "target": True, "interval": 10})
+        >>> policy = AdaptiveInterval(status)
+        >>> policy.on_result(True, 0), policy.on_skipped(), policy.on_result(True, 60)
+        ((True, 1, 10.0), None, (True, 1, 10.0))
+        """
+        self._retries_left = self._status.retries
+        self._interval = float(self._status.interval)
+        self._time_last_push = None
+        self._carry = 0.0
+
+    def _jitter(self, delay: float) -> float:
+        """
+        Args:
+            delay (float): delay in seconds
+
+        Returns:
+            float: delay randomized by +-jitter
+        """
+        if self._status.jitter <= 0:
+            return delay
+        return max(delay * random.uniform(1 - self._status.jitter, 1 + self._status.jitter), 0.0)
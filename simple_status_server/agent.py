@@ -0,0 +1,190 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import logging
+import zlib
+from collections import deque
+from itertools import islice
+from threading import Condition, Thread
+from typing import Any
+
+import requests
+
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "collector_url": "http://127.0.0.1:8080/ingest",
+    "shard": 0,
+    "shards": 1,
+    "batch_interval": "1s",
+    "batch_max": 1000,
+    "buffer_max": 100000,
+    "timeout": "10s",
+}
+
+
+def status_shard(status_id: str, shards: int) -> int:
+    """Assigns status to shard by hashing its ID (stable across processes and machines)
+    >>> status_shard("google", 1)
+    0
+    >>> [status_shard(status_id, 3) for status_id in ("google", "nginx", "disk")]
+    [2, 2, 0]
+
+    Args:
+        status_id (str): ID of status
+        shards (int): total number of shards
+
+    Returns:
+        int: index of shard (0 - shards-1)
+    """
+    return zlib.crc32(status_id.encode("utf-8")) % shards
+
+
+def assign_shards(statuses: list[Status], shards: int) -> dict[str, int]:
+    """Assigns statuses to shards (see status_shard()). Statuses linked by depends_on are kept on the shard
+    of the smallest ID among them, so each agent checks dependencies of its statuses itself
+    >>> statuses = [Status(status_id, {"type": "constant", "target": True})
+    ...     for status_id in ("google", "nginx", "disk")]
+    >>> assign_shards(statuses, 3)
+    {'google': 2, 'nginx': 2, 'disk': 0}
+    >>> statuses[1].depends_on = ["disk"]
+    >>> assign_shards(statuses, 3)
+    {'google': 2, 'nginx': 0, 'disk': 0}
+
+    Args:
+        statuses (list[Status]): all configured statuses
+        shards (int): total number of shards
+
+    Returns:
+        dict[str, int]: status ID -> index of shard (0 - shards-1)
+    """
+    # Status ID -> ID of another status of the same group (group is identified by its smallest ID)
+    parents = {status.id: status.id for status in statuses}
+
+    def _find(status_id: str) -> str:
+        while parents[status_id] != status_id:
+            parents[status_id] = parents[parents[status_id]]
+            status_id = parents[status_id]
+        return status_id
+
+    for status in statuses:
+        for dependency_id in status.depends_on:
+            if dependency_id in parents:
+                root, dependency_root = _find(status.id), _find(dependency_id)
+                parents[max(root, dependency_root)] = min(root, dependency_root)
+    return {status.id: status_shard(_find(status.id), shards) for status in statuses}
+
+
+class Agent:
+    def __init__(self, config: dict[str, Any] | None = None, api_key: str | None = None) -> None:
+        """Sends results of checks in compact batches to collector's /ingest endpoint.
+        Batches that failed to be sent are kept (up to buffer_max checks) and retried with the next batch
+
+        Args:
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+            api_key (str | None, optional): collector's API key. Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._collector_url = str(config.get("collector_url", CONFIG_DEFAULT["collector_url"]))
+        self._batch_interval = parse_time_cfg(config.get("batch_interval", CONFIG_DEFAULT["batch_interval"]))
+        self._batch_max = int(config.get("batch_max", CONFIG_DEFAULT["batch_max"]))
+        self._timeout = parse_time_cfg(config.get("timeout", CONFIG_DEFAULT["timeout"]))
+        self._api_key = api_key
+
+        self._checks: deque[dict[str, Any]] = deque(maxlen=int(config.get("buffer_max", CONFIG_DEFAULT["buffer_max"])))
+        self._condition = Condition()
+        self._session = requests.Session()
+        self._exit_flag = False
+        self._thread = Thread(target=self._loop, name="agent", daemon=True)
+
+    def start(self) -> None:
+        """Starts background sending thread"""
+        logging.info(f"Sending checks to {self._collector_url}")
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Sends remaining checks and stops background thread"""
+        with self._condition:
+            self._exit_flag = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        while self._send():
+            pass
+        self._session.close()
+
+    def push(self, status: Status) -> None:
+        """Queues last check of status (use as update callback of scheduler / workers)
+
+        Args:
+            status (Status): updated status
+        """
+        check = status.get_last_check_dict()
+        if check is None:
+            return
+        with self._condition:
+            if len(self._checks) == self._checks.maxlen:
+                logging.warning(f"Agent buffer is full. Dropping the oldest check of {self._checks[0]['id']}")
+            self._checks.append({"id": status.id, **check})
+            if len(self._checks) >= self._batch_max:
+                self._condition.notify_all()
+
+    def _loop(self) -> None:
+        """Sends batch every batch_interval or as soon as batch_max checks are queued"""
+        while True:
+            with self._condition:
+                if not self._exit_flag and len(self._checks) < self._batch_max:
+                    self._condition.wait(self._batch_interval if self._batch_interval > 0 else 1)
+                if self._exit_flag:
+                    break
+            while self._send():
+                pass
+
+    def _send(self) -> bool:
+        """Sends up to batch_max queued checks
+
+        Returns:
+            bool: True if full batch was sent and there are more checks
+        """
+        with self._condition:
+            batch = list(islice(self._checks, self._batch_max))
+        if not batch:
+            return False
+
+        body: dict[str, Any] = {"checks": batch}
+        if self._api_key:
+            body["apiKey"] = self._api_key
+        try:
+            response = self._session.post(self._collector_url, json=body, timeout=self._timeout)
+            if response.status_code != 200:
+                raise Exception(f"Collector returned {response.status_code}: {response.text.strip()}")
+        except Exception as e:
+            logging.warning(f"Unable to send {len(batch)} checks to collector: {e}")
+            return False
+
+        # Remove sent checks (unless they were already dropped due to overflow)
+        with self._condition:
+            for check in batch:
+                if self._checks and self._checks[0] is check:
+                    self._checks.popleft()
+            more = len(self._checks) > 0
+        logging.debug(f"Sent {len(batch)} checks to collector")
+        return more and len(batch) == self._batch_max
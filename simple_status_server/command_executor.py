@@ -0,0 +1,278 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+from os import path
+from time import perf_counter
+from typing import Any, Callable
+
+from simple_status_server.probe import Probe, ProbeResult
+from simple_status_server.status import Status
+
+CONFIG_DEFAULT = {
+    "helpers": 16,
+    "per_command_limit": 1,
+    "stderr_max": 1024,
+}
+
+HELPER_PATH = path.join(path.dirname(path.abspath(__file__)), "command_helper.py")
+
+# Extra time for helper to respond after command timeout
+HELPER_TIMEOUT_EXTRA = 5
+
+
+class CommandResult:
+    def __init__(self, return_code: int | None, duration: float, stderr: str, timed_out: bool) -> None:
+        """Result of shell command
+
+        Args:
+            return_code (int | None): exit code or None if command couldn't be started or was killed by timeout
+            duration (float): time in seconds
+            stderr (str): last stderr_max characters of stderr
+            timed_out (bool): True if command was killed by timeout
+        """
+        self.return_code = return_code
+        self.duration = duration
+        self.stderr = stderr
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns:
+            bool: True if command exited with 0 exit code
+        """
+        return self.return_code == 0 and not self.timed_out
+
+    def __repr__(self) -> str:
+        return (
+            f"CommandResult(return_code={self.return_code}, duration={self.duration:.3f}, "
+            f"timed_out={self.timed_out}, stderr={self.stderr!r})"
+        )
+
+
+class CommandExecutor:
+    def __init__(self, config: dict[str, Any] | None = None) -> None:
+        """Runs shell commands through a pool of long-lived lightweight helper processes (see command_helper.py),
+        so the main process with all its threads and memory is never forked per check
+
+        Args:
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._helpers_max = int(config.get("helpers", CONFIG_DEFAULT["helpers"]))
+        self._per_command_limit = int(config.get("per_command_limit", CONFIG_DEFAULT["per_command_limit"]))
+        self._stderr_max = int(config.get("stderr_max", CONFIG_DEFAULT["stderr_max"]))
+
+        # Helper script can't be started from PyInstaller executable
+        self._use_helpers = self._helpers_max > 0 and not getattr(sys, "frozen", False) and path.exists(HELPER_PATH)
+
+        self._idle: list[asyncio.subprocess.Process] = []
+        self._helpers: set[asyncio.subprocess.Process] = set()
+        self._helpers_available: asyncio.Semaphore | None = None
+        self._command_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def helpers(self) -> int:
+        """
+        Returns:
+            int: maximum number of helper processes (each runs one command at a time) or 0 if commands are
+            started directly
+        """
+        return self._helpers_max if self._use_helpers else 0
+
+    async def run(self, command: str, timeout: float) -> CommandResult:
+        """Runs shell command (must be called from the same event loop every time)
+
+        Args:
+            command (str): shell command
+            timeout (float): timeout in seconds. Entire process group is killed after it
+
+        Returns:
+            CommandResult: exit code, duration, stderr and timeout flag
+        """
+        semaphore = self._command_semaphores.get(command)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._per_command_limit)
+            self._command_semaphores[command] = semaphore
+
+        async with semaphore:
+            if self._use_helpers:
+                try:
+                    return await self._run_helper(command, timeout)
+                except Exception as e:
+                    logging.warning(f"Unable to run command using helper process: {e}. Running it directly")
+            return await self._run_direct(command, timeout)
+
+    async def close(self) -> None:
+        """Stops all helper processes"""
+        for helper in list(self._helpers):
+            await self._stop_helper(helper)
+        self._idle.clear()
+
+    async def _run_helper(self, command: str, timeout: float) -> CommandResult:
+        """Runs command using idle (or new) helper process
+
+        Args:
+            command (str): shell command
+            timeout (float): timeout in seconds
+
+        Returns:
+            CommandResult: command result
+        """
+        if self._helpers_available is None:
+            self._helpers_available = asyncio.Semaphore(self._helpers_max)
+
+        async with self._helpers_available:
+            helper = self._idle.pop() if self._idle else await self._start_helper()
+            try:
+                if helper.stdin is None or helper.stdout is None:
+                    raise Exception("No helper pipes")
+                request = {"command": command, "timeout": timeout, "stderr_max": self._stderr_max}
+                helper.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+                await helper.stdin.drain()
+                async with asyncio.timeout(timeout + HELPER_TIMEOUT_EXTRA):
+                    line = await helper.stdout.readline()
+                if not line:
+                    raise Exception(f"Helper process exited with code {helper.returncode}")
+                result = json.loads(line)
+            except BaseException:
+                await self._stop_helper(helper)
+                raise
+
+            self._idle.append(helper)
+
+        return CommandResult(
+            result["code"], float(result["duration"]), str(result["stderr"]), bool(result["timed_out"])
+        )
+
+    async def _start_helper(self) -> asyncio.subprocess.Process:
+        """Starts new helper process
+
+        Returns:
+            asyncio.subprocess.Process: helper process
+        """
+        helper = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            HELPER_PATH,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        self._helpers.add(helper)
+        logging.debug(f"Started command helper process {helper.pid}. Total helpers: {len(self._helpers)}")
+        return helper
+
+    async def _stop_helper(self, helper: asyncio.subprocess.Process) -> None:
+        """Stops helper process
+
+        Args:
+            helper (asyncio.subprocess.Process): helper process
+        """
+        self._helpers.discard(helper)
+        if helper in self._idle:
+            self._idle.remove(helper)
+        if helper.returncode is not None:
+            return
+        try:
+            if helper.stdin is not None:
+                helper.stdin.close()
+            async with asyncio.timeout(1):
+                await helper.wait()
+        except TimeoutError:
+            helper.kill()
+            await helper.wait()
+        except Exception:
+            pass
+
+    async def _run_direct(self, command: str, timeout: float) -> CommandResult:
+        """Runs command directly from the current process (used if helpers are not available)
+
+        Args:
+            command (str): shell command
+            timeout (float): timeout in seconds
+
+        Returns:
+            CommandResult: command result
+        """
+        time_start = perf_counter()
+        try:
+            process = await asyncio.create_subprocess_shell(
+                command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+            )
+        except Exception as e:
+            return CommandResult(None, perf_counter() - time_start, str(e), False)
+
+        timed_out = False
+        try:
+            async with asyncio.timeout(timeout):
+                _, stderr = await process.communicate()
+        except TimeoutError:
+            timed_out = True
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            _, stderr = await process.communicate()
+
+        return CommandResult(
+            None if timed_out else process.returncode,
+            perf_counter() - time_start,
+            stderr[-self._stderr_max :].decode("utf-8", errors="replace") if self._stderr_max > 0 else "",
+            timed_out,
+        )
+
+
+class CommandProbe(Probe):
+    latency = True
+    concurrency = 16
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'command' type. Checks exit code of shell command started by helper processes (see CommandExecutor)"""
+        super().__init__(config, trigger)
+        self._executor = CommandExecutor(config)
+
+        # Each helper runs one command at a time, so more running checks would only wait for helpers
+        if self._executor.helpers > 0:
+            self.concurrency = self._executor.helpers
+
+    async def probe(self, status: Status) -> ProbeResult:
+        command_result = await self._executor.run(str(status.target), status.target_timeout)
+        if command_result.ok:
+            error_class = None
+        elif command_result.timed_out:
+            error_class = "timeout"
+        else:
+            error_class = "exit_code" if command_result.return_code is not None else "spawn"
+        return ProbeResult(command_result.ok, error_class, command_result.duration, repr(command_result))
+
+    async def close(self) -> None:
+        await self._executor.close()
@@ -0,0 +1,91 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+from time import perf_counter
+
+
+def run_command(command: str, timeout: float, stderr_max: int) -> dict:
+    """Runs shell command in its own session, so entire process group is killed on timeout
+
+    Args:
+        command (str): shell command
+        timeout (float): timeout in seconds
+        stderr_max (int): maximum length of returned stderr (the last part is kept)
+
+    Returns:
+        dict: exit code (None in case of error or timeout), duration in seconds, stderr and timeout flag
+    """
+    time_start = perf_counter()
+    try:
+        process = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+    except Exception as e:
+        return {"code": None, "duration": perf_counter() - time_start, "stderr": str(e), "timed_out": False}
+
+    timed_out = False
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        _, stderr = process.communicate()
+
+    return {
+        "code": None if timed_out else process.returncode,
+        "duration": perf_counter() - time_start,
+        "stderr": stderr[-stderr_max:].decode("utf-8", errors="replace") if stderr_max > 0 else "",
+        "timed_out": timed_out,
+    }
+
+
+def main() -> None:
+    """Helper process of CommandExecutor. Uses only standard library, so it can be started as a plain script
+
+    Reads one JSON request per line from stdin: {"command": "...", "timeout": 10, "stderr_max": 1024}
+    and writes one JSON result per line to stdout: {"code": 0, "duration": 0.1, "stderr": "", "timed_out": false}
+    until stdin is closed
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for line in sys.stdin:
+        try:
+            request = json.loads(line)
+            result = run_command(str(request["command"]), float(request["timeout"]), int(request["stderr_max"]))
+        except Exception as e:
+            result = {"code": None, "duration": 0.0, "stderr": f"Invalid request: {e}", "timed_out": False}
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,10 +20,45 @@ OTHER DEALINGS IN THE SOFTWARE.
 
 import json
 import logging
+import os
 from os import path
 from threading import Lock
+from typing import Any
 
-from simple_status_server.status import Status
+from simple_status_server.status import LATENCY_NONE, Status
+
+
+def write_atomic(file_path: str, data: bytes) -> None:
+    """Writes data into temporary file, syncs it to disk and renames it over file_path,
+    so file_path will contain either old or new data even in case of crash
+
+    Args:
+        file_path (str): path to file
+        data (bytes): new file content
+    """
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as temp_io:
+        temp_io.write(data)
+        temp_io.flush()
+        os.fsync(temp_io.fileno())
+    os.replace(temp_path, file_path)
+    sync_directory(file_path)
+
+
+def sync_directory(file_path: str) -> None:
+    """Syncs directory entry of file_path to disk (after renaming file into it)
+
+    Args:
+        file_path (str): path to file
+    """
+    try:
+        dir_fd = os.open(path.dirname(path.abspath(file_path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    except OSError:
+        pass
 
 
 class Database:
@@ -35,33 +70,39 @@ class Database:
 
     def load(self) -> None:
         """Loads database and updates self._statuses"""
-        if not path.exists(self._database_path):
-            logging.debug(f"Skipping loading database. File {self._database_path} doesn't exist")
-            return
-
-        logging.info(f"Loading database from {self._database_path}")
-        with open(self._database_path, "r", encoding="utf-8") as database_io:
-            database = json.load(database_io)
-        if not isinstance(database, dict):
-            logging.warning("Unable to load database. Invalid data type")
-            database = {}
-
-        # Load only configured statuses
-        for status in self._statuses:
-            if status.id not in database:
-                logging.debug(f"Status {status.id} doesn't exist in database. Skipping")
-                continue
-
-            db_data = database[status.id]
-            if "status_values" in db_data:
-                status.status_values = db_data["status_values"]
-            if "current_bar" in db_data:
-                status.current_bar.from_dict(db_data["current_bar"])
-            if "timestamps" in db_data and "data" in db_data:
-                status.timestamps = db_data["timestamps"]
-                status.data = db_data["data"]
-
-            logging.debug(f"Loaded status {status.id} from database: {status.get_data_dict()}")
+        database = self._read()
+        if database is not None:
+            self._apply(database)
+
+    def record(self, status: Status) -> None:
+        """Records last check of status. Called after each check before save()
+        (JSON database stores entire state on save() so nothing is done here)
+
+        Args:
+            status (Status): updated status
+        """
+        pass
+
+    def push(
+        self,
+        status: Status,
+        status_value: bool,
+        timestamp: int | None = None,
+        latency: float | None = None,
+        weight: int = 1,
+    ) -> None:
+        """Pushes result of check into status and records it (called after each check instead of
+        Status.push_new_status(), see it for arguments)
+
+        Args:
+            status (Status): checked status
+            status_value (bool): check result
+            timestamp (int | None, optional): time of check. Defaults to now
+            latency (float | None, optional): duration of check in seconds. Defaults to None
+            weight (int, optional): number of samples this check represents. Defaults to 1
+        """
+        status.push_new_status(status_value, timestamp, latency, weight)
+        self.record(status)
 
     def save(self) -> None:
         """Updates database with statuses in non-destructive way (will not update non-configured IDs)"""
@@ -80,15 +121,88 @@ class Database:
                     logging.warning(f"Unable to load database from {self._database_path}: {e}")
 
             # Update
-            for status in self._statuses:
-                if status.id not in database:
-                    database[status.id] = {}
-                database[status.id]["status_values"] = status.status_values
-                database[status.id]["current_bar"] = status.current_bar.to_dict()
-                database[status.id]["timestamps"] = status.timestamps
-                database[status.id]["data"] = status.data
+            self._update(database)
 
             # Save
             logging.info(f"Saving database to {self._database_path}")
-            with open(self._database_path, "w+", encoding="utf-8") as database_io:
-                json.dump(database, database_io, ensure_ascii=False, indent=4)
+            write_atomic(self._database_path, json.dumps(database, ensure_ascii=False, indent=4).encode("utf-8"))
+
+    def close(self) -> None:
+        """Writes all pending data and releases resources"""
+        pass
+
+    def _read(self) -> dict[str, Any] | None:
+        """Reads entire database file
+
+        Returns:
+            dict[str, Any] | None: parsed database or None if file doesn't exist
+        """
+        if not path.exists(self._database_path):
+            logging.debug(f"Skipping loading database. File {self._database_path} doesn't exist")
+            return None
+
+        logging.info(f"Loading database from {self._database_path}")
+        with open(self._database_path, "r", encoding="utf-8") as database_io:
+            database = json.load(database_io)
+        if not isinstance(database, dict):
+            logging.warning("Unable to load database. Invalid data type")
+            database = {}
+        return database
+
+    def _apply(self, database: dict[str, Any]) -> None:
+        """Loads configured statuses from parsed database
+
+        Args:
+            database (dict[str, Any]): parsed database
+        """
+        for status in self._statuses:
+            if status.id not in database:
+                logging.debug(f"Status {status.id} doesn't exist in database. Skipping")
+                continue
+            self._apply_status(status, database[status.id])
+
+    def _apply_status(self, status: Status, db_data: dict[str, Any]) -> None:
+        """Loads single status from its database entry
+
+        Args:
+            status (Status): configured status
+            db_data (dict[str, Any]): database entry of status
+        """
+        if "status_values" in db_data:
+            status.status_values = db_data["status_values"]
+        if "current_bar" in db_data:
+            status.current_bar.from_dict(db_data["current_bar"])
+        if "timestamps" in db_data and "data" in db_data:
+            status.timestamps = db_data["timestamps"]
+            status.data = db_data["data"]
+            latency = db_data.get("latency", [])
+            if len(latency) != len(db_data["data"]):
+                latency = [LATENCY_NONE] * len(db_data["data"])
+            status.latency = latency
+
+        logging.debug(f"Loaded status {status.id} from database: {status.get_data_dict()}")
+
+    def _update(self, database: dict[str, Any]) -> None:
+        """Writes configured statuses into database dictionary
+
+        Args:
+            database (dict[str, Any]): parsed database to update
+        """
+        for status in self._statuses:
+            if status.id not in database:
+                database[status.id] = {}
+            self._update_status(status, database[status.id])
+
+    def _update_status(self, status: Status, db_data: dict[str, Any]) -> None:
+        """Writes single status into its database entry
+
+        Args:
+            status (Status): configured status
+            db_data (dict[str, Any]): database entry of status to update
+        """
+        db_data["status_values"] = list(status.status_values)
+        db_data["current_bar"] = status.current_bar.to_dict()
+        db_data["timestamps"] = list(status.timestamps)
+        db_data["data"] = list(status.data)
+        if status.latency_enabled:
+            db_data["latency"] = list(status.latency)
@@ -0,0 +1,234 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+from os import path
+from typing import Any, BinaryIO
+
+from simple_status_server.database import Database, sync_directory
+from simple_status_server.status import Status
+
+# magic, number of records, offset of index, length of index
+HEADER = struct.Struct("<8sIQQ")
+MAGIC = b"SSSIDX01"
+
+# length of status ID (followed by ID), offset of record, length of record
+INDEX_ENTRY = struct.Struct("<HQQ")
+
+
+def pack_index(index: dict[str, tuple[int, int]]) -> bytes:
+    """Serializes index of records
+    >>> unpack_index(pack_index({"google": (32, 100), "disk": (132, 5)}), 2)
+    {'google': (32, 100), 'disk': (132, 5)}
+
+    Args:
+        index (dict[str, tuple[int, int]]): status ID -> (offset, length) of its record
+
+    Returns:
+        bytes: serialized index
+    """
+    parts = []
+    for status_id, (offset, length) in index.items():
+        status_id_bytes = status_id.encode("utf-8")
+        parts += [INDEX_ENTRY.pack(len(status_id_bytes), offset, length), status_id_bytes]
+    return b"".join(parts)
+
+
+def unpack_index(data: bytes, count: int) -> dict[str, tuple[int, int]]:
+    """Parses index of records
+
+    Args:
+        data (bytes): see pack_index()
+        count (int): number of records
+
+    Returns:
+        dict[str, tuple[int, int]]: status ID -> (offset, length) of its record
+    """
+    index = {}
+    position = 0
+    for _ in range(count):
+        status_id_length, offset, length = INDEX_ENTRY.unpack_from(data, position)
+        position += INDEX_ENTRY.size
+        index[data[position : position + status_id_length].decode("utf-8")] = (offset, length)
+        position += status_id_length
+    return index
+
+
+class IndexedDatabase(Database):
+    def __init__(self, statuses: list[Status], database_path: str) -> None:
+        """Database with a separate JSON record per status and an index of records at the end of file.
+        File is memory-mapped and only records of configured statuses are parsed, so load time and memory
+        don't depend on number of other (ex. no longer configured) statuses in database. Records of other statuses
+        are copied as is on save. JSON database at database_path is converted on the first save
+
+        Args:
+            statuses (list[Status]): configured statuses
+            database_path (str): path to database file
+        """
+        super().__init__(statuses, database_path)
+
+        self._file: BinaryIO | None = None
+        self._mmap: mmap.mmap | None = None
+        self._index: dict[str, tuple[int, int]] = {}
+
+        # Entire parsed JSON database (until it's converted)
+        self._legacy: dict[str, Any] | None = None
+
+    def load(self) -> None:
+        """Loads records of configured statuses"""
+        logging.info(f"Loading database from {self._database_path}")
+        with self._lock:
+            self._map()
+            if self._legacy is not None:
+                self._apply(self._legacy)
+                return
+            for status in self._statuses:
+                db_data = self._read_record(status.id)
+                if db_data is None:
+                    logging.debug(f"Status {status.id} doesn't exist in database. Skipping")
+                    continue
+                self._apply_status(status, db_data)
+
+    def read_status(self, status_id: str) -> dict[str, Any] | None:
+        """Reads stored record of a single status without reading any other records
+
+        Args:
+            status_id (str): ID of status (doesn't have to be configured)
+
+        Returns:
+            dict[str, Any] | None: record in the same format as JSON database entry or None if it doesn't exist
+        """
+        with self._lock:
+            if self._mmap is None and self._legacy is None:
+                self._map()
+            return self._read_record(status_id)
+
+    def save(self) -> None:
+        """Writes records of configured statuses and copies other records into a new file"""
+        with self._lock:
+            logging.debug(f"Saving database to {self._database_path}")
+            temp_path = self._database_path + ".tmp"
+            index: dict[str, tuple[int, int]] = {}
+            with open(temp_path, "wb") as temp_io:
+                temp_io.write(HEADER.pack(MAGIC, 0, 0, 0))
+
+                def _write(status_id: str, record: bytes) -> None:
+                    """Appends record and adds it into index"""
+                    index[status_id] = (temp_io.tell(), len(record))
+                    temp_io.write(record)
+
+                for status in self._statuses:
+                    db_data: dict[str, Any] = {}
+                    self._update_status(status, db_data)
+                    _write(status.id, json.dumps(db_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+                # Keep other statuses
+                if self._legacy is not None:
+                    for status_id, db_data in self._legacy.items():
+                        if status_id not in index and isinstance(db_data, dict):
+                            _write(status_id, json.dumps(db_data, ensure_ascii=False).encode("utf-8"))
+                elif self._mmap is not None:
+                    for status_id, (offset, length) in self._index.items():
+                        if status_id not in index:
+                            _write(status_id, self._mmap[offset : offset + length])
+
+                index_offset = temp_io.tell()
+                index_bytes = pack_index(index)
+                temp_io.write(index_bytes)
+                temp_io.seek(0)
+                temp_io.write(HEADER.pack(MAGIC, len(index), index_offset, len(index_bytes)))
+                temp_io.flush()
+                os.fsync(temp_io.fileno())
+
+            self._unmap()
+            os.replace(temp_path, self._database_path)
+            sync_directory(self._database_path)
+            self._legacy = None
+            self._map()
+
+    def close(self) -> None:
+        """Unmaps database file"""
+        with self._lock:
+            self._unmap()
+
+    def _map(self) -> None:
+        """Maps database file and reads its index or parses entire JSON database
+        (must be called with self._lock acquired)"""
+        self._unmap()
+        if not path.exists(self._database_path) or path.getsize(self._database_path) == 0:
+            logging.debug(f"Skipping loading database. File {self._database_path} doesn't exist")
+            return
+
+        self._file = open(self._database_path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._unmap()
+            logging.info(f"{self._database_path} is not an indexed database. It will be converted on save")
+            self._legacy = self._read()
+            return
+
+        if len(self._mmap) < HEADER.size:
+            self._unmap()
+            raise Exception(f"Database {self._database_path} is truncated")
+        _, count, index_offset, index_length = HEADER.unpack_from(self._mmap, 0)
+        if index_offset < HEADER.size or index_offset + index_length > len(self._mmap):
+            self._unmap()
+            raise Exception(f"Database {self._database_path} is truncated")
+        try:
+            index = unpack_index(self._mmap[index_offset : index_offset + index_length], count)
+        except (struct.error, UnicodeDecodeError) as e:
+            self._unmap()
+            raise Exception(f"Index of database {self._database_path} is corrupted: {e}")
+        for status_id, (offset, length) in index.items():
+            if offset < HEADER.size or offset + length > index_offset:
+                self._unmap()
+                raise Exception(f"Index of database {self._database_path} is corrupted: wrong record of {status_id}")
+        self._index = index
+        logging.debug(f"Mapped {self._database_path} with {count} records")
+
+    def _unmap(self) -> None:
+        """Closes mapped database file (must be called with self._lock acquired)"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._index = {}
+
+    def _read_record(self, status_id: str) -> dict[str, Any] | None:
+        """Parses record of single status (must be called with self._lock acquired)
+
+        Args:
+            status_id (str): ID of status
+
+        Returns:
+            dict[str, Any] | None: parsed record or None if it doesn't exist
+        """
+        if self._legacy is not None:
+            return self._legacy.get(status_id)
+        if self._mmap is None or status_id not in self._index:
+            return None
+        offset, length = self._index[status_id]
+        return json.loads(self._mmap[offset : offset + length])
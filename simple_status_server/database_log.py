@@ -0,0 +1,273 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import logging
+import os
+from os import path
+from threading import Event, Thread
+from time import monotonic
+from typing import Any, TextIO
+
+from simple_status_server.database import Database, write_atomic
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "fsync_interval": "1s",
+    "compact_records": 10000,
+}
+
+# Top-level snapshot key with sequence number of the last record included into snapshot
+SEQUENCE_KEY = "_log_sequence"
+
+
+class LogDatabase(Database):
+    def __init__(self, statuses: list[Status], database_path: str, config: dict[str, Any] | None = None) -> None:
+        """Append-only database. Each check is appended as one compact record into <database_path>.log,
+        records are periodically compacted into JSON snapshot at <database_path> (same format as JSON database)
+
+        Args:
+            statuses (list[Status]): configured statuses
+            database_path (str): path to snapshot file
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+        """
+        super().__init__(statuses, database_path)
+        if config is None:
+            config = {}
+        self._fsync_interval = parse_time_cfg(config.get("fsync_interval", CONFIG_DEFAULT["fsync_interval"]))
+        self._compact_records = int(config.get("compact_records", CONFIG_DEFAULT["compact_records"]))
+
+        self._log_path = database_path + ".log"
+        self._log_compacting_path = database_path + ".log.compacting"
+        self._log_io: TextIO | None = None
+
+        self._sequence = 0
+        self._buffer: list[str] = []
+        self._records_since_compaction = 0
+        self._unsynced = False
+        self._time_synced = monotonic()
+
+        self._exit_flag = False
+        self._compact_request = Event()
+        self._thread = Thread(target=self._background_loop, name="database", daemon=True)
+
+    def load(self) -> None:
+        """Loads snapshot and replays log records after it"""
+        database = None
+        try:
+            database = self._read()
+        except Exception as e:
+            logging.error(f"Unable to load database snapshot from {self._database_path}: {e}")
+        snapshot_sequence = 0
+        if database is not None:
+            snapshot_sequence = int(database.get(SEQUENCE_KEY, 0))
+            self._apply(database)
+        self._sequence = snapshot_sequence
+
+        # Replay records written after snapshot
+        statuses = {status.id: status for status in self._statuses}
+        replayed = 0
+        for log_path in (self._log_compacting_path, self._log_path):
+            if not path.exists(log_path):
+                continue
+            logging.info(f"Replaying database log {log_path}")
+            with open(log_path, "r", encoding="utf-8") as log_io:
+                for line in log_io:
+                    try:
+                        record = json.loads(line)
+                        sequence = int(record["s"])
+                    except Exception:
+                        logging.warning(f"Skipping corrupted record in {log_path}: {line.strip()}")
+                        continue
+                    self._sequence = max(self._sequence, sequence)
+                    self._records_since_compaction += 1
+                    if sequence <= snapshot_sequence or record.get("id") not in statuses:
+                        continue
+                    statuses[record["id"]].push_new_status(
+                        bool(record["v"]), int(record["t"]), record.get("l"), int(record.get("w", 1))
+                    )
+                    replayed += 1
+        logging.info(f"Replayed {replayed} records")
+
+        # Compact replayed log
+        if self._records_since_compaction > 0:
+            self._compact()
+
+    def push(
+        self,
+        status: Status,
+        status_value: bool,
+        timestamp: int | None = None,
+        latency: float | None = None,
+        weight: int = 1,
+    ) -> None:
+        """Pushes result of check and assigns sequence number to its record under the same lock as compaction,
+        so snapshot contains check if and only if sequence number of its record is included into snapshot
+
+        Args:
+            status (Status): checked status
+            status_value (bool): check result
+            timestamp (int | None, optional): time of check. Defaults to now
+            latency (float | None, optional): duration of check in seconds. Defaults to None
+            weight (int, optional): number of samples this check represents. Defaults to 1
+        """
+        with self._lock:
+            status.push_new_status(status_value, timestamp, latency, weight)
+            self._append_record(status)
+
+    def record(self, status: Status) -> None:
+        """Appends last check of status into write buffer
+
+        Args:
+            status (Status): updated status
+        """
+        with self._lock:
+            self._append_record(status)
+
+    def save(self) -> None:
+        """Writes buffered records into log. Syncs log to disk at most every fsync_interval"""
+        with self._lock:
+            self._write_buffer()
+            if self._unsynced and monotonic() - self._time_synced >= self._fsync_interval:
+                self._sync()
+            compact = self._records_since_compaction >= self._compact_records
+
+        if compact:
+            self._compact_request.set()
+
+        # Start background sync / compaction thread on first save
+        if not self._thread.is_alive() and not self._exit_flag:
+            try:
+                self._thread.start()
+            except RuntimeError:
+                pass
+
+    def close(self) -> None:
+        """Writes and syncs pending records, compacts log and stops background thread"""
+        self._exit_flag = True
+        self._compact_request.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        with self._lock:
+            self._write_buffer()
+            if self._unsynced:
+                self._sync()
+        self._compact()
+        with self._lock:
+            if self._log_io is not None:
+                self._log_io.close()
+                self._log_io = None
+
+    def _append_record(self, status: Status) -> None:
+        """Assigns sequence number to the last check of status and buffers it (must be called with self._lock
+        acquired)
+
+        Args:
+            status (Status): updated status
+        """
+        record = status.get_last_check_dict()
+        if record is None:
+            return
+        self._sequence += 1
+        self._buffer.append(json.dumps({"s": self._sequence, "id": status.id, **record}, separators=(",", ":")) + "\n")
+
+    def _write_buffer(self) -> None:
+        """Writes buffered records into log file (must be called with self._lock acquired)"""
+        if not self._buffer:
+            return
+        if self._log_io is None:
+            self._log_io = open(self._log_path, "a+", encoding="utf-8")
+
+            # Terminate partially written record in case of previous crash
+            if self._log_io.tell() > 0:
+                self._log_io.seek(self._log_io.tell() - 1)
+                if self._log_io.read(1) != "\n":
+                    self._log_io.write("\n")
+        self._log_io.write("".join(self._buffer))
+        self._log_io.flush()
+        self._records_since_compaction += len(self._buffer)
+        logging.debug(f"Appended {len(self._buffer)} records to {self._log_path}")
+        self._buffer.clear()
+        self._unsynced = True
+
+    def _sync(self) -> None:
+        """Syncs log file to disk (must be called with self._lock acquired)"""
+        if self._log_io is not None:
+            os.fsync(self._log_io.fileno())
+        self._unsynced = False
+        self._time_synced = monotonic()
+
+    def _background_loop(self) -> None:
+        """Syncs log every fsync_interval and compacts it on request"""
+        while not self._exit_flag:
+            self._compact_request.wait(self._fsync_interval if self._fsync_interval > 0 else 1)
+            if self._exit_flag:
+                break
+            with self._lock:
+                if self._unsynced:
+                    self._sync()
+            if self._compact_request.is_set():
+                self._compact_request.clear()
+                try:
+                    self._compact()
+                except Exception as e:
+                    logging.error(f"Unable to compact database log: {e}", exc_info=e)
+
+    def _compact(self) -> None:
+        """Writes snapshot of current state and removes log records included into it"""
+        with self._lock:
+            # Cut log at current state
+            self._write_buffer()
+            if self._log_io is not None:
+                if self._unsynced:
+                    self._sync()
+                self._log_io.close()
+                self._log_io = None
+            if path.exists(self._log_path):
+                if path.exists(self._log_compacting_path):
+                    # Previous compaction failed. Keep its records
+                    with open(self._log_path, "r", encoding="utf-8") as log_io:
+                        records = log_io.read()
+                    with open(self._log_compacting_path, "a", encoding="utf-8") as log_io:
+                        log_io.write(records)
+                        log_io.flush()
+                        os.fsync(log_io.fileno())
+                    os.remove(self._log_path)
+                else:
+                    os.replace(self._log_path, self._log_compacting_path)
+            self._records_since_compaction = 0
+
+            # Serialize current state (statuses are changed by push() only with self._lock acquired)
+            snapshot: dict[str, Any] = {}
+            self._update(snapshot)
+            snapshot[SEQUENCE_KEY] = self._sequence
+
+        # Keep non-configured statuses
+        try:
+            database = self._read() or {}
+        except Exception as e:
+            logging.warning(f"Unable to load database snapshot from {self._database_path}: {e}")
+            database = {}
+        database.update(snapshot)
+
+        logging.info(f"Compacting database log into {self._database_path}")
+        write_atomic(self._database_path, json.dumps(database, ensure_ascii=False).encode("utf-8"))
+        if path.exists(self._log_compacting_path):
+            os.remove(self._log_compacting_path)
@@ -0,0 +1,230 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import logging
+import sqlite3
+from threading import Lock
+from time import time
+from typing import Any
+
+from simple_status_server.database import Database
+from simple_status_server.status import Status, latency_stats, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "raw_retention": "30d",
+    "hourly_retention": "365d",
+    "prune_interval": "1h",
+}
+
+ROLLUPS = {"hourly": 3600, "daily": 86400}
+
+# Queries with longer time range will read daily rollups instead of hourly
+HOURLY_QUERY_RANGE_MAX = 31 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    status_id TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    bar_start INTEGER NOT NULL,
+    latency INTEGER,
+    weight INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS checks_status_bar ON checks (status_id, bar_start, timestamp);
+CREATE TABLE IF NOT EXISTS rollup_hourly (
+    status_id TEXT NOT NULL,
+    time_start INTEGER NOT NULL,
+    checks INTEGER NOT NULL,
+    working INTEGER NOT NULL,
+    PRIMARY KEY (status_id, time_start)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_daily (
+    status_id TEXT NOT NULL,
+    time_start INTEGER NOT NULL,
+    checks INTEGER NOT NULL,
+    working INTEGER NOT NULL,
+    PRIMARY KEY (status_id, time_start)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteDatabase(Database):
+    def __init__(self, statuses: list[Status], database_path: str, config: dict[str, Any] | None = None) -> None:
+        """Time-series database. Keeps raw checks (with latency) for raw_retention
+        and rolls them up into hourly and daily tables
+
+        Args:
+            statuses (list[Status]): configured statuses
+            database_path (str): path to SQLite database file
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+        """
+        super().__init__(statuses, database_path)
+        if config is None:
+            config = {}
+        self._raw_retention = parse_time_cfg(config.get("raw_retention", CONFIG_DEFAULT["raw_retention"]))
+        self._hourly_retention = parse_time_cfg(config.get("hourly_retention", CONFIG_DEFAULT["hourly_retention"]))
+        self._prune_interval = parse_time_cfg(config.get("prune_interval", CONFIG_DEFAULT["prune_interval"]))
+
+        self._buffer: list[tuple[str, int, int, int, int | None, int]] = []
+        self._buffer_lock = Lock()
+        self._time_pruned = 0.0
+
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+        # Databases created before latency and weight were stored
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(checks)")]
+        for column, definition in (("latency", "INTEGER"), ("weight", "INTEGER NOT NULL DEFAULT 1")):
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE checks ADD COLUMN {column} {definition}")
+        self._connection.commit()
+
+    def load(self) -> None:
+        """Rebuilds state of each configured status from the last bars_max + 1 bars of raw checks"""
+        logging.info(f"Loading database from {self._database_path}")
+        with self._lock:
+            for status in self._statuses:
+                rows = self._connection.execute(
+                    "SELECT timestamp, value, bar_start, latency, weight FROM checks "
+                    "WHERE status_id = ? AND bar_start >= (SELECT MIN(bar_start) FROM "
+                    "(SELECT DISTINCT bar_start FROM checks WHERE status_id = ? ORDER BY bar_start DESC LIMIT ?)) "
+                    "ORDER BY bar_start, timestamp, rowid",
+                    (status.id, status.id, status.bars_max + 1),
+                ).fetchall()
+                if not rows:
+                    logging.debug(f"Status {status.id} doesn't exist in database. Skipping")
+                    continue
+
+                # Group checks into bars
+                bars: list[tuple[int, int, list[bool], list[int]]] = []
+                values_all: list[bool] = []
+                for timestamp, value, bar_start, latency, weight in rows:
+                    if not bars or bars[-1][0] != bar_start:
+                        bars.append((bar_start, timestamp, [], []))
+                    bars[-1] = (bar_start, timestamp, bars[-1][2] + [bool(value)] * weight, bars[-1][3])
+                    values_all += [bool(value)] * weight
+                    if latency is not None:
+                        bars[-1][3].append(latency)
+
+                status.timestamps = [(bar_start, bar_end) for bar_start, bar_end, _, _ in bars[:-1]]
+                status.data = [int(values.count(True) / len(values) * 100.0) for _, _, values, _ in bars[:-1]]
+                status.latency = [latency_stats(latencies) for _, _, _, latencies in bars[:-1]]
+                status.current_bar.from_dict(
+                    {"time_start": bars[-1][0], "time_end": bars[-1][1], "data": bars[-1][2], "latencies": bars[-1][3]}
+                )
+                status.status_values = values_all[-status.checks_per_bar :]
+
+                logging.debug(f"Loaded status {status.id} from database: {status.get_data_dict()}")
+
+    def record(self, status: Status) -> None:
+        """Appends last check of status into write buffer
+
+        Args:
+            status (Status): updated status
+        """
+        record = status.get_last_check_dict()
+        if record is None or status.current_bar.time_start is None:
+            return
+        latency = status.current_bar.latencies[-1] if "l" in record and status.current_bar.latencies else None
+        timestamp, value = int(record["t"]), int(record["v"])
+
+        # Weighted check can be split between closed bar and current one
+        weight = int(record.get("w", 1))
+        weight_current = min(len(status.current_bar.data), weight) if status.last_bar_closed else weight
+        with self._buffer_lock:
+            if weight_current < weight and status.timestamps:
+                bar_start, bar_end = status.timestamps[-1]
+                self._buffer.append((status.id, bar_end, value, bar_start, None, weight - weight_current))
+            self._buffer.append((status.id, timestamp, value, status.current_bar.time_start, latency, weight_current))
+
+    def save(self) -> None:
+        """Inserts buffered checks and updates rollups in a single transaction"""
+        with self._buffer_lock:
+            rows = self._buffer
+            self._buffer = []
+
+        with self._lock:
+            if rows:
+                logging.debug(f"Inserting {len(rows)} checks into {self._database_path}")
+                with self._connection:
+                    self._connection.executemany(
+                        "INSERT INTO checks (status_id, timestamp, value, bar_start, latency, weight) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    for rollup, period in ROLLUPS.items():
+                        self._connection.executemany(
+                            f"INSERT INTO rollup_{rollup} VALUES (?, ?, ?, ?) ON CONFLICT (status_id, time_start) "
+                            "DO UPDATE SET checks = checks + excluded.checks, working = working + excluded.working",
+                            [
+                                (status_id, timestamp - timestamp % period, weight, value * weight)
+                                for status_id, timestamp, value, _, _, weight in rows
+                            ],
+                        )
+
+            if time() - self._time_pruned >= self._prune_interval:
+                self._prune()
+
+    def close(self) -> None:
+        """Writes pending checks and closes database"""
+        self.save()
+        with self._lock:
+            self._connection.close()
+
+    def query_uptime(self, status_id: str, time_from: int, time_to: int) -> tuple[int, list[tuple[int, int, int]]]:
+        """Reads rolled up checks (served by /uptime). Ranges longer than HOURLY_QUERY_RANGE_MAX are read
+        from daily rollups. Checks that are not saved yet are not included
+
+        Args:
+            status_id (str): ID of status
+            time_from (int): start of range (unix time, inclusive)
+            time_to (int): end of range (unix time, exclusive)
+
+        Returns:
+            tuple[int, list[tuple[int, int, int]]]: duration of each bucket in seconds and list of
+            (bucket start time, number of checks, number of working checks)
+        """
+        rollup = "hourly" if time_to - time_from <= HOURLY_QUERY_RANGE_MAX else "daily"
+        period = ROLLUPS[rollup]
+        with self._lock:
+            buckets = self._connection.execute(
+                f"SELECT time_start, checks, working FROM rollup_{rollup} "
+                "WHERE status_id = ? AND time_start >= ? AND time_start < ? ORDER BY time_start",
+                (status_id, time_from - time_from % period, time_to),
+            ).fetchall()
+        return period, buckets
+
+    def _prune(self) -> None:
+        """Removes raw checks and hourly rollups older than retention (must be called with self._lock acquired).
+        Raw checks needed to rebuild bars_max bars are always kept"""
+        time_current = int(time())
+        with self._connection:
+            for status in self._statuses:
+                retention = max(self._raw_retention, status.interval * status.checks_per_bar * (status.bars_max + 1))
+                self._connection.execute(
+                    "DELETE FROM checks WHERE status_id = ? AND bar_start < ?", (status.id, time_current - retention)
+                )
+            self._connection.execute(
+                "DELETE FROM rollup_hourly WHERE time_start < ?", (time_current - self._hourly_retention,)
+            )
+        self._time_pruned = time()
+        logging.debug(f"Pruned {self._database_path}")
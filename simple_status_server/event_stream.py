@@ -0,0 +1,236 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import json
+import logging
+from threading import Thread
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.status import parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "max_subscribers": 10000,
+    "queue_size": 256,
+    "keepalive_interval": "30s",
+}
+
+# Maximum size of request head
+REQUEST_HEAD_MAX = 8192
+
+RESPONSE_HEAD = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Cache-Control: no-cache\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Connection: keep-alive\r\n\r\n"
+)
+
+
+def _format_event(event: str, data: str) -> bytes:
+    """Formats Server-Sent Event
+
+    Args:
+        event (str): event name
+        data (str): single-line data
+
+    Returns:
+        bytes: encoded event
+    """
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _disconnect(queue: asyncio.Queue) -> None:
+    """Puts disconnect marker into subscriber's queue (the oldest event is dropped if queue is full)
+
+    Args:
+        queue (asyncio.Queue): queue of subscriber
+    """
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(None)
+
+
+class EventStream:
+    def __init__(
+        self, response_cache: ResponseCache, api_key: str | None, config: dict[str, Any] | None = None
+    ) -> None:
+        """Server-Sent Events server. Each subscriber receives snapshot of all data after connecting
+        and then only deltas of updated statuses. All subscribers are served from a single event loop
+
+        Args:
+            response_cache (ResponseCache): serialized API data for snapshots
+            api_key (str | None): if set, subscribers must provide it as apiKey query parameter
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._response_cache = response_cache
+        self._api_key = api_key
+        self._max_subscribers = int(config.get("max_subscribers", CONFIG_DEFAULT["max_subscribers"]))
+        self._queue_size = int(config.get("queue_size", CONFIG_DEFAULT["queue_size"]))
+        self._keepalive_interval = parse_time_cfg(
+            config.get("keepalive_interval", CONFIG_DEFAULT["keepalive_interval"])
+        )
+
+        self._subscribers: set[asyncio.Queue] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.Server | None = None
+        self._thread: Thread | None = None
+
+    def start(self, host: str, port: int) -> None:
+        """Starts events server in a background thread
+
+        Args:
+            host (str): server's host (IP)
+            port (int): server's port
+        """
+        logging.info(f"Starting events server on {host}:{port}")
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, host, port))
+        self._thread = Thread(target=self._loop.run_forever, name="event-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops events server and disconnects all subscribers"""
+        if self._loop is None or self._thread is None:
+            return
+        logging.info("Stopping events server")
+
+        async def _close() -> None:
+            if self._server is not None:
+                self._server.close()
+            for queue in self._subscribers:
+                _disconnect(queue)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+    def publish(self, status_id: str, delta: dict[str, Any]) -> None:
+        """Sends status delta to all subscribers (thread-safe)
+
+        Args:
+            status_id (str): ID of updated status
+            delta (dict[str, Any]): see Status.get_delta_dict()
+        """
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        event = _format_event(
+            "delta", json.dumps({"id": status_id, **delta}, ensure_ascii=False, separators=(",", ":"))
+        )
+        try:
+            loop.call_soon_threadsafe(self._broadcast, event)
+        except RuntimeError:
+            pass
+
+    def _broadcast(self, event: bytes) -> None:
+        """Puts event into queue of each subscriber. Slow subscribers are disconnected
+
+        Args:
+            event (bytes): formatted event
+        """
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                _disconnect(queue)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles single subscriber
+
+        Args:
+            reader (asyncio.StreamReader): connection's reader
+            writer (asyncio.StreamWriter): connection's writer
+        """
+        queue: asyncio.Queue | None = None
+        try:
+            # Read request
+            try:
+                async with asyncio.timeout(10):
+                    head = await reader.readuntil(b"\r\n\r\n")
+            except (TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            if len(head) > REQUEST_HEAD_MAX:
+                return
+            request_line = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+            if len(request_line) != 3 or request_line[0] != "GET":
+                writer.write(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+            url_parts = urlsplit(request_line[1])
+            if url_parts.path != "/events":
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+
+            # Check API key
+            peer = writer.get_extra_info("peername")
+            if self._api_key:
+                request_api_key = parse_qs(url_parts.query).get("apiKey", [None])[0]
+                if request_api_key != self._api_key:
+                    logging.warning(f"User {peer} provided wrong api key: {request_api_key}")
+                    writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    return
+
+            if len(self._subscribers) >= self._max_subscribers:
+                writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                return
+
+            # Subscribe before sending snapshot to not miss any delta
+            queue = asyncio.Queue(self._queue_size)
+            self._subscribers.add(queue)
+            logging.debug(f"New subscriber {peer}. Total subscribers: {len(self._subscribers)}")
+
+            # Serialization and compression of changed data must not block other subscribers
+            _, variants = await asyncio.get_running_loop().run_in_executor(None, self._response_cache.get)
+            writer.write(RESPONSE_HEAD)
+            writer.write(_format_event("snapshot", variants["identity"].decode("utf-8")))
+            await writer.drain()
+
+            # Send events
+            while True:
+                try:
+                    async with asyncio.timeout(self._keepalive_interval):
+                        event = await queue.get()
+                except TimeoutError:
+                    event = b": keepalive\n\n"
+                if event is None:
+                    break
+                writer.write(event)
+                await writer.drain()
+
+        except (ConnectionError, OSError):
+            pass
+
+        finally:
+            if queue is not None:
+                self._subscribers.discard(queue)
+                logging.debug(f"Subscriber disconnected. Total subscribers: {len(self._subscribers)}")
+            try:
+                writer.close()
+            except Exception:
+                pass
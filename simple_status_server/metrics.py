@@ -0,0 +1,251 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import hashlib
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable
+
+# Upper bounds of histogram buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PREFIX = "simple_status_server_"
+
+
+def _escape(value: str) -> str:
+    """Escapes Prometheus label value
+
+    Args:
+        value (str): raw label value
+
+    Returns:
+        str: escaped value
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """
+    Args:
+        labels (tuple[tuple[str, str], ...]): (name, value) pairs
+
+    Returns:
+        str: formatted labels without braces
+    """
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS) -> None:
+        """Fixed-size histogram (memory doesn't depend on number of observations)
+
+        Args:
+            buckets (tuple[float, ...], optional): sorted upper bounds of buckets. Defaults to BUCKETS
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Adds single observation
+
+        Args:
+            value (float): observed value
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: tuple[tuple[str, str], ...]) -> list[str]:
+        """
+        Args:
+            name (str): metric name
+            labels (tuple[tuple[str, str], ...]): metric labels
+
+        Returns:
+            list[str]: lines in Prometheus text format
+        """
+        labels_str = _labels(labels)
+        separator = "," if labels_str else ""
+        braces = f"{{{labels_str}}}" if labels_str else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            bound_str = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels_str}{separator}le="{bound_str}"}} {cumulative}')
+        lines.append(f"{name}_sum{braces} {self.sum}")
+        lines.append(f"{name}_count{braces} {self.count}")
+        return lines
+
+
+class Metrics:
+    def __init__(
+        self, extra_callback: Callable[[], str] | None = None, labels: tuple[tuple[str, str], ...] = ()
+    ) -> None:
+        """Collects checks, database and API metrics and renders them in Prometheus text format
+
+        Args:
+            extra_callback (Callable[[], str] | None, optional): returns rendered metrics of another process
+            to append (ex. checks of main process in server workers). Defaults to None
+            labels (tuple[tuple[str, str], ...], optional): labels added to all metrics of this instance
+            (ex. index of server worker, so series of different workers don't mix). Defaults to ()
+        """
+        self._extra_callback = extra_callback
+        self._labels = labels
+        self._lock = Lock()
+
+        # Metric name -> (help, type, {labels: Histogram or counter value})
+        self._metrics: dict[str, tuple[str, str, dict[tuple[tuple[str, str], ...], Histogram | float]]] = {}
+
+    def observe_check(
+        self,
+        status_id: str,
+        type_name: str,
+        duration: float,
+        lag: float,
+        result: bool,
+        error_class: str | None,
+    ) -> None:
+        """Records single check
+
+        Args:
+            status_id (str): ID of status
+            type_name (str): type of status
+            duration (float): check time in seconds
+            lag (float): delay between scheduled and actual start of check in seconds
+            result (bool): check result
+            error_class (str | None): type of error if check failed
+        """
+        with self._lock:
+            self._observe("check_duration_seconds", "Check duration per status", (("status", status_id),), duration)
+            self._observe("check_type_duration_seconds", "Check duration per type", (("type", type_name),), duration)
+            self._observe("check_lag_seconds", "Check scheduling lag per status", (("status", status_id),), lag)
+            self._observe("check_type_lag_seconds", "Check scheduling lag per type", (("type", type_name),), lag)
+            self._increment(
+                "checks_total", "Number of checks", (("status", status_id), ("result", str(result).lower()))
+            )
+            if not result:
+                self._increment(
+                    "check_errors_total",
+                    "Number of failed checks per error class",
+                    (("status", status_id), ("type", type_name), ("error", error_class or "unknown")),
+                )
+
+    def observe_skipped_check(self, status_id: str) -> None:
+        """Records check that was skipped because of failed dependency
+
+        Args:
+            status_id (str): ID of status
+        """
+        with self._lock:
+            self._increment(
+                "checks_skipped_total",
+                "Number of checks skipped because of failed dependency",
+                (("status", status_id),),
+            )
+
+    def observe_database_save(self, duration: float, changes: int) -> None:
+        """Records single database save
+
+        Args:
+            duration (float): save time in seconds
+            changes (int): number of checks saved
+        """
+        with self._lock:
+            self._observe("database_save_seconds", "Database save duration", (), duration)
+            self._increment("database_saved_changes_total", "Number of checks saved into database", (), changes)
+
+    def observe_request(self, endpoint: str, method: str, duration: float) -> None:
+        """Records single API request
+
+        Args:
+            endpoint (str): name of endpoint
+            method (str): HTTP method
+            duration (float): serve time in seconds
+        """
+        with self._lock:
+            self._observe(
+                "request_seconds", "API request serve time", (("endpoint", endpoint), ("method", method)), duration
+            )
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: all metrics in Prometheus text format
+        """
+        lines = []
+        with self._lock:
+            for name, (help_, type_, values) in self._metrics.items():
+                full_name = PREFIX + name
+                lines.append(f"# HELP {full_name} {help_}")
+                lines.append(f"# TYPE {full_name} {type_}")
+                for labels, value in values.items():
+                    if isinstance(value, Histogram):
+                        lines.extend(value.render(full_name, labels))
+                    elif labels:
+                        lines.append(f"{full_name}{{{_labels(labels)}}} {value}")
+                    else:
+                        lines.append(f"{full_name} {value}")
+        rendered = "\n".join(lines) + "\n" if lines else ""
+        if self._extra_callback is not None:
+            rendered += self._extra_callback()
+        return rendered
+
+    def get(self) -> tuple[str, dict[str, bytes]]:
+        """Renders metrics in ResponseCache.get() format (to publish them using SnapshotPublisher)
+
+        Returns:
+            tuple[str, dict[str, bytes]]: ETag (without quotes) and {"identity": metrics in Prometheus text format}
+        """
+        body = self.render().encode("utf-8")
+        return hashlib.sha256(body).hexdigest()[:32], {"identity": body}
+
+    def _observe(self, name: str, help_: str, labels: tuple[tuple[str, str], ...], value: float) -> None:
+        """Adds observation into histogram (must be called with self._lock acquired)
+
+        Args:
+            name (str): metric name without prefix
+            help_ (str): metric description
+            labels (tuple[tuple[str, str], ...]): metric labels
+            value (float): observed value
+        """
+        values = self._metrics.setdefault(name, (help_, "histogram", {}))[2]
+        labels = self._labels + labels
+        histogram = values.get(labels)
+        if not isinstance(histogram, Histogram):
+            histogram = Histogram()
+            values[labels] = histogram
+        histogram.observe(value)
+
+    def _increment(self, name: str, help_: str, labels: tuple[tuple[str, str], ...], value: float = 1) -> None:
+        """Increments counter (must be called with self._lock acquired)
+
+        Args:
+            name (str): metric name without prefix
+            help_ (str): metric description
+            labels (tuple[tuple[str, str], ...]): metric labels
+            value (float, optional): increment. Defaults to 1
+        """
+        values = self._metrics.setdefault(name, (help_, "counter", {}))[2]
+        labels = self._labels + labels
+        counter = values.get(labels, 0)
+        values[labels] = (counter if not isinstance(counter, Histogram) else 0) + value
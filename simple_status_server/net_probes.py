@@ -0,0 +1,410 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import calendar
+import logging
+import socket
+import ssl
+from time import monotonic, perf_counter, time
+from typing import Any, Callable
+from weakref import WeakKeyDictionary
+
+from simple_status_server.probe import Probe, ProbeResult
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "tcp": {
+        "cache_ttl": "1m",
+    },
+    "tls": {
+        "cache_ttl": "1m",
+        "verify": True,
+        "ca_file": None,
+        "expiry_min": "7d",
+    },
+    "dns": {},
+}
+
+# getaddrinfo() result: (family, type, proto, canonname, sockaddr)
+_AddrInfo = tuple[Any, ...]
+
+
+def split_host_port(target: str, default_port: int | None = None) -> tuple[str, int]:
+    """Parses target of tcp / tls status
+    >>> split_host_port("example.com:8443"), split_host_port("[::1]:22"), split_host_port("example.com", 443)
+    (('example.com', 8443), ('::1', 22), ('example.com', 443))
+
+    Args:
+        target (str): host:port ([host]:port for IPv6)
+        default_port (int | None, optional): port if target has no port. Defaults to None (port is required)
+
+    Raises:
+        ValueError: in case of wrong format
+
+    Returns:
+        tuple[str, int]: host and port
+    """
+    target = target.strip()
+    if target.startswith("["):
+        host, _, port_str = target[1:].partition("]")
+        port_str = port_str.removeprefix(":")
+    elif target.count(":") == 1:
+        host, _, port_str = target.partition(":")
+    else:
+        host, port_str = target, ""
+
+    if not port_str:
+        if default_port is None:
+            raise ValueError(f"No port in {target}. Expected host:port")
+        return host, default_port
+    port = int(port_str)
+    if not host or port < 1 or port > 65535:
+        raise ValueError(f"Wrong target: {target}. Expected host:port")
+    return host, port
+
+
+def certificate_not_after(certificate: bytes) -> float:
+    """Reads expiry time of certificate without verifying it (getpeercert() returns only binary certificate
+    if verification is disabled)
+
+    Args:
+        certificate (bytes): DER-encoded X.509 certificate
+
+    Raises:
+        ValueError: if certificate can't be parsed
+
+    Returns:
+        float: notAfter as unix time
+    """
+
+    def _read(offset: int) -> tuple[int, int, int]:
+        """Reads DER tag and length at offset and returns tag, offset of value and offset of the next element"""
+        if offset + 2 > len(certificate):
+            raise ValueError("Certificate is truncated")
+        tag, length = certificate[offset], certificate[offset + 1]
+        offset += 2
+        if length & 0x80:
+            length_size = length & 0x7F
+            length = int.from_bytes(certificate[offset : offset + length_size], "big")
+            offset += length_size
+        if offset + length > len(certificate):
+            raise ValueError("Certificate is truncated")
+        return tag, offset, offset + length
+
+    # Certificate -> tbsCertificate -> [version], serialNumber, signature, issuer, validity -> notBefore, notAfter
+    _, tbs_offset, _ = _read(0)
+    _, offset, _ = _read(tbs_offset)
+    tag, _, next_offset = _read(offset)
+    if tag == 0xA0:
+        _, _, next_offset = _read(next_offset)
+    for _ in range(2):
+        _, _, next_offset = _read(next_offset)
+    _, validity_offset, _ = _read(next_offset)
+    _, _, not_before_end = _read(validity_offset)
+    tag, offset, next_offset = _read(not_before_end)
+
+    value = certificate[offset:next_offset].decode("ascii").removesuffix("Z")
+    if tag == 0x17:
+        # UTCTime (YYMMDDHHMMSS)
+        year = int(value[:2])
+        value = str(year + (1900 if year >= 50 else 2000)) + value[2:]
+    elif tag != 0x18:
+        raise ValueError(f"Unknown time type: {tag}")
+    if len(value) < 14 or not value[:14].isdigit():
+        raise ValueError(f"Wrong time format: {value}")
+    return float(
+        calendar.timegm(
+            (int(value[:4]), int(value[4:6]), int(value[6:8]), int(value[8:10]), int(value[10:12]), int(value[12:14]))
+        )
+    )
+
+
+class Resolver:
+    def __init__(self) -> None:
+        """Non-blocking resolver (getaddrinfo() in default executor) with cache of results shared by tcp, tls
+        and dns checks running in the same event loop (see get_resolver()).
+        Simultaneous lookups of the same host are merged into one"""
+        # Host -> (time resolved (monotonic), addresses)
+        self._cache: dict[str, tuple[float, list[_AddrInfo]]] = {}
+        self._lookups: dict[str, asyncio.Future] = {}
+
+    async def resolve(self, host: str, max_age: float) -> tuple[list[_AddrInfo], bool]:
+        """Resolves host (must be called from the same event loop every time)
+
+        Args:
+            host (str): host name or IP address
+            max_age (float): maximum age of cached result in seconds (0 - always resolve)
+
+        Raises:
+            socket.gaierror: if host can't be resolved
+
+        Returns:
+            tuple[list[_AddrInfo], bool]: addresses (with port 0) and True if they were taken from cache
+        """
+        cached = self._cache.get(host)
+        if cached is not None and max_age > 0 and monotonic() - cached[0] < max_age:
+            return cached[1], True
+
+        lookup = self._lookups.get(host)
+        if lookup is None:
+            loop = asyncio.get_running_loop()
+            lookup = asyncio.ensure_future(loop.getaddrinfo(host, 0, type=socket.SOCK_STREAM))
+            self._lookups[host] = lookup
+            lookup.add_done_callback(lambda _: self._lookup_done(host, lookup))
+        addresses = await asyncio.shield(lookup)
+        return addresses, False
+
+    def expire(self, host: str) -> None:
+        """Removes cached addresses (ex. if none of them is reachable)
+
+        Args:
+            host (str): host name
+        """
+        self._cache.pop(host, None)
+
+    def close(self) -> None:
+        """Cancels pending lookups and clears cache"""
+        for lookup in list(self._lookups.values()):
+            lookup.cancel()
+        self._lookups.clear()
+        self._cache.clear()
+
+    def _lookup_done(self, host: str, lookup: asyncio.Future) -> None:
+        """Caches result of lookup (even if all checks waiting for it were cancelled)
+
+        Args:
+            host (str): resolved host
+            lookup (asyncio.Future): finished getaddrinfo() call
+        """
+        self._lookups.pop(host, None)
+        if not lookup.cancelled() and lookup.exception() is None:
+            self._cache[host] = (monotonic(), lookup.result())
+
+
+class _SocketProbe(Probe):
+    latency = True
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """Base of tcp and tls probes: resolves target using shared resolver and connects
+        to its addresses one by one using non-blocking socket"""
+        super().__init__(config, trigger)
+        self._resolver: Resolver | None = None
+
+    async def start(self, statuses: list[Status]) -> None:
+        self._resolver = get_resolver()
+
+    async def close(self) -> None:
+        self._resolver = None
+        release_resolver()
+
+    async def _connect(self, host: str, port: int, cache_ttl: float, timings: list[str]) -> socket.socket:
+        """Resolves host and opens TCP connection to the first reachable address
+
+        Args:
+            host (str): host name or IP address
+            port (int): TCP port
+            cache_ttl (float): maximum age of cached addresses in seconds
+            timings (list[str]): resolve and connect time are appended into it
+
+        Returns:
+            socket.socket: connected non-blocking socket
+        """
+        time_start = perf_counter()
+        # Resolver shared by probes of this event loop (taken in start())
+        resolver = self._resolver
+        if resolver is None:
+            resolver = get_resolver()
+        addresses, cached = await resolver.resolve(host, cache_ttl)
+        timings.append(f"resolve {'cached' if cached else _format_ms(perf_counter() - time_start)}")
+
+        loop = asyncio.get_running_loop()
+        error: OSError | None = None
+        for family, type_, proto, _, address in addresses:
+            sock = socket.socket(family, type_, proto)
+            sock.setblocking(False)
+            time_start = perf_counter()
+            try:
+                await loop.sock_connect(sock, (address[0], port, *address[2:]))
+            except OSError as e:
+                sock.close()
+                error = e
+                continue
+            except BaseException:
+                sock.close()
+                raise
+            timings.append(f"connect {_format_ms(perf_counter() - time_start)} ({address[0]})")
+            return sock
+
+        resolver.expire(host)
+        raise error if error is not None else OSError(f"No addresses of {host}")
+
+
+class TcpProbe(_SocketProbe):
+    concurrency = 256
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'tcp' type. Checks if TCP port accepts connections. Target: host:port"""
+        super().__init__(config, trigger)
+        self._cache_ttl = parse_time_cfg(config.get("cache_ttl", CONFIG_DEFAULT["tcp"]["cache_ttl"]))
+
+    async def probe(self, status: Status) -> ProbeResult:
+        timings: list[str] = []
+        try:
+            host, port = split_host_port(str(status.target))
+            async with asyncio.timeout(status.target_timeout):
+                time_start = perf_counter()
+                sock = await self._connect(host, port, self._cache_ttl, timings)
+                latency = perf_counter() - time_start
+            sock.close()
+        except TimeoutError:
+            return ProbeResult(False, "timeout", details=", ".join(timings))
+        except socket.gaierror as e:
+            return ProbeResult(False, "resolve", details=str(e))
+        except ValueError as e:
+            return ProbeResult(False, "target", details=str(e))
+        except OSError as e:
+            return ProbeResult(False, "connection", details=", ".join(timings + [str(e)]))
+        return ProbeResult(True, latency=latency, details=", ".join(timings))
+
+
+class TlsProbe(_SocketProbe):
+    concurrency = 64
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'tls' type. Checks if TLS handshake succeeds and certificate doesn't expire within expiry_min.
+        Target: host:port (port defaults to 443)"""
+        super().__init__(config, trigger)
+        self._cache_ttl = parse_time_cfg(config.get("cache_ttl", CONFIG_DEFAULT["tls"]["cache_ttl"]))
+        self._expiry_min = parse_time_cfg(config.get("expiry_min", CONFIG_DEFAULT["tls"]["expiry_min"]))
+        self._ssl_context = ssl.create_default_context(cafile=config.get("ca_file", CONFIG_DEFAULT["tls"]["ca_file"]))
+        if not config.get("verify", CONFIG_DEFAULT["tls"]["verify"]):
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+
+    async def probe(self, status: Status) -> ProbeResult:
+        timings: list[str] = []
+        try:
+            host, port = split_host_port(str(status.target), 443)
+            async with asyncio.timeout(status.target_timeout):
+                time_start = perf_counter()
+                sock = await self._connect(host, port, self._cache_ttl, timings)
+                time_handshake = perf_counter()
+                try:
+                    _, writer = await asyncio.open_connection(sock=sock, ssl=self._ssl_context, server_hostname=host)
+                except BaseException:
+                    sock.close()
+                    raise
+                latency = perf_counter() - time_start
+            timings.append(f"handshake {_format_ms(perf_counter() - time_handshake)}")
+            ssl_object = writer.get_extra_info("ssl_object")
+            certificate = ssl_object.getpeercert(binary_form=True) if ssl_object is not None else None
+            writer.transport.abort()
+        except TimeoutError:
+            return ProbeResult(False, "timeout", details=", ".join(timings))
+        except socket.gaierror as e:
+            return ProbeResult(False, "resolve", details=str(e))
+        except ssl.SSLError as e:
+            return ProbeResult(False, "tls", details=", ".join(timings + [str(e)]))
+        except ValueError as e:
+            return ProbeResult(False, "target", details=str(e))
+        except OSError as e:
+            return ProbeResult(False, "connection", details=", ".join(timings + [str(e)]))
+
+        # Binary certificate is available even if it's not verified
+        if certificate:
+            try:
+                expires_in = certificate_not_after(certificate) - time()
+            except ValueError as e:
+                return ProbeResult(False, "certificate", latency, ", ".join(timings + [str(e)]))
+            timings.append(f"certificate expires in {expires_in / 86400:.1f} days")
+            if expires_in < self._expiry_min:
+                logging.warning(f"Certificate of {status.target} expires in {expires_in / 86400:.1f} days")
+                return ProbeResult(False, "expiring", latency, ", ".join(timings))
+        return ProbeResult(True, latency=latency, details=", ".join(timings))
+
+
+class DnsProbe(Probe):
+    latency = True
+    concurrency = 64
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'dns' type. Checks if host name resolves (bypassing cache) and updates shared resolver cache.
+        Target: host name"""
+        super().__init__(config, trigger)
+        self._resolver: Resolver | None = None
+
+    async def start(self, statuses: list[Status]) -> None:
+        self._resolver = get_resolver()
+
+    async def close(self) -> None:
+        self._resolver = None
+        release_resolver()
+
+    async def probe(self, status: Status) -> ProbeResult:
+        try:
+            async with asyncio.timeout(status.target_timeout):
+                time_start = perf_counter()
+                resolver = self._resolver
+                if resolver is None:
+                    resolver = get_resolver()
+                addresses, _ = await resolver.resolve(str(status.target).strip(), 0)
+                latency = perf_counter() - time_start
+        except TimeoutError:
+            return ProbeResult(False, "timeout")
+        except socket.gaierror as e:
+            return ProbeResult(False, "resolve", details=str(e))
+        if not addresses:
+            return ProbeResult(False, "resolve", latency)
+        unique_addresses = dict.fromkeys(address[4][0] for address in addresses)
+        return ProbeResult(True, latency=latency, details=f"{_format_ms(latency)}: {', '.join(unique_addresses)}")
+
+
+# Event loop -> resolver of probes running in it (each scheduler / probe thread has its own loop)
+_resolvers: "WeakKeyDictionary[asyncio.AbstractEventLoop, Resolver]" = WeakKeyDictionary()
+
+
+def get_resolver() -> Resolver:
+    """Must be called from event loop (ex. in Probe.start())
+
+    Returns:
+        Resolver: resolver shared by tcp, tls and dns probes running in the current event loop
+    """
+    loop = asyncio.get_running_loop()
+    resolver = _resolvers.get(loop)
+    if resolver is None:
+        resolver = Resolver()
+        _resolvers[loop] = resolver
+    return resolver
+
+
+def release_resolver() -> None:
+    """Closes resolver of the current event loop (ex. in Probe.close(), probes of the loop are closed together)"""
+    resolver = _resolvers.pop(asyncio.get_running_loop(), None)
+    if resolver is not None:
+        resolver.close()
+
+
+def _format_ms(seconds: float) -> str:
+    """
+    >>> _format_ms(0.0123456)
+    '12.35ms'
+    """
+    return f"{seconds * 1000:.2f}ms"
@@ -0,0 +1,276 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import logging
+import math
+from os import path
+from threading import Lock
+from time import localtime, perf_counter, strftime
+from typing import Any
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from simple_status_server.response_cache import ResponseCache, build_variants
+from simple_status_server.shared_snapshot import SnapshotReader
+
+STATIC_DIR = path.abspath(path.join(path.dirname(__file__), "static"))
+TEMPLATES_DIR = path.abspath(path.join(path.dirname(__file__), "templates"))
+
+# Colormaps used by the page (JSON object in "const data = ...;" line)
+COLORMAPS_PATH = path.join(STATIC_DIR, "scripts", "js-colormaps.js")
+COLORMAPS_PREFIX = "const data = "
+
+# Size of each bar in SVG units (bar takes BAR_FILL of its slot, the same as Chart.js bar chart)
+BAR_WIDTH = 10
+BAR_HEIGHT = 40
+BAR_FILL = 0.72
+
+BAR_COLOR_EMPTY = "rgba(0, 0, 0, 0.2)"
+LATENCY_COLOR = "rgba(255, 255, 255, 0.6)"
+
+
+def load_colormap(name: str) -> tuple[bool, list[list[float]]]:
+    """Reads colormap from js-colormaps.js, so page rendered on server has the same colors as in browser
+
+    Args:
+        name (str): name of colormap (without "_r")
+
+    Returns:
+        tuple[bool, list[list[float]]]: True if colors must be interpolated and list of [r, g, b] colors (0-1)
+    """
+    with open(COLORMAPS_PATH, "r", encoding="utf-8") as colormaps_io:
+        for line in colormaps_io:
+            if line.startswith(COLORMAPS_PREFIX):
+                colormaps = json.loads(line[len(COLORMAPS_PREFIX) :].strip().rstrip(";"))
+                break
+        else:
+            raise Exception(f"No colormaps found in {COLORMAPS_PATH}")
+    if name not in colormaps:
+        raise Exception(f"Colormap {name} doesn't exist")
+    return bool(colormaps[name]["interpolate"]), colormaps[name]["colors"]
+
+
+def evaluate_colormap(x: float, interpolate: bool, colors: list[list[float]], reverse: bool) -> tuple[int, int, int]:
+    """Python version of evaluate_cmap() from js-colormaps.js
+    >>> colors = [[0.0, 0.0, 0.0], [1.0, 0.5, 0.0]]
+    >>> evaluate_colormap(0.0, True, colors, False), evaluate_colormap(0.5, True, colors, False)
+    ((0, 0, 0), (128, 64, 0))
+    >>> evaluate_colormap(0.0, False, colors, True)
+    (255, 128, 0)
+
+    Args:
+        x (float): value to evaluate colormap at (0-1)
+        interpolate (bool): see load_colormap()
+        colors (list[list[float]]): see load_colormap()
+        reverse (bool): evaluate colormap at 1 - x
+
+    Returns:
+        tuple[int, int, int]: (r, g, b) color (0-255)
+    """
+    x = min(max(x, 0.0), 1.0)
+    if reverse:
+        x = 1 - x
+
+    # Average of two nearest colors
+    if interpolate:
+        low = colors[math.floor(x * (len(colors) - 1))]
+        high = colors[math.ceil(x * (len(colors) - 1))]
+        return (
+            _round_js((low[0] + high[0]) / 2 * 255),
+            _round_js((low[1] + high[1]) / 2 * 255),
+            _round_js((low[2] + high[2]) / 2 * 255),
+        )
+
+    # Qualitative colormap
+    index = 0
+    while x > (index + 1) / len(colors):
+        index += 1
+    return _round_js(colors[index][0] * 255), _round_js(colors[index][1] * 255), _round_js(colors[index][2] * 255)
+
+
+def _round_js(value: float) -> int:
+    """
+    Args:
+        value (float): value to round
+
+    Returns:
+        int: value rounded half up (like Math.round() does)
+    """
+    return math.floor(value + 0.5)
+
+
+def format_timestamp(timestamp: int) -> str:
+    """
+    Args:
+        timestamp (int): unix time
+
+    Returns:
+        str: server's local time in the same format as on the page (DD.MM.YYYY HH:MM:SS)
+    """
+    return strftime("%d.%m.%Y %H:%M:%S", localtime(timestamp))
+
+
+class PageRenderer:
+    def __init__(
+        self,
+        page_title: str,
+        page_description: str | None,
+        last_check_text: str,
+        color_palette: str,
+        extra_css: str | None,
+        refresh_interval: int = 60,
+    ) -> None:
+        """Renders entire status page with inline SVG bars (works without JavaScript)
+
+        Args:
+            page_title (str): title of page
+            page_description (str | None): description under title
+            last_check_text (str): text before time of the last check
+            color_palette (str): name of colormap from js-colormaps.js ("_r" suffix reverses it)
+            extra_css (str | None): extra CSS to include into page
+            refresh_interval (int, optional): page reload interval in seconds. Defaults to 60
+        """
+        self._page_title = page_title
+        self._page_description = page_description if page_description else ""
+        self._last_check_text = last_check_text
+        self._extra_css = extra_css if extra_css else ""
+        self._refresh_interval = refresh_interval
+
+        # The same as renderer.js (palettes without "_r" are evaluated in reverse)
+        self._palette_reverse = not color_palette.endswith("_r")
+        self._palette_interpolate, self._palette_colors = load_colormap(color_palette.removesuffix("_r"))
+
+        with open(path.join(STATIC_DIR, "styles", "stylesheet.css"), "r", encoding="utf-8") as stylesheet_io:
+            self._stylesheet = stylesheet_io.read()
+        environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=select_autoescape())
+        self._template = environment.get_template("page.html")
+
+    def render(self, api_data: dict[str, dict[str, Any]]) -> str:
+        """
+        Args:
+            api_data (dict[str, dict[str, Any]]): data of all statuses (see Status.get_data_dict())
+
+        Returns:
+            str: HTML page
+        """
+        return self._template.render(
+            page_title=self._page_title,
+            page_description=self._page_description,
+            stylesheet=self._stylesheet,
+            extra_css=self._extra_css,
+            refresh_interval=self._refresh_interval,
+            statuses=[self._status_context(status_id, data_dict) for status_id, data_dict in api_data.items()],
+        )
+
+    def _status_context(self, status_id: str, data_dict: dict[str, Any]) -> dict[str, Any]:
+        """Prepares single status for template
+
+        Args:
+            status_id (str): ID of status
+            data_dict (dict[str, Any]): see Status.get_data_dict()
+
+        Returns:
+            dict[str, Any]: values and SVG bars of status
+        """
+        timestamps = data_dict.get("timestamps", [])
+        data = data_dict.get("data", [])
+        latency = data_dict.get("latency")
+
+        status = data_dict.get("status", 1)
+        context = {
+            "id": status_id,
+            "label": data_dict.get("label") or status_id,
+            "status_text": data_dict.get("status_text") or "-",
+            "status_class": "not-working" if status <= 0 else "problems" if status == 1 else "working",
+            "last_check": f"{self._last_check_text} {format_timestamp(timestamps[-1][1])}" if timestamps else "",
+            "uptime": f"{sum(data) / len(data):.1f}%" if data else "",
+        }
+
+        # Bars (the oldest ones are empty if there's not enough data yet)
+        bars_count = max(int(data_dict.get("bars_max", 0)), len(data))
+        offset = bars_count - len(data)
+        bar_margin = BAR_WIDTH * (1 - BAR_FILL) / 2
+        bars = [{"x": f"{i * BAR_WIDTH + bar_margin:g}", "color": BAR_COLOR_EMPTY, "title": ""} for i in range(offset)]
+        for i, value in enumerate(data):
+            title = f"{format_timestamp(timestamps[i][0])} - {format_timestamp(timestamps[i][1])}: {value} %"
+            if latency and latency[i]:
+                title += f", {latency[i][0]} / {latency[i][1]} / {latency[i][2]} ms"
+            r, g, b = evaluate_colormap(
+                value / 100, self._palette_interpolate, self._palette_colors, self._palette_reverse
+            )
+            bars.append(
+                {
+                    "x": f"{(offset + i) * BAR_WIDTH + bar_margin:g}",
+                    "color": f"rgba({r}, {g}, {b}, 0.7)",
+                    "title": title,
+                }
+            )
+
+        context["bars"] = bars
+        context["width"] = bars_count * BAR_WIDTH
+        context["height"] = BAR_HEIGHT
+        context["bar_width"] = f"{BAR_WIDTH * BAR_FILL:g}"
+
+        # Line of average latency of each bar
+        context["latency_points"] = ""
+        context["latency_color"] = LATENCY_COLOR
+        if latency:
+            latency_max = max((bar_latency[1] for bar_latency in latency if bar_latency), default=0)
+            if latency_max > 0:
+                context["latency_points"] = " ".join(
+                    f"{(offset + i + 0.5) * BAR_WIDTH:g},{BAR_HEIGHT * (1 - bar_latency[1] / latency_max):.2f}"
+                    for i, bar_latency in enumerate(latency)
+                    if bar_latency
+                )
+        return context
+
+
+class PageCache:
+    def __init__(self, response_cache: ResponseCache | SnapshotReader, renderer: PageRenderer) -> None:
+        """Keeps rendered page (and its compressed variants) until data in response_cache changes
+
+        Args:
+            response_cache (ResponseCache | SnapshotReader): serialized API data (its ETag is used to detect changes)
+            renderer (PageRenderer): page renderer
+        """
+        self._response_cache = response_cache
+        self._renderer = renderer
+
+        self._lock = Lock()
+        self._data_etag: str | None = None
+        self._etag = ""
+        self._variants: dict[str, bytes] = {}
+
+    def get(self) -> tuple[str, dict[str, bytes]]:
+        """Returns cached page, renders it if data has changed since last call
+
+        Returns:
+            tuple[str, dict[str, bytes]]: strong ETag (without quotes) and {"identity": HTML, "gzip": ..., "br": ...}
+        """
+        with self._lock:
+            data_etag, _ = self._response_cache.get()
+            if data_etag != self._data_etag:
+                time_start = perf_counter()
+                body = self._renderer.render(self._response_cache.api_data).encode("utf-8")
+                self._etag, self._variants = build_variants(body)
+                self._data_etag = data_etag
+                logging.debug(f"Rendered page ({len(body)} bytes) in {(perf_counter() - time_start) * 1000:.2f}ms")
+            return self._etag, self._variants
@@ -0,0 +1,253 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from os import path
+from time import monotonic
+from typing import Any, Callable
+
+from simple_status_server.probe import Probe, ProbeResult
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "watch": True,
+    "verify_interval": "1h",
+}
+
+# See <sys/inotify.h>
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class _Target:
+    def __init__(self, status: Status) -> None:
+        self.status = status
+        self.path = path.abspath(str(status.target))
+        self.exists = path.exists(self.path)
+        self.time_verified = monotonic()
+
+
+class PathWatcher:
+    def __init__(self, on_change: Callable[[Status], None], config: dict[str, Any] | None = None) -> None:
+        """Watches parent directories of path statuses using inotify (via ctypes) and calls on_change
+        as soon as target is created / deleted / moved
+
+        Args:
+            on_change (Callable[[Status], None]): called from event loop with status which target has changed
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._on_change = on_change
+        self._enabled = bool(config.get("watch", CONFIG_DEFAULT["watch"]))
+        self._verify_interval = parse_time_cfg(config.get("verify_interval", CONFIG_DEFAULT["verify_interval"]))
+
+        self._libc: ctypes.CDLL | None = None
+        self._fd = -1
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # Status ID -> target
+        self._targets: dict[str, _Target] = {}
+
+        # Watch descriptor -> (directory path, targets in it)
+        self._watches: dict[int, tuple[str, list[_Target]]] = {}
+
+    def start(self) -> bool:
+        """Initializes inotify and registers it in the current event loop
+
+        Returns:
+            bool: True if inotify is available
+        """
+        if not self._enabled:
+            return False
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        except (OSError, AttributeError) as e:
+            logging.warning(f"inotify is not available: {e}. Path statuses will be polled")
+            self._fd = -1
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._fd, self._read_events)
+        return True
+
+    def close(self) -> None:
+        """Stops watching"""
+        if self._fd < 0:
+            return
+        if self._loop is not None:
+            self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+        self._fd = -1
+        self._watches.clear()
+        self._targets.clear()
+
+    def add(self, status: Status) -> bool:
+        """Starts watching target of status
+
+        Args:
+            status (Status): path status
+
+        Returns:
+            bool: True if target is watched, False if it should be polled
+        """
+        if self._fd < 0 or self._libc is None:
+            return False
+        target = _Target(status)
+        directory = path.dirname(target.path)
+        if not path.basename(target.path):
+            return False
+
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            logging.warning(
+                f"Unable to watch {directory} for {status.id}: {os.strerror(ctypes.get_errno())}. It will be polled"
+            )
+            return False
+
+        if wd not in self._watches:
+            self._watches[wd] = (directory, [])
+        self._watches[wd][1].append(target)
+        self._targets[status.id] = target
+        logging.debug(f"Watching {target.path} for {status.id}")
+        return True
+
+    def is_watched(self, status: Status) -> bool:
+        """
+        Args:
+            status (Status): path status
+
+        Returns:
+            bool: True if status's target is watched
+        """
+        return status.id in self._targets
+
+    def exists(self, status: Status) -> bool:
+        """Returns known state of watched target. Verifies it using path.exists() every verify_interval
+
+        Args:
+            status (Status): watched path status
+
+        Returns:
+            bool: True if target exists
+        """
+        target = self._targets.get(status.id)
+        if target is None:
+            return path.exists(str(status.target))
+        if monotonic() - target.time_verified >= self._verify_interval:
+            exists = path.exists(target.path)
+            if exists != target.exists:
+                logging.warning(f"Missed inotify event for {target.path}")
+            target.exists = exists
+            target.time_verified = monotonic()
+        return target.exists
+
+    def _read_events(self) -> None:
+        """Reads and processes all available inotify events"""
+        try:
+            buffer = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logging.error(f"Unable to read inotify events: {e}")
+            return
+
+        changed: dict[str, _Target] = {}
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = os.fsdecode(
+                buffer[offset + EVENT_HEADER.size : offset + EVENT_HEADER.size + name_length].rstrip(b"\0")
+            )
+            offset += EVENT_HEADER.size + name_length
+
+            watch = self._watches.get(wd)
+            if watch is None:
+                continue
+            directory, targets = watch
+            for target in targets:
+                # Directory itself was removed / moved or target was changed
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED) or path.join(directory, name) == target.path:
+                    changed[target.status.id] = target
+
+            # Watch was removed by kernel. Stop watching these targets (they will be polled)
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                for target in targets:
+                    self._targets.pop(target.status.id, None)
+                logging.warning(f"Directory {directory} is no longer watched")
+
+        # Check only targets which existence has changed
+        for target in changed.values():
+            exists = path.exists(target.path)
+            target.time_verified = monotonic()
+            if exists == target.exists:
+                continue
+            target.exists = exists
+            logging.debug(f"{target.path} changed. Exists: {exists}")
+            self._on_change(target.status)
+
+
+class PathProbe(Probe):
+    concurrency = 16
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'path' type. Checks if path exists. Watched targets are checked using their known state
+        once per bar and as soon as they change (see PathWatcher)"""
+        super().__init__(config, trigger)
+        self._watcher = PathWatcher(trigger, config)
+
+    async def start(self, statuses: list[Status]) -> None:
+        if self._watcher.start():
+            for status in statuses:
+                self._watcher.add(status)
+
+    async def probe(self, status: Status) -> ProbeResult:
+        if self._watcher.is_watched(status):
+            result = self._watcher.exists(status)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(None, path.exists, str(status.target))
+        return ProbeResult(result, None if result else "not_found")
+
+    def watch_interval(self, status: Status) -> float | None:
+        if not self._watcher.is_watched(status):
+            return None
+        return float(status.interval * status.checks_per_bar)
+
+    async def close(self) -> None:
+        self._watcher.close()
@@ -0,0 +1,158 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import logging
+import os
+import signal
+import socket
+from functools import partial
+from time import sleep
+from typing import Callable
+
+WAIT_INTERVAL = 1.0
+
+
+def create_socket(host: str, port: int) -> socket.socket:
+    """Creates listening socket to share between server workers
+
+    Args:
+        host (str): server's host (IP)
+        port (int): server's port
+
+    Returns:
+        socket.socket: listening socket
+    """
+    address_info = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)[0]
+    socket_ = socket.socket(address_info[0], socket.SOCK_STREAM)
+    socket_.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    socket_.bind(address_info[4])
+    socket_.listen(1024)
+    return socket_
+
+
+def _terminate(signum, frame) -> None:
+    """Stops process on SIGTERM the same way as on CTRL+C"""
+    raise SystemExit(0)
+
+
+def _fork(name: str, target: Callable[[], None]) -> int:
+    """Forks process that runs target and exits
+
+    Args:
+        name (str): name of process for logs
+        target (Callable[[], None]): blocking function
+
+    Returns:
+        int: PID of process
+    """
+    pid = os.fork()
+
+    # Child
+    if pid == 0:
+        exit_code = 0
+        try:
+            logging.info(f"{name} started (PID: {os.getpid()})")
+            target()
+        except (SystemExit, KeyboardInterrupt):
+            pass
+        except Exception as e:
+            logging.error(f"{name} error: {e}", exc_info=e)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    return pid
+
+
+def fork_workers(count: int, target: Callable[[int], None]) -> list[int]:
+    """Forks worker processes that run target. Must be called before starting any threads
+
+    Args:
+        count (int): number of workers
+        target (Callable[[int], None]): blocking worker's function (called with index of worker)
+
+    Returns:
+        list[int]: PIDs of workers
+    """
+    return [_fork(f"Server worker {i}", partial(target, i)) for i in range(count)]
+
+
+def start_supervisor(count: int, target: Callable[[int], None]) -> int:
+    """Forks process that forks workers and replaces exited ones until it's terminated. It doesn't run any threads,
+    so workers can be forked at any time. Must be called before starting any threads
+
+    Args:
+        count (int): number of workers
+        target (Callable[[int], None]): blocking worker's function (called with index of worker)
+
+    Returns:
+        int: PID of supervisor (wait for it using wait_workers() and stop it using stop_workers())
+    """
+
+    def _supervise() -> None:
+        signal.signal(signal.SIGTERM, _terminate)
+        pids = fork_workers(count, target)
+        try:
+            wait_workers(pids, target)
+        finally:
+            stop_workers(pids)
+
+    return _fork("Server workers supervisor", _supervise)
+
+
+def wait_workers(pids: list[int], target: Callable[[int], None] | None = None) -> None:
+    """Waits until all workers exit (blocking)
+
+    Args:
+        pids (list[int]): PIDs of workers (exited ones are removed or replaced)
+        target (Callable[[int], None] | None, optional): worker's function to fork exited workers again with
+        (see start_supervisor()). Exited worker is replaced by worker with the same index. Defaults to None
+    """
+    # Other children (ex. command helpers) are reaped by their owners, so only workers are polled
+    while pids:
+        for i, pid in enumerate(pids.copy()):
+            pid_, wait_status = os.waitpid(pid, os.WNOHANG)
+            if pid_ != pid:
+                continue
+            logging.warning(f"Server worker {pid} exited with code {os.waitstatus_to_exitcode(wait_status)}")
+            if target is not None:
+                pids[i] = _fork(f"Server worker {i}", partial(target, i))
+            else:
+                pids.remove(pid)
+        sleep(WAIT_INTERVAL)
+
+
+def stop_workers(pids: list[int]) -> None:
+    """Terminates workers and waits for them
+
+    Args:
+        pids (list[int]): PIDs of workers (exited ones are removed)
+    """
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in pids.copy():
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+        pids.remove(pid)
@@ -0,0 +1,321 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import importlib
+import logging
+from concurrent.futures import Future
+from threading import Thread
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from simple_status_server.status import Status
+
+
+class ProbeResult:
+    def __init__(
+        self, ok: bool, error_class: str | None = None, latency: float | None = None, details: str | None = None
+    ) -> None:
+        """Result of single check
+
+        Args:
+            ok (bool): True if target is working
+            error_class (str | None, optional): type of error if it's not (ex. "timeout"). Defaults to None
+            latency (float | None, optional): time in seconds measured by probe itself (ex. without waiting
+            for its own limits). Duration of entire check is used if None. Defaults to None
+            details (str | None, optional): any extra info for debug logs. Defaults to None
+        """
+        self.ok = ok
+        self.error_class = error_class
+        self.latency = latency
+        self.details = details
+
+    def __repr__(self) -> str:
+        return (
+            f"ProbeResult(ok={self.ok}, error_class={self.error_class}, latency={self.latency}, "
+            f"details={self.details!r})"
+        )
+
+
+class Probe:
+    # Checks of this type that are due at the same time are passed to probe_batch() together
+    batchable = False
+
+    # Latency of checks is meaningful and is stored for statuses of this type
+    latency = False
+
+    # Default maximum number of running checks of this type (None - limited only by max_concurrent)
+    concurrency: int | None = None
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[["Status"], None]) -> None:
+        """Base class of check type. Single instance per type is created for each scheduler and all its methods
+        are called from the same event loop. Register subclasses using register_probe()
+
+        Args:
+            config (dict[str, Any]): scheduler config section with the same name as type. Empty if not specified
+            trigger (Callable[[Status], None]): call it (from the same event loop) to check status as soon
+            as possible (ex. if probe knows that target has changed)
+        """
+        self._config = config
+        self._trigger = trigger
+
+    async def start(self, statuses: list["Status"]) -> None:
+        """Called once before the first check
+
+        Args:
+            statuses (list[Status]): all statuses of this type
+        """
+
+    async def probe(self, status: "Status") -> ProbeResult:
+        """Checks target of status. Must not block event loop (use run_in_executor() for blocking calls)
+
+        Args:
+            status (Status): status to check
+
+        Returns:
+            ProbeResult: check result. Raised exceptions are counted as failed checks
+        """
+        raise NotImplementedError
+
+    async def probe_batch(self, statuses: list["Status"]) -> list[ProbeResult]:
+        """Checks multiple statuses at once (called only if batchable is True). Checks them one by one by default
+
+        Args:
+            statuses (list[Status]): statuses to check
+
+        Returns:
+            list[ProbeResult]: results in the same order as statuses
+        """
+        results = await asyncio.gather(*[self.probe(status) for status in statuses], return_exceptions=True)
+        return [
+            result if isinstance(result, ProbeResult) else error_result(status, result)
+            for status, result in zip(statuses, results)
+        ]
+
+    def watch_interval(self, status: "Status") -> float | None:
+        """Probes that call trigger() as soon as target of status changes may let scheduler check it less often.
+        Elapsed intervals are filled with the previous result when the next check reports a change
+
+        Args:
+            status (Status): checked status
+
+        Returns:
+            float | None: delay of the next check in seconds (at most status.interval * status.checks_per_bar)
+            or None to check status every interval
+        """
+        return None
+
+    async def close(self) -> None:
+        """Releases all resources (called once after the last check)"""
+
+
+def error_result(status: "Status", error: BaseException) -> ProbeResult:
+    """Logs unexpected probe error
+
+    Args:
+        status (Status): checked status
+        error (BaseException): raised exception
+
+    Returns:
+        ProbeResult: failed check with exception class name as error class
+    """
+    logging.error(f"{status.id} error: {error}", exc_info=error)
+    return ProbeResult(False, type(error).__name__)
+
+
+# Type name -> probe class or "module:class" to import on first use (so unused probes are not imported)
+_PROBES: dict[str, type[Probe] | str] = {
+    "constant": "simple_status_server.probe:ConstantProbe",
+    "service": "simple_status_server.service_collector:ServiceProbe",
+    "command": "simple_status_server.command_executor:CommandProbe",
+    "path": "simple_status_server.path_watcher:PathProbe",
+    "url": "simple_status_server.url_prober:UrlProbe",
+    "tcp": "simple_status_server.net_probes:TcpProbe",
+    "tls": "simple_status_server.net_probes:TlsProbe",
+    "dns": "simple_status_server.net_probes:DnsProbe",
+}
+
+
+def register_probe(type_name: str, probe_class: type[Probe] | str) -> None:
+    """Registers (or replaces) check type
+
+    Args:
+        type_name (str): name of type used in statuses config
+        probe_class (type[Probe] | str): Probe subclass or "module:class" to import on first use
+    """
+    _PROBES[type_name.lower()] = probe_class
+
+
+def is_registered(type_name: str) -> bool:
+    """
+    >>> is_registered("url"), is_registered("smtp")
+    (True, False)
+
+    Args:
+        type_name (str): name of type
+
+    Returns:
+        bool: True if type is registered
+    """
+    return type_name in _PROBES
+
+
+def get_probe_class(type_name: str) -> type[Probe]:
+    """
+    >>> get_probe_class("constant").__name__
+    'ConstantProbe'
+
+    Args:
+        type_name (str): name of registered type
+
+    Returns:
+        type[Probe]: probe class of type
+    """
+    probe_class = _PROBES[type_name]
+    if isinstance(probe_class, str):
+        module_name, _, class_name = probe_class.partition(":")
+        probe_class = getattr(importlib.import_module(module_name), class_name)
+        _PROBES[type_name] = probe_class
+    return probe_class
+
+
+def load_plugins(modules: list[str]) -> None:
+    """Imports modules with extra check types (they must call register_probe() on import)
+
+    Args:
+        modules (list[str]): names of modules (ex. "my_package.smtp_probe")
+    """
+    for module_name in modules:
+        logging.info(f"Loading check types from {module_name}")
+        importlib.import_module(module_name)
+
+
+def create_probes(
+    statuses: list["Status"], config: dict[str, Any], trigger: Callable[["Status"], None]
+) -> dict[str, Probe]:
+    """Creates probe of each type used by statuses
+
+    Args:
+        statuses (list[Status]): statuses to check
+        config (dict[str, Any]): scheduler config (probe config is taken from key with the same name as type)
+        trigger (Callable[[Status], None]): see Probe
+
+    Returns:
+        dict[str, Probe]: type name -> probe
+    """
+    probes = {}
+    for status in statuses:
+        if status.type not in probes:
+            probes[status.type] = get_probe_class(status.type)(config.get(status.type, {}), trigger)
+    return probes
+
+
+class ConstantProbe(Probe):
+    async def probe(self, status: "Status") -> ProbeResult:
+        """Always returns target of status (true / false)"""
+        return ProbeResult(bool(status.target), None if status.target else "failed")
+
+
+class ProbeThread:
+    def __init__(self, statuses: list["Status"], config: dict[str, Any] | None = None) -> None:
+        """Runs probes in a separate event loop thread for blocking callers (threads engine).
+        Checks are limited by max_concurrent and type_limits of scheduler config the same way as in Scheduler
+
+        Args:
+            statuses (list[Status]): statuses to check
+            config (dict[str, Any] | None, optional): scheduler config. Defaults to None
+        """
+        from simple_status_server.scheduler import CONFIG_DEFAULT
+
+        self._statuses = statuses
+        self._config = config if config is not None else {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, name="probes", daemon=True)
+        self._probes: dict[str, Probe] = {}
+
+        # Semaphores are bound to event loop on first use (type limits are known after probes are created)
+        self._semaphore = asyncio.Semaphore(int(self._config.get("max_concurrent", CONFIG_DEFAULT["max_concurrent"])))
+        self._type_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    def start(self) -> None:
+        """Starts event loop and all probes"""
+        self._thread.start()
+        self._run(self._start()).result()
+
+    def stop(self) -> None:
+        """Closes all probes and stops event loop"""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._run(self._close()).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def check(self, status: "Status") -> ProbeResult:
+        """Checks status (blocking)
+
+        Args:
+            status (Status): status to check
+
+        Returns:
+            ProbeResult: check result
+        """
+        return self._run(self._check(status)).result()
+
+    def _run(self, coroutine) -> Future:
+        """Runs coroutine in event loop thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _check(self, status: "Status") -> ProbeResult:
+        """Checks status within concurrency limits (in event loop thread)"""
+        type_semaphore = self._type_semaphores.get(status.type)
+        if type_semaphore is not None:
+            await type_semaphore.acquire()
+        try:
+            async with self._semaphore:
+                return await self._probes[status.type].probe(status)
+        finally:
+            if type_semaphore is not None:
+                type_semaphore.release()
+
+    async def _start(self) -> None:
+        """Creates and starts probes (in event loop thread)"""
+        from simple_status_server.scheduler import CONFIG_DEFAULT
+
+        def _trigger(status: "Status") -> None:
+            """Workers check statuses every interval regardless of changes reported by probes"""
+
+        type_limits = {
+            type_name.lower(): int(limit)
+            for type_name, limit in self._config.get("type_limits", CONFIG_DEFAULT["type_limits"]).items()
+        }
+        self._probes = create_probes(self._statuses, self._config, _trigger)
+        for type_name, probe in self._probes.items():
+            await probe.start([status for status in self._statuses if status.type == type_name])
+            limit = type_limits.get(type_name, probe.concurrency)
+            if limit is not None:
+                self._type_semaphores[type_name] = asyncio.Semaphore(limit)
+
+    async def _close(self) -> None:
+        """Closes probes (in event loop thread)"""
+        for probe in self._probes.values():
+            await probe.close()
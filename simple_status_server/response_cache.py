@@ -0,0 +1,94 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from threading import Lock
+from typing import Any
+
+try:
+    import brotli  # pyright: ignore
+except ImportError:
+    brotli = None
+
+# Encodings in order of preference
+ENCODINGS = ("br", "gzip")
+
+
+def build_variants(body: bytes) -> tuple[str, dict[str, bytes]]:
+    """Calculates ETag and compressed variants of response body
+
+    Args:
+        body (bytes): serialized response
+
+    Returns:
+        tuple[str, dict[str, bytes]]: strong ETag (without quotes) and {"identity": body, "gzip": ..., "br": ...}
+        ("br" variant exists only if brotli package is installed)
+    """
+    variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body)
+    return hashlib.sha256(body).hexdigest()[:32], variants
+
+
+class ResponseCache:
+    def __init__(self, api_data: dict[str, dict[str, Any]]) -> None:
+        """Keeps api_data serialized into JSON (and compressed variants) until next invalidate() call
+
+        Args:
+            api_data (dict[str, dict[str, Any]]): data to serialize
+        """
+        self._api_data = api_data
+
+        self._lock = Lock()
+        self._generation = 0
+        self._cached_generation = -1
+        self._etag = ""
+        self._variants: dict[str, bytes] = {}
+
+    @property
+    def api_data(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns:
+            dict[str, dict[str, Any]]: data to serialize
+        """
+        return self._api_data
+
+    def invalidate(self) -> None:
+        """Marks cached response as outdated (call it after each api_data change)"""
+        self._generation += 1
+
+    def get(self) -> tuple[str, dict[str, bytes]]:
+        """Returns cached response, serializes api_data if it has changed since last call
+
+        Returns:
+            tuple[str, dict[str, bytes]]: strong ETag (without quotes) and {"identity": JSON, "gzip": ..., "br": ...}
+            ("br" variant exists only if brotli package is installed)
+        """
+        with self._lock:
+            generation = self._generation
+            if generation != self._cached_generation:
+                body = json.dumps(self._api_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                self._etag, self._variants = build_variants(body)
+                self._cached_generation = generation
+                logging.debug(f"Serialized API data ({len(body)} bytes)")
+            return self._etag, self._variants
@@ -0,0 +1,164 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from array import array
+from typing import Any, Callable, Iterable, Iterator
+
+
+class RingBuffer:
+    def __init__(
+        self,
+        capacity: int,
+        typecode: str = "q",
+        width: int = 1,
+        cast: Callable[[Any], Any] = int,
+        values: Iterable | None = None,
+    ) -> None:
+        """Fixed-capacity array-backed ring buffer. Appending into full buffer overwrites the oldest item.
+        Keeps running sum of items (if width is 1), so average and count of true values are O(1)
+        >>> buffer = RingBuffer(3, "B", cast=bool, values=[True, False, True, True])
+        >>> list(buffer), buffer.sum, len(buffer), buffer[-1]
+        ([False, True, True], 2, 3, True)
+        >>> buffer = RingBuffer(2, "q", width=2, values=[(1, 2), [3, 4], (5, 6)])
+        >>> buffer.to_list(), buffer[0]
+        ([(3, 4), (5, 6)], (3, 4))
+
+        Args:
+            capacity (int): maximum number of items
+            typecode (str, optional): array typecode of each value. Defaults to "q" (signed 64-bit integer)
+            width (int, optional): number of values in each item (items are tuples if width > 1). Defaults to 1
+            cast (Callable[[Any], Any], optional): converts stored value into returned one. Defaults to int
+            values (Iterable | None, optional): initial items. Defaults to None
+        """
+        if capacity < 1:
+            raise Exception("Ring buffer capacity must be at least 1")
+        self._capacity = capacity
+        self._width = width
+        self._cast = cast
+        self._array = array(typecode, [0]) * (capacity * width)
+        self._start = 0
+        self._length = 0
+        self._sum = 0
+
+        if values is not None:
+            self.extend(values)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Returns:
+            int: maximum number of items
+        """
+        return self._capacity
+
+    @property
+    def sum(self) -> int:
+        """
+        Returns:
+            int: sum of all stored items (always 0 if width > 1)
+        """
+        return self._sum
+
+    def append(self, item: Any) -> None:
+        """Appends new item, removes the oldest one if buffer is full
+
+        Args:
+            item (Any): value (or tuple of width values)
+        """
+        full = self._length == self._capacity
+        if full:
+            index = self._start
+            self._start = (self._start + 1) % self._capacity
+        else:
+            index = (self._start + self._length) % self._capacity
+            self._length += 1
+
+        if self._width == 1:
+            value = int(item)
+            if full:
+                self._sum -= self._array[index]
+            self._sum += value
+            self._array[index] = value
+        else:
+            offset = index * self._width
+            for i in range(self._width):
+                self._array[offset + i] = item[i]
+
+    def extend(self, items: Iterable) -> None:
+        """Appends multiple items
+
+        Args:
+            items (Iterable): values (or tuples of width values)
+        """
+        for item in items:
+            self.append(item)
+
+    def replace(self, items: Iterable) -> None:
+        """Replaces all items (only last capacity items are kept)
+
+        Args:
+            items (Iterable): new values (or tuples of width values)
+        """
+        self.clear()
+        self.extend(items)
+
+    def clear(self) -> None:
+        """Removes all items"""
+        self._start = 0
+        self._length = 0
+        self._sum = 0
+
+    def to_list(self) -> list[Any]:
+        """
+        Returns:
+            list[Any]: items from the oldest to the newest
+        """
+        return [self._get(i) for i in range(self._length)]
+
+    def _get(self, index: int) -> Any:
+        """
+        Args:
+            index (int): non-negative index of item (0 - the oldest one)
+
+        Returns:
+            Any: item
+        """
+        index = (self._start + index) % self._capacity
+        if self._width == 1:
+            return self._cast(self._array[index])
+        offset = index * self._width
+        return tuple(self._cast(value) for value in self._array[offset : offset + self._width])
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._length):
+            yield self._get(i)
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._length
+        if index < 0 or index >= self._length:
+            raise IndexError("Ring buffer index out of range")
+        return self._get(index)
+
+    def __repr__(self) -> str:
+        return f"RingBuffer({self.to_list()})"
@@ -0,0 +1,182 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import logging
+from threading import Condition, Lock, Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable
+
+from simple_status_server.database import Database
+from simple_status_server.metrics import Metrics
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "flush_interval": "5s",
+    "flush_changes": 100,
+}
+
+
+class SaveScheduler:
+    def __init__(
+        self,
+        database: Database,
+        config: dict[str, Any] | None = None,
+        metrics: Metrics | None = None,
+        flush_callback: Callable[[], None] | None = None,
+    ) -> None:
+        """Coalesces database saves. Updated statuses are marked as dirty and saved together
+        at most every flush_interval or after flush_changes changes
+
+        Args:
+            database (Database): database instance
+            config (dict[str, Any] | None, optional): see CONFIG_DEFAULT. Defaults to None
+            metrics (Metrics | None, optional): instance to record save time into. Defaults to None
+            flush_callback (Callable[[], None] | None, optional): called after each successful save. Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._database = database
+        self._metrics = metrics
+        self._flush_callback = flush_callback
+        self._flush_interval = parse_time_cfg(config.get("flush_interval", CONFIG_DEFAULT["flush_interval"]))
+        self._flush_changes = int(config.get("flush_changes", CONFIG_DEFAULT["flush_changes"]))
+
+        self._condition = Condition()
+        self._flush_lock = Lock()
+        self._changes = 0
+        self._time_first_change = 0.0
+
+        self._flushes = 0
+        self._changes_flushed = 0
+        self._last_flush_latency = 0.0
+        self._last_flush_changes = 0
+
+        self._exit_flag = False
+        self._thread: Thread | None = None
+
+    def start(self) -> None:
+        """Starts background flush thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._exit_flag = False
+        self._thread = Thread(target=self._loop, name="save-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops background thread and flushes remaining changes"""
+        with self._condition:
+            self._exit_flag = True
+            self._condition.notify_all()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        if not self.flush():
+            logging.warning(f"{self._changes} changes were not saved into database")
+
+    def mark_dirty(self, status: Status) -> None:
+        """Schedules save (called after each check pushed using Database.push())
+
+        Args:
+            status (Status): updated status
+        """
+        with self._condition:
+            if self._changes == 0:
+                self._time_first_change = monotonic()
+            self._changes += 1
+            if self._changes == 1 or self._changes >= self._flush_changes:
+                self._condition.notify_all()
+
+    def flush(self) -> bool:
+        """Saves database if there are any changes
+
+        Returns:
+            bool: False if database couldn't be saved (changes stay pending)
+        """
+        with self._flush_lock:
+            with self._condition:
+                if self._changes == 0:
+                    return True
+                changes = self._changes
+                self._changes = 0
+
+            time_start = perf_counter()
+            try:
+                self._database.save()
+            except Exception as e:
+                logging.error(f"Unable to save database: {e}", exc_info=e)
+
+                # Keep changes for the next flush (changes made during save are already counted)
+                with self._condition:
+                    if self._changes == 0:
+                        self._time_first_change = monotonic()
+                    self._changes += changes
+                return False
+            latency = perf_counter() - time_start
+
+            self._flushes += 1
+            self._changes_flushed += changes
+            self._last_flush_latency = latency
+            self._last_flush_changes = changes
+            if self._metrics is not None:
+                self._metrics.observe_database_save(latency, changes)
+            logging.debug(f"Flushed {changes} changes in {latency * 1000:.2f}ms")
+
+            if self._flush_callback is not None:
+                try:
+                    self._flush_callback()
+                except Exception as e:
+                    logging.error(f"Error after saving database: {e}", exc_info=e)
+            return True
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: number of flushes, total changes flushed, latency (in seconds)
+            and number of changes coalesced by the last flush
+        """
+        return {
+            "flushes": self._flushes,
+            "changes_flushed": self._changes_flushed,
+            "last_flush_latency": self._last_flush_latency,
+            "last_flush_changes": self._last_flush_changes,
+        }
+
+    def _loop(self) -> None:
+        """Waits for changes and flushes them"""
+        while True:
+            with self._condition:
+                while not self._exit_flag:
+                    if self._changes >= self._flush_changes:
+                        break
+                    if self._changes > 0:
+                        timeout = self._time_first_change + self._flush_interval - monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+                if self._exit_flag:
+                    return
+
+            # Retry failed save after flush_interval
+            if not self.flush():
+                time_retry = monotonic() + self._flush_interval
+                with self._condition:
+                    while not self._exit_flag and monotonic() < time_retry:
+                        self._condition.wait(time_retry - monotonic())
@@ -0,0 +1,412 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from time import monotonic, perf_counter
+from typing import Any, Callable
+
+from simple_status_server.adaptive import AdaptiveInterval
+from simple_status_server.metrics import Metrics
+from simple_status_server.probe import Probe, ProbeResult, create_probes, error_result
+from simple_status_server.status import Status, parse_time_cfg, push_new_status
+
+# Limits of types that are not in type_limits are taken from their probes (see Probe.concurrency)
+CONFIG_DEFAULT = {
+    "max_concurrent": 64,
+    "startup_spread": "10s",
+    "type_limits": {},
+}
+
+
+class Scheduler:
+    def __init__(
+        self,
+        statuses: list[Status],
+        update_callback: Callable[[Status], None],
+        config: dict[str, Any] | None = None,
+        metrics: Metrics | None = None,
+        state_callback: Callable[[Status], None] | None = None,
+        push_callback: Callable[..., None] | None = None,
+    ) -> None:
+        """Runs checks of all statuses from a single asyncio event loop
+
+        Next check time of each status is kept in a heap, so only one thread sleeps regardless of how many
+        statuses are configured. Statuses are checked by probe of their type (see probe.py). Due checks of
+        batchable types are passed to their probe together and take a single concurrency slot.
+        Statuses with failed dependency are not checked until it recovers
+
+        Args:
+            statuses (list[Status]): statuses to check
+            update_callback (Callable[[Status], None]): called after each check with updated status
+            config (dict[str, Any] | None, optional): scheduler config (see CONFIG_DEFAULT). Defaults to None
+            metrics (Metrics | None, optional): instance to record duration, lag and errors of checks into.
+            Defaults to None
+            state_callback (Callable[[Status], None] | None, optional): called with status when its dependency
+            fails or recovers (without new check). Defaults to None
+            push_callback (Callable[..., None] | None, optional): pushes check result into status, called with
+            the same arguments as Database.push(). Defaults to None (Status.push_new_status())
+        """
+        if config is None:
+            config = {}
+        self._config = config
+        self._statuses = statuses
+        self._update_callback = update_callback
+        self._state_callback = state_callback
+        self._push_callback = push_callback if push_callback is not None else push_new_status
+        self._metrics = metrics
+
+        self._max_concurrent = int(config.get("max_concurrent", CONFIG_DEFAULT["max_concurrent"]))
+        if self._max_concurrent < 1:
+            raise Exception("scheduler max_concurrent must be at least 1")
+        self._type_limits: dict[str, int] = {}
+        for type_name, limit in config.get("type_limits", CONFIG_DEFAULT["type_limits"]).items():
+            self._type_limits[type_name.lower()] = int(limit)
+        self._startup_spread = parse_time_cfg(config.get("startup_spread", CONFIG_DEFAULT["startup_spread"]))
+
+        # Type name -> probe (created in scheduler's loop)
+        self._probes: dict[str, Probe] = {}
+
+        self._exit_flag = False
+        self._thread: Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrent, thread_name_prefix="check")
+
+        # (time due (monotonic), sequence number, status)
+        self._heap: list[tuple[float, int, Status]] = []
+        self._sequence = 0
+
+        # Status ID -> sequence number of its only valid heap entry (other entries of this status are skipped)
+        self._scheduled: dict[str, int] = {}
+
+        # IDs of statuses that are being checked and that must be checked again right after current check
+        self._running: set[str] = set()
+        self._triggered: set[str] = set()
+
+        # Status ID -> retries, backoff and jitter of its interval
+        self._policies = {status.id: AdaptiveInterval(status) for status in statuses}
+
+        # Status ID -> statuses that depend on it
+        self._dependents: dict[str, list[Status]] = {}
+        for status in statuses:
+            for dependency in status.dependencies:
+                self._dependents.setdefault(dependency.id, []).append(status)
+
+        for status in statuses:
+            logging.info(f"Status {status.id} ({status.label}) registered. Interval: {status.interval:.2f}s")
+
+    def start(self) -> None:
+        """Starts scheduler thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        logging.debug(f"Starting scheduler for {len(self._statuses)} statuses")
+        self._exit_flag = False
+        self._thread = Thread(target=asyncio.run, args=(self._run(),), name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops scheduler and waits for running checks to finish"""
+        logging.debug("Stopping scheduler")
+        self._exit_flag = True
+        self._wake()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _wake(self) -> None:
+        """Wakes up main scheduler loop (thread-safe)"""
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass
+
+    def _schedule(self, status: Status, delay: float) -> None:
+        """Pushes next check of status into the heap (must be called from scheduler's loop)
+
+        Args:
+            status (Status): status to check
+            delay (float): seconds from now
+        """
+        self._sequence += 1
+        self._scheduled[status.id] = self._sequence
+        heapq.heappush(self._heap, (monotonic() + delay, self._sequence, status))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _trigger(self, status: Status) -> None:
+        """Checks status as soon as possible instead of waiting for its interval (must be called from scheduler's loop)
+
+        Args:
+            status (Status): status to check
+        """
+        if self._exit_flag:
+            return
+        if status.id in self._running:
+            self._triggered.add(status.id)
+        else:
+            self._schedule(status, 0)
+
+    def _skip(self, status: Status, dependency: Status) -> None:
+        """Marks status as dependency-failed instead of checking it and schedules its next check
+        (must be called from scheduler's loop)
+
+        Args:
+            status (Status): due status
+            dependency (Status): failed dependency of status
+        """
+        logging.info(f"{status.id}: skipped ({dependency.id} is not working)")
+        if self._metrics is not None:
+            self._metrics.observe_skipped_check(status.id)
+        self._set_dependency_failed(status, dependency.id)
+        self._schedule(status, status.interval)
+
+    def _update_dependents(self, status: Status) -> None:
+        """Marks statuses that depend on status as dependency-failed as soon as it fails and checks them
+        right away when it recovers (must be called from scheduler's loop)
+
+        Args:
+            status (Status): status that was checked or whose dependency state was changed
+        """
+        for dependent in self._dependents.get(status.id, []):
+            dependency = dependent.get_failed_dependency()
+            if dependency is not None and dependent.dependency_failed is None:
+                logging.info(f"{dependent.id}: {dependency.id} is not working")
+                self._set_dependency_failed(dependent, dependency.id)
+            elif dependency is None and dependent.dependency_failed is not None:
+                logging.info(f"{dependent.id}: {dependent.dependency_failed} recovered")
+                self._set_dependency_failed(dependent, None)
+                self._trigger(dependent)
+
+    def _set_dependency_failed(self, status: Status, dependency_id: str | None) -> None:
+        """Updates dependency state of status, calls state callback and updates statuses that depend on it
+        (must be called from scheduler's loop)
+
+        Args:
+            status (Status): status to update
+            dependency_id (str | None): ID of failed dependency or None if all of them are working
+        """
+        if status.dependency_failed == dependency_id:
+            return
+        status.dependency_failed = dependency_id
+        if dependency_id is not None:
+            self._policies[status.id].on_skipped()
+        if self._state_callback is not None and not self._exit_flag:
+            try:
+                asyncio.get_running_loop().run_in_executor(self._executor, self._notify_state, status)
+            except RuntimeError:
+                pass
+        self._update_dependents(status)
+
+    def _notify_state(self, status: Status) -> None:
+        """Calls state callback (executed in thread pool)
+
+        Args:
+            status (Status): status with changed dependency state
+        """
+        try:
+            if self._state_callback is not None:
+                self._state_callback(status)
+        except Exception as e:
+            logging.error(f"Error updating {status.id}: {e}", exc_info=e)
+
+    async def _run(self) -> None:
+        """Main scheduler loop"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._probes = create_probes(self._statuses, self._config, self._trigger)
+        type_semaphores: dict[str, asyncio.Semaphore] = {}
+        for type_name, probe in self._probes.items():
+            await probe.start([status for status in self._statuses if status.type == type_name])
+            limit = self._type_limits.get(type_name, probe.concurrency)
+            if limit is not None:
+                type_semaphores[type_name] = asyncio.Semaphore(limit)
+
+        semaphore = asyncio.Semaphore(self._max_concurrent)
+        tasks: set[asyncio.Task] = set()
+
+        # Check statuses when their checks are due, spread evenly within startup_spread so they don't start at once
+        for i, status in enumerate(self._statuses):
+            startup_delay = min(self._startup_spread, status.interval) * i / len(self._statuses)
+            self._schedule(status, self._policies[status.id].initial_delay() + startup_delay)
+
+        while not self._exit_flag:
+            # Start all due checks (due checks of each batchable type are started together)
+            time_current = monotonic()
+            batches: dict[tuple[str, str], list[tuple[Status, float]]] = {}
+            while self._heap and self._heap[0][0] <= time_current:
+                time_due, sequence, status = heapq.heappop(self._heap)
+                if self._scheduled.get(status.id) != sequence:
+                    continue
+                del self._scheduled[status.id]
+                dependency = status.get_failed_dependency()
+                if dependency is not None:
+                    self._skip(status, dependency)
+                elif self._probes[status.type].batchable:
+                    batches.setdefault(("type", status.type), []).append((status, time_due))
+                else:
+                    batches[("status", status.id)] = [(status, time_due)]
+            for batch in batches.values():
+                task = asyncio.create_task(self._check(batch, semaphore, type_semaphores.get(batch[0][0].type)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            # Sleep until next check or wake up
+            timeout = self._heap[0][0] - time_current if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+        # Wait for running checks
+        if tasks:
+            logging.debug(f"Waiting for {len(tasks)} running checks")
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for probe in self._probes.values():
+            await probe.close()
+
+    async def _check(
+        self,
+        batch: list[tuple[Status, float]],
+        semaphore: asyncio.Semaphore,
+        type_semaphore: asyncio.Semaphore | None,
+    ) -> None:
+        """Performs checks within concurrency limits and schedules next ones
+
+        Args:
+            batch (list[tuple[Status, float]]): statuses of the same type and scheduled time of their checks
+            (monotonic). Contains a single status unless its probe is batchable
+            semaphore (asyncio.Semaphore): global concurrency limit
+            type_semaphore (asyncio.Semaphore | None): per-type concurrency limit
+        """
+        statuses = [status for status, _ in batch]
+        delays = {status.id: float(status.interval) for status in statuses}
+        self._running.update(delays)
+        try:
+            if type_semaphore is not None:
+                await type_semaphore.acquire()
+            try:
+                async with semaphore:
+                    if self._exit_flag:
+                        return
+                    for status in statuses:
+                        logging.info(f"Checking {status.id} ({status.target})...")
+                    time_current = monotonic()
+                    time_start = perf_counter()
+                    results = await self._probe(statuses)
+                    duration = perf_counter() - time_start
+                    for (status, time_due), result in zip(batch, results):
+                        logging.debug(f"{status.id}: {result}")
+                        if self._metrics is not None:
+                            self._metrics.observe_check(
+                                status.id,
+                                status.type,
+                                duration,
+                                max(time_current - time_due, 0.0),
+                                result.ok,
+                                result.error_class,
+                            )
+
+                        # Dependency has failed while status was being checked (result is most likely caused by it)
+                        dependency = status.get_failed_dependency()
+                        if dependency is not None:
+                            logging.info(f"{status.id}: {result.ok} (ignored, {dependency.id} is not working)")
+                            self._set_dependency_failed(status, dependency.id)
+                            continue
+
+                        push, weight, delays[status.id] = self._policies[status.id].on_result(result.ok)
+                        latency = result.latency if result.latency is not None else duration
+                        if push:
+                            self._set_dependency_failed(status, None)
+                            watch_interval = self._probes[status.type].watch_interval(status)
+                            if watch_interval is not None:
+                                delays[status.id] = max(delays[status.id], watch_interval)
+
+                                # Watched target had its previous state until probe reported the change
+                                if weight > 1 and status.status_values and status.status_values[-1] != result.ok:
+                                    await asyncio.get_running_loop().run_in_executor(
+                                        self._executor, self._push, status, not result.ok, None, weight - 1
+                                    )
+                                    weight = 1
+                            await asyncio.get_running_loop().run_in_executor(
+                                self._executor, self._push, status, result.ok, latency, weight
+                            )
+                            self._update_dependents(status)
+                        else:
+                            logging.info(f"{status.id}: {result.ok} (retrying in {delays[status.id]:.2f}s)")
+            finally:
+                if type_semaphore is not None:
+                    type_semaphore.release()
+
+        # Executor is shut down
+        except RuntimeError as e:
+            if not self._exit_flag:
+                logging.error(f"{', '.join(delays)} error: {e}", exc_info=e)
+            return
+
+        finally:
+            self._running.difference_update(delays)
+
+        if not self._exit_flag:
+            for status in statuses:
+                if status.id in self._triggered:
+                    self._triggered.discard(status.id)
+                    self._schedule(status, 0)
+                else:
+                    self._schedule(status, delays[status.id])
+
+    async def _probe(self, statuses: list[Status]) -> list[ProbeResult]:
+        """Checks targets of statuses using probe of their type
+
+        Args:
+            statuses (list[Status]): statuses of the same type
+
+        Returns:
+            list[ProbeResult]: results in the same order as statuses (unexpected errors are counted as failed checks)
+        """
+        probe = self._probes[statuses[0].type]
+        try:
+            if len(statuses) == 1:
+                return [await probe.probe(statuses[0])]
+            return await probe.probe_batch(statuses)
+        except Exception as e:
+            return [error_result(status, e) for status in statuses]
+
+    def _push(self, status: Status, result: bool, latency: float | None, weight: int = 1) -> None:
+        """Pushes new status and calls update callback (executed in thread pool)
+
+        Args:
+            status (Status): checked status
+            result (bool): check result
+            latency (float | None): check duration in seconds (None if result wasn't measured)
+            weight (int, optional): number of samples result represents. Defaults to 1
+        """
+        # Push new status and save into database
+        logging.info(f"{status.id}: {result}")
+        self._push_callback(status, result, latency=latency, weight=weight)
+        try:
+            self._update_callback(status)
+        except Exception as e:
+            logging.error(f"Error updating {status.id}: {e}", exc_info=e)
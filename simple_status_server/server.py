@@ -19,14 +19,23 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import logging
+import math
+import socket
 from os import path
-from typing import Any
+from time import perf_counter, time
+from typing import Any, Callable
 
-from flask import Flask, Response, jsonify, render_template, request
+from flask import Flask, Response, g, jsonify, render_template, request
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from waitress import serve
 
+from simple_status_server.metrics import Metrics
+from simple_status_server.page_renderer import PageCache, PageRenderer
+from simple_status_server.response_cache import ENCODINGS, ResponseCache
+from simple_status_server.shared_snapshot import SnapshotReader
+from simple_status_server.status import slice_data_dict
+
 
 class Server:
     def __init__(
@@ -39,6 +48,13 @@ class Server:
         color_palette: str,
         extra_css: str | None,
         api_data: dict[str, dict[str, Any]],
+        events_port: int | None = None,
+        metrics: Metrics | None = None,
+        ingest_callback: Callable[[list[dict[str, Any]]], int] | None = None,
+        response_cache: ResponseCache | SnapshotReader | None = None,
+        time_started: float | None = None,
+        page_renderer: PageRenderer | None = None,
+        uptime_callback: Callable[[str, int, int], tuple[int, list[tuple[int, int, int]]]] | None = None,
     ) -> None:
         self._app = Flask(
             __name__,
@@ -56,6 +72,53 @@ class Server:
             storage_uri="memory://",
             strategy="fixed-window",
         )
+        self._response_cache = response_cache if response_cache is not None else ResponseCache(api_data)
+        self._time_started = time_started
+        self._page_cache = PageCache(self._response_cache, page_renderer) if page_renderer is not None else None
+
+        if time_started is not None:
+
+            @self._app.after_request
+            def _first_response(response: Response) -> Response:
+                """Logs time to first byte since start (perf_counter() value of time_started)"""
+                if self._time_started is not None:
+                    logging.info(
+                        f"First response ({request.method} {request.path}) served "
+                        f"{(perf_counter() - self._time_started) * 1000:.0f}ms after start"
+                    )
+                    self._time_started = None
+                return response
+
+        if metrics is not None:
+
+            @self._app.before_request
+            def _request_start() -> None:
+                """Saves request start time"""
+                g.time_start = perf_counter()
+
+            @self._app.after_request
+            def _request_end(response: Response) -> Response:
+                """Records request serve time"""
+                time_start = g.get("time_start")
+                if time_start is not None:
+                    metrics.observe_request(request.endpoint or "unknown", request.method, perf_counter() - time_start)
+                return response
+
+            @self._app.route("/metrics", methods=["GET"])
+            @self._limiter.exempt
+            def _metrics() -> Response:
+                """Prometheus metrics
+                NOTE: if API_KEY is set, request must have "apiKey" argument with API_KEY value
+
+                Returns:
+                    Response: metrics in Prometheus text format or 403
+                """
+                request_api_key = request.args.get("apiKey")
+                if api_key and (not request_api_key or request_api_key != api_key):
+                    logging.warning(f"User {request.remote_addr} provided wrong api key: {request_api_key}")
+                    return Response(response="No or wrong API key provided", status=403)
+
+                return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
         @self._app.route("/", methods=["GET"])
         def _index() -> Response | str:
@@ -70,6 +133,10 @@ class Server:
                 logging.warning(f"User {request.remote_addr} provided wrong api key: {request_api_key}")
                 return Response(response="No or wrong API key provided", status=403)
 
+            # Page rendered on server
+            if self._page_cache is not None:
+                return self._cached_response(self._page_cache, "text/html")
+
             return render_template(
                 "index.html",
                 page_title=page_title,
@@ -77,15 +144,19 @@ class Server:
                 last_check_text=last_check_text,
                 color_palette=color_palette,
                 extra_css=extra_css if extra_css else "",
+                events_port=events_port if events_port else 0,
             )
 
         @self._app.route("/", methods=["POST"])
         def _data() -> Response:
             """Data request (POST)
             NOTE: if API_KEY is set, request must have a JSON body with "apiKey" key and API_KEY value
+            Optional JSON body keys:
+                "since": unix time, return only bars (including current one) that changed after it
+                "ids": list of status IDs to return
 
             Returns:
-                Response: JSON data or 400 or 403
+                Response: JSON data or 304 (if If-None-Match header matches current data) or 400 or 403
                 data format: {"id": {"status": 0/1/2, "status_text": "", "label": "", "timestamps": [], "data": []},}
             """
             # Check request and API key
@@ -98,14 +169,165 @@ class Server:
                     logging.warning(f"User {request.remote_addr} provided wrong api key: {request_api_key}")
                     return Response(response="Wrong API key provided", status=403)
 
-            return jsonify(api_data)
+            # Range / delta request
+            request_json = request.get_json(silent=True) or {}
+            since = request_json.get("since")
+            ids = request_json.get("ids")
+            if since is not None or ids is not None:
+                if since is not None and (
+                    isinstance(since, bool) or not isinstance(since, (int, float)) or not math.isfinite(since)
+                ):
+                    return Response(response="since must be a number", status=400)
+                if ids is not None and (
+                    not isinstance(ids, list) or not all(isinstance(status_id, str) for status_id in ids)
+                ):
+                    return Response(response="ids must be a list of strings", status=400)
+                statuses_data = {}
+                api_data_ = self._response_cache.api_data
+                for status_id in ids if ids is not None else list(api_data_.keys()):
+                    data_dict = api_data_.get(status_id)
+                    if data_dict is None:
+                        continue
+                    statuses_data[status_id] = (
+                        slice_data_dict(data_dict, int(since)) if since is not None else data_dict
+                    )
+                return jsonify(statuses_data)
+
+            return self._cached_response(self._response_cache)
+
+        if ingest_callback is not None:
+
+            @self._app.route("/ingest", methods=["POST"])
+            @self._limiter.exempt
+            def _ingest() -> Response:
+                """Batch of checks from agent (collector mode)
+                NOTE: if API_KEY is set, request must have "apiKey" key with API_KEY value
+                JSON body: {"checks": [{"id": "status ID", "t": unix time, "v": true / false, "l": latency}, ...]}
+
+                Returns:
+                    Response: {"accepted": number of accepted checks} or 400 or 403
+                """
+                request_json = request.get_json(silent=True)
+                if not isinstance(request_json, dict):
+                    return Response(response="No JSON body provided", status=400)
+                if api_key:
+                    request_api_key = request_json.get("apiKey")
+                    if not request_api_key or request_api_key != api_key:
+                        logging.warning(f"Agent {request.remote_addr} provided wrong api key: {request_api_key}")
+                        return Response(response="Wrong API key provided", status=403)
+
+                checks = request_json.get("checks")
+                if not isinstance(checks, list):
+                    return Response(response="checks must be a list", status=400)
+                accepted = ingest_callback(checks)
+                logging.debug(f"Accepted {accepted} of {len(checks)} checks from {request.remote_addr}")
+                return jsonify({"accepted": accepted})
+
+        if uptime_callback is not None:
+
+            @self._app.route("/uptime", methods=["GET"])
+            def _uptime() -> Response:
+                """Uptime of status within time range from database rollups (sqlite database backend only)
+                NOTE: if API_KEY is set, request must have "apiKey" argument with API_KEY value
+                Arguments:
+                    "id": ID of status
+                    "from": start of range (unix time). Defaults to 24 hours before "to"
+                    "to": end of range (unix time). Defaults to now
+
+                Returns:
+                    Response: JSON data or 400 or 403 or 404
+                    data format: {"id": "", "from": 0, "to": 0, "period": 3600, "checks": 0, "working": 0,
+                    "uptime": 100.0 or null, "buckets": [[bucket start time, checks, working checks], ...]}
+                """
+                request_api_key = request.args.get("apiKey")
+                if api_key and (not request_api_key or request_api_key != api_key):
+                    logging.warning(f"User {request.remote_addr} provided wrong api key: {request_api_key}")
+                    return Response(response="No or wrong API key provided", status=403)
+
+                status_id = request.args.get("id")
+                if not status_id:
+                    return Response(response="No id provided", status=400)
+                if status_id not in self._response_cache.api_data:
+                    return Response(response=f"Unknown status: {status_id}", status=404)
+                try:
+                    time_to = int(request.args.get("to", int(time())))
+                    time_from = int(request.args.get("from", time_to - 86400))
+                except ValueError:
+                    return Response(response="from and to must be unix time", status=400)
+                if time_from >= time_to:
+                    return Response(response="from must be less than to", status=400)
+
+                period, buckets = uptime_callback(status_id, time_from, time_to)
+                checks = sum(bucket[1] for bucket in buckets)
+                working = sum(bucket[2] for bucket in buckets)
+                return jsonify(
+                    {
+                        "id": status_id,
+                        "from": time_from,
+                        "to": time_to,
+                        "period": period,
+                        "checks": checks,
+                        "working": working,
+                        "uptime": round(working / checks * 100, 3) if checks else None,
+                        "buckets": [list(bucket) for bucket in buckets],
+                    }
+                )
+
+    @property
+    def response_cache(self) -> ResponseCache | SnapshotReader:
+        """
+        Returns:
+            ResponseCache | SnapshotReader: serialized API data
+        """
+        return self._response_cache
+
+    def data_updated(self) -> None:
+        """Invalidates cached data response (call it after each api_data change)"""
+        self._response_cache.invalidate()
+
+    def _cached_response(
+        self, response_cache: ResponseCache | SnapshotReader | PageCache, mimetype: str = "application/json"
+    ) -> Response:
+        """Builds response from cache using best encoding accepted by client
+
+        Args:
+            response_cache (ResponseCache | SnapshotReader | PageCache): cache to get response from
+            mimetype (str, optional): type of cached response. Defaults to "application/json"
+
+        Returns:
+            Response: JSON response or 304 if client already has current version
+        """
+        etag, variants = response_cache.get()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        encoding = "identity"
+        for encoding_ in ENCODINGS:
+            if encoding_ in variants and request.accept_encodings[encoding_]:
+                encoding = encoding_
+                break
+
+        response = Response(variants[encoding], mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        return response
 
-    def start(self, host: str, port: int) -> None:
+    def start(self, host: str, port: int, socket_: socket.socket | None = None) -> None:
         """Starts Flask server (blocking)
 
         Args:
             host (str): server's host (IP)
             port (int): server's port
+            socket_ (socket.socket | None, optional): already listening socket (shared by server workers).
+            Defaults to None
         """
+        if socket_ is not None:
+            serve(self._app, sockets=[socket_])
+            return
         logging.info(f"Starting server on {host}:{port}")
         serve(self._app, host=host, port=port)
@@ -0,0 +1,239 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from simple_status_server.probe import Probe, ProbeResult
+from simple_status_server.status import Status
+
+CONFIG_DEFAULT = {
+    "batch": True,
+    "systemctl_path": "/usr/bin/systemctl",
+    "batch_window": 0.1,
+    "max_batch": 256,
+}
+
+
+class ServiceCollector:
+    def __init__(self, config: dict[str, Any] | None = None) -> None:
+        """Collects states of all systemd units that are due within batch_window using a single
+        "systemctl show" call and fans results out to the waiting checks
+
+        Args:
+            config (dict[str, Any] | None, optional): collector config (see CONFIG_DEFAULT). Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._batch = bool(config.get("batch", CONFIG_DEFAULT["batch"]))
+        self._systemctl_path = str(config.get("systemctl_path", CONFIG_DEFAULT["systemctl_path"]))
+        self._batch_window = float(config.get("batch_window", CONFIG_DEFAULT["batch_window"]))
+        self._max_batch = int(config.get("max_batch", CONFIG_DEFAULT["max_batch"]))
+
+        # unit name -> futures of checks waiting for this unit
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._pending_timeout = 0.0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def check(self, unit: str, timeout: float) -> bool:
+        """Checks if unit is active (must be called from the same event loop every time)
+
+        Args:
+            unit (str): name of systemd unit
+            timeout (float): check timeout in seconds
+
+        Returns:
+            bool: True if unit is active
+        """
+        if not self._batch:
+            return await self._check_single(unit, timeout)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(unit, []).append(future)
+        self._pending_timeout = max(self._pending_timeout, timeout)
+
+        # Flush immediately if batch is full or wait for other checks
+        if len(self._pending) >= self._max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+
+        return await future
+
+    async def check_many(self, units: list[str], timeout: float) -> list[bool]:
+        """Checks multiple units right away (together with other pending units) without waiting for batch_window
+
+        Args:
+            units (list[str]): names of systemd units
+            timeout (float): check timeout in seconds
+
+        Returns:
+            list[bool]: True for each active unit (in the same order as units)
+        """
+        if not self._batch:
+            return list(await asyncio.gather(*[self._check_single(unit, timeout) for unit in units]))
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for i in range(0, len(units), self._max_batch):
+            for unit in units[i : i + self._max_batch]:
+                future = loop.create_future()
+                self._pending.setdefault(unit, []).append(future)
+                futures.append(future)
+            self._pending_timeout = max(self._pending_timeout, timeout)
+            self._flush()
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self) -> None:
+        """Starts batched query of all pending units"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending = self._pending
+        timeout = self._pending_timeout
+        self._pending = {}
+        self._pending_timeout = 0.0
+
+        task = asyncio.get_running_loop().create_task(self._query(pending, timeout))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _query(self, pending: dict[str, list[asyncio.Future]], timeout: float) -> None:
+        """Queries states of units and sets results of their futures
+
+        Args:
+            pending (dict[str, list[asyncio.Future]]): unit name -> futures of checks
+            timeout (float): query timeout in seconds
+        """
+        units = list(pending.keys())
+        logging.debug(f"Querying state of {len(units)} units")
+        try:
+            states = await self._query_batch(units, timeout)
+        except Exception as e:
+            logging.warning(f"Unable to query units in batch: {e}. Checking them one by one")
+            results = await asyncio.gather(*[self._check_single(unit, timeout) for unit in units])
+            states = {unit: "active" if result else "unknown" for unit, result in zip(units, results)}
+
+        for unit, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(states.get(unit) == "active")
+
+    async def _query_batch(self, units: list[str], timeout: float) -> dict[str, str]:
+        """Runs "systemctl show" for all units
+
+        Args:
+            units (list[str]): names of units
+            timeout (float): timeout in seconds
+
+        Raises:
+            Exception: in case of non-zero exit code or unexpected output
+
+        Returns:
+            dict[str, str]: unit name -> ActiveState
+        """
+        process = await asyncio.create_subprocess_exec(
+            self._systemctl_path,
+            "show",
+            "--property=ActiveState",
+            "--",
+            *units,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                stdout, _ = await process.communicate()
+        except TimeoutError:
+            process.kill()
+            await process.wait()
+            raise Exception(f"Timeout after {timeout}s")
+        if process.returncode != 0:
+            raise Exception(f"systemctl exited with code {process.returncode}")
+
+        # Blocks of properties are separated by empty lines in the same order as units
+        states = []
+        for block in stdout.decode("utf-8", errors="replace").strip().split("\n\n"):
+            state = ""
+            for line in block.splitlines():
+                key, _, value = line.partition("=")
+                if key.strip() == "ActiveState":
+                    state = value.strip()
+            states.append(state)
+        if len(states) != len(units):
+            raise Exception(f"Expected {len(units)} units in systemctl output, got {len(states)}")
+
+        return dict(zip(units, states))
+
+    async def _check_single(self, unit: str, timeout: float) -> bool:
+        """Checks single unit using "systemctl is-active --quiet"
+
+        Args:
+            unit (str): name of unit
+            timeout (float): timeout in seconds
+
+        Returns:
+            bool: True if unit is active
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self._systemctl_path,
+                "is-active",
+                "--quiet",
+                unit,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logging.error(f"Unable to check unit {unit}: {e}")
+            return False
+        try:
+            async with asyncio.timeout(timeout):
+                return await process.wait() == 0
+        except TimeoutError:
+            process.kill()
+            await process.wait()
+            return False
+
+
+class ServiceProbe(Probe):
+    batchable = True
+    concurrency = 64
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'service' type. Checks if systemd unit is active. Units are queried in batches (see ServiceCollector)"""
+        super().__init__(config, trigger)
+        self._collector = ServiceCollector(config)
+
+    async def probe(self, status: Status) -> ProbeResult:
+        result = await self._collector.check(str(status.target), status.target_timeout)
+        return ProbeResult(result, None if result else "inactive")
+
+    async def probe_batch(self, statuses: list[Status]) -> list[ProbeResult]:
+        results = await self._collector.check_many(
+            [str(status.target) for status in statuses], max(status.target_timeout for status in statuses)
+        )
+        return [ProbeResult(result, None if result else "inactive") for result in results]
@@ -0,0 +1,268 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from threading import Event, Lock, Thread
+from time import sleep
+from typing import Any
+
+from simple_status_server.metrics import Metrics
+from simple_status_server.response_cache import ResponseCache
+
+# magic, sequence (odd while snapshot is being written), payload length
+HEADER = struct.Struct("<8sQQ")
+MAGIC = b"SSSSNAP1"
+
+CAPACITY_INITIAL = 1024 * 1024
+
+# Number of attempts to read consistent snapshot before waiting
+READ_ATTEMPTS = 100
+
+
+def pack_variants(etag: str, variants: dict[str, bytes]) -> bytes:
+    """Serializes response cache into snapshot payload
+    >>> unpack_variants(pack_variants("abc", {"identity": b"{}", "gzip": b"123"}))
+    ('abc', {'identity': b'{}', 'gzip': b'123'})
+
+    Args:
+        etag (str): ETag of response
+        variants (dict[str, bytes]): encoding -> response body
+
+    Returns:
+        bytes: payload
+    """
+    etag_bytes = etag.encode("utf-8")
+    parts = [struct.pack("<H", len(etag_bytes)), etag_bytes, struct.pack("<B", len(variants))]
+    for encoding, body in variants.items():
+        encoding_bytes = encoding.encode("utf-8")
+        parts += [struct.pack("<B", len(encoding_bytes)), encoding_bytes, struct.pack("<Q", len(body)), body]
+    return b"".join(parts)
+
+
+def unpack_variants(payload: bytes) -> tuple[str, dict[str, bytes]]:
+    """Parses snapshot payload
+
+    Args:
+        payload (bytes): see pack_variants()
+
+    Returns:
+        tuple[str, dict[str, bytes]]: ETag and encoding -> response body
+    """
+    (etag_length,) = struct.unpack_from("<H", payload, 0)
+    offset = 2
+    etag = payload[offset : offset + etag_length].decode("utf-8")
+    offset += etag_length
+    (count,) = struct.unpack_from("<B", payload, offset)
+    offset += 1
+    variants = {}
+    for _ in range(count):
+        (encoding_length,) = struct.unpack_from("<B", payload, offset)
+        offset += 1
+        encoding = payload[offset : offset + encoding_length].decode("utf-8")
+        offset += encoding_length
+        (body_length,) = struct.unpack_from("<Q", payload, offset)
+        offset += 8
+        variants[encoding] = payload[offset : offset + body_length]
+        offset += body_length
+    return etag, variants
+
+
+class SnapshotWriter:
+    def __init__(self, capacity: int = CAPACITY_INITIAL) -> None:
+        """Single writer of serialized API data into memory-mapped file shared with server workers.
+        Uses seqlock: sequence is odd while payload is being written, so readers retry instead of locking.
+        File grows (and is never shrunk) if payload doesn't fit
+
+        Args:
+            capacity (int, optional): initial payload capacity in bytes. Defaults to CAPACITY_INITIAL
+        """
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        fd, self.path = tempfile.mkstemp(prefix="simple-status-server-", suffix=".snapshot", dir=directory)
+        self._file = os.fdopen(fd, "r+b")
+        self._file.truncate(HEADER.size + capacity)
+        self._mmap = mmap.mmap(self._file.fileno(), HEADER.size + capacity)
+        self._sequence = 0
+        HEADER.pack_into(self._mmap, 0, MAGIC, self._sequence, 0)
+        logging.debug(f"Created shared snapshot {self.path}")
+
+    def write(self, etag: str, variants: dict[str, bytes]) -> None:
+        """Publishes new response
+
+        Args:
+            etag (str): ETag of response
+            variants (dict[str, bytes]): encoding -> response body
+        """
+        payload = pack_variants(etag, variants)
+
+        # Begin write
+        self._sequence += 1
+        struct.pack_into("<Q", self._mmap, 8, self._sequence)
+
+        # Grow file
+        if HEADER.size + len(payload) > len(self._mmap):
+            size = len(self._mmap)
+            while HEADER.size + len(payload) > size:
+                size *= 2
+            self._mmap.close()
+            self._file.truncate(size)
+            self._mmap = mmap.mmap(self._file.fileno(), size)
+            logging.debug(f"Shared snapshot resized to {size} bytes")
+
+        self._mmap[HEADER.size : HEADER.size + len(payload)] = payload
+
+        # End write (length must be written before sequence)
+        struct.pack_into("<Q", self._mmap, 16, len(payload))
+        self._sequence += 1
+        struct.pack_into("<Q", self._mmap, 8, self._sequence)
+
+    def close(self) -> None:
+        """Unmaps and removes file"""
+        self._mmap.close()
+        self._file.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class SnapshotReader:
+    def __init__(self, path: str) -> None:
+        """Reads API data published by SnapshotWriter. Has the same interface as ResponseCache,
+        payload is copied and parsed only once per published snapshot
+
+        Args:
+            path (str): SnapshotWriter.path
+        """
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._lock = Lock()
+        self._sequence = -1
+        self._etag = ""
+        self._variants: dict[str, bytes] = {}
+        self._api_data: dict[str, dict[str, Any]] | None = None
+
+    @property
+    def api_data(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns:
+            dict[str, dict[str, Any]]: parsed API data of the latest snapshot
+        """
+        with self._lock:
+            self._read()
+            api_data = self._api_data
+            if api_data is None:
+                api_data = json.loads(self._variants.get("identity", b"{}"))
+                self._api_data = api_data
+            return api_data
+
+    def invalidate(self) -> None:
+        """Does nothing (snapshot is updated by writer)"""
+        pass
+
+    def wait(self) -> None:
+        """Waits until the first snapshot is published"""
+        while HEADER.unpack_from(self._mmap, 0)[1] == 0:
+            sleep(0.01)
+
+    def get(self) -> tuple[str, dict[str, bytes]]:
+        """
+        Returns:
+            tuple[str, dict[str, bytes]]: ETag and encoding -> response body of the latest snapshot
+        """
+        with self._lock:
+            self._read()
+            return self._etag, self._variants
+
+    def _read(self) -> None:
+        """Reads snapshot if it has changed (must be called with self._lock acquired)"""
+        attempt = 0
+        while True:
+            magic, sequence, _ = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC:
+                raise Exception("Wrong shared snapshot file")
+            if sequence == self._sequence:
+                return
+            (length,) = struct.unpack_from("<Q", self._mmap, 16)
+
+            # Consistent snapshot (not being written and fits into mapping)
+            if sequence % 2 == 0:
+                if HEADER.size + length > len(self._mmap):
+                    self._mmap.close()
+                    self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                    continue
+                payload = self._mmap[HEADER.size : HEADER.size + length]
+                (sequence_end,) = struct.unpack_from("<Q", self._mmap, 8)
+                if sequence_end == sequence:
+                    if length > 0:
+                        self._etag, self._variants = unpack_variants(payload)
+                        self._api_data = None
+                    self._sequence = sequence
+                    return
+
+            attempt += 1
+            sleep(0 if attempt < READ_ATTEMPTS else 0.001)
+
+
+class SnapshotPublisher:
+    def __init__(self, response_cache: ResponseCache | Metrics, writer: SnapshotWriter, interval: float = 0.1) -> None:
+        """Publishes response cache into shared snapshot whenever it changes (at most every interval)
+
+        Args:
+            response_cache (ResponseCache | Metrics): source of serialized API data (or rendered metrics)
+            writer (SnapshotWriter): shared snapshot
+            interval (float, optional): check interval in seconds. Defaults to 0.1
+        """
+        self._response_cache = response_cache
+        self._writer = writer
+        self._interval = interval
+
+        self._etag: str | None = None
+        self._exit_event = Event()
+        self._thread = Thread(target=self._loop, name="snapshot-publisher", daemon=True)
+
+    def start(self) -> None:
+        """Starts background publishing thread"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops background thread"""
+        self._exit_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def publish(self) -> None:
+        """Writes response into snapshot if it has changed since the last call"""
+        etag, variants = self._response_cache.get()
+        if etag != self._etag:
+            self._writer.write(etag, variants)
+            self._etag = etag
+
+    def _loop(self) -> None:
+        """Publishes changes every interval"""
+        while not self._exit_event.wait(self._interval):
+            try:
+                self.publish()
+            except Exception as e:
+                logging.error(f"Unable to publish shared snapshot: {e}", exc_info=e)
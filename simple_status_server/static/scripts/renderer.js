@@ -18,6 +18,12 @@
  * OTHER DEALINGS IN THE SOFTWARE.
  */
 
+// ETag of the last received data (to skip parsing if data hasn't changed)
+let _dataETag = null;
+
+// Last received data from events stream (to apply deltas to)
+let _rawData = {};
+
 /**
  * Converts UTC time into client's time string
  * @param {Number} timestamp time from server
@@ -98,13 +104,21 @@ function _createStatus(charts, id) {
         data: chartData,
         options: {
             responsive: true,
-            scales: { y: { display: false, stacked: true, min: 0, max: 1 }, x: { display: false, stacked: true } },
+            scales: {
+                y: { display: false, stacked: true, min: 0, max: 1 },
+                x: { display: false, stacked: true },
+                latency: { display: false, min: 0 },
+            },
             legend: { display: false },
             plugins: {
                 legend: { display: false },
                 tooltip: {
                     callbacks: {
                         label: (item) => {
+                            if (item.dataset.latencyRaw) {
+                                const latency = item.dataset.latencyRaw[item.dataIndex];
+                                return latency ? ` ${latency[0]} / ${latency[1]} / ${latency[2]} ms` : null;
+                            }
                             const uptime = item.dataset.dataRaw[item.dataIndex];
                             return uptime >= 0 ? ` ${uptime} %` : null;
                         },
@@ -121,14 +135,15 @@ function _createStatus(charts, id) {
 /**
  * Updates status's data and generates new status if needed
  * @param {Object} responseRaw Response from server
- * {id1: {status: true, status_text: "", label: "", bars_max: 48, labels: [], data: []}, id2: ...,}
+ * {id1: {status: true, status_text: "", label: "", bars_max: 48, labels: [], data: [], latency: []}, id2: ...,}
  * @param {Object} charts Chart's data to update
+ * @param {Boolean} partial true if responseRaw contains only updated statuses (will not remove other ones)
  */
-function _parseUpdateData(responseRaw, charts) {
+function _parseUpdateData(responseRaw, charts, partial = false) {
     // Remove non-existing ones
     const idsToDelete = [];
     Object.keys(charts).forEach((statusID) => {
-        if (!(statusID in responseRaw)) idsToDelete.push(statusID);
+        if (!partial && !(statusID in responseRaw)) idsToDelete.push(statusID);
     });
     idsToDelete.forEach((statusID) => {
         console.log(`Removing status ${statusID}`);
@@ -160,7 +175,7 @@ function _parseUpdateData(responseRaw, charts) {
             //charts[statusID].data.labels.push([labelStart, labelEnd]);
             charts[statusID].data.labels.push(`${labelStart} - ${labelEnd}`);
         });
-        charts[statusID].data.datasets[0].dataRaw = statusRaw.data || [];
+        charts[statusID].data.datasets[0].dataRaw = (statusRaw.data || []).slice();
         charts[statusID].data.datasets[0].data = new Array(charts[statusID].data.datasets[0].dataRaw.length).fill(1);
 
         // Calculate average uptime
@@ -178,6 +193,26 @@ function _parseUpdateData(responseRaw, charts) {
             charts[statusID].data.datasets[0].data.unshift(1);
         }
 
+        // Latency series (min, avg, p95 in ms of each bar, draws avg)
+        if (statusRaw.latency) {
+            if (charts[statusID].data.datasets.length < 2)
+                charts[statusID].data.datasets.push({
+                    type: "line",
+                    yAxisID: "latency",
+                    data: [],
+                    borderColor: "rgba(255, 255, 255, 0.6)",
+                    borderWidth: 1.5,
+                    pointRadius: 0,
+                    pointHitRadius: 5,
+                    spanGaps: true,
+                });
+            const latencyDataset = charts[statusID].data.datasets[1];
+            latencyDataset.latencyRaw = statusRaw.latency.slice();
+            while (latencyDataset.latencyRaw.length < charts[statusID].data.datasets[0].data.length)
+                latencyDataset.latencyRaw.unshift(null);
+            latencyDataset.data = latencyDataset.latencyRaw.map((latency) => (latency ? latency[1] : null));
+        } else if (charts[statusID].data.datasets.length > 1) charts[statusID].data.datasets.splice(1);
+
         // Create new status and chart if not exists
         if (create) _createStatus(charts, statusID);
 
@@ -221,6 +256,94 @@ function _parseUpdateData(responseRaw, charts) {
     });
 }
 
+/**
+ * Applies status delta from events stream to _rawData
+ * @param {Object} delta {id: "", status: 0, status_text: "", label: "", bars_max: 48, check: {t: 0, v: true},
+ * current_bar: [[start, end], value, latency], closed_bar: [[start, end], value, latency]}
+ * (latency is [min, avg, p95] in ms or null and present only for statuses with latency)
+ */
+function _applyDelta(delta) {
+    const statusRaw = _rawData[delta.id] || { timestamps: [], data: [] };
+    statusRaw.status = delta.status;
+    statusRaw.status_text = delta.status_text;
+    statusRaw.label = delta.label;
+    statusRaw.bars_max = delta.bars_max;
+
+    // Update bar if it has the same start time or append a new one
+    const pushBar = (bar) => {
+        if (bar.length > 2 && !statusRaw.latency) statusRaw.latency = new Array(statusRaw.data.length).fill(null);
+        const last = statusRaw.timestamps.length - 1;
+        if (last >= 0 && statusRaw.timestamps[last][0] === bar[0][0]) {
+            statusRaw.timestamps[last] = bar[0];
+            statusRaw.data[last] = bar[1];
+            if (statusRaw.latency) statusRaw.latency[last] = bar[2] || null;
+        } else {
+            statusRaw.timestamps.push(bar[0]);
+            statusRaw.data.push(bar[1]);
+            if (statusRaw.latency) statusRaw.latency.push(bar[2] || null);
+        }
+    };
+    if (delta.closed_bar) pushBar(delta.closed_bar);
+    if (delta.current_bar) pushBar(delta.current_bar);
+
+    // Keep bars_max bars + current one
+    while (statusRaw.timestamps.length > delta.bars_max + 1) {
+        statusRaw.timestamps.shift();
+        statusRaw.data.shift();
+        if (statusRaw.latency) statusRaw.latency.shift();
+    }
+
+    _rawData[delta.id] = statusRaw;
+}
+
+/**
+ * Subscribes to events stream if it's available or falls back to polling
+ * @param {Object} charts Charts data {id1: {chart: chartInstance, data: {labels: [], ...}}, id2: ..., ...}
+ */
+function startUpdates(charts) {
+    const startPolling = () => {
+        requestAndRender(charts);
+        setInterval(requestAndRender, PAGE_UPDATE_INTERVAL, charts);
+    };
+
+    if (!EVENTS_PORT || !window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    // Get API key from URL
+    const apiKey = new URL(window.location.href).searchParams.get("apiKey");
+    let url = `${window.location.protocol}//${window.location.hostname}:${EVENTS_PORT}/events`;
+    if (apiKey) url += `?apiKey=${encodeURIComponent(apiKey)}`;
+
+    console.log("Subscribing to events...");
+    const source = new EventSource(url);
+    let opened = false;
+
+    // Full data (after each connect / reconnect)
+    source.addEventListener("snapshot", (event) => {
+        opened = true;
+        console.log("Snapshot received");
+        _rawData = JSON.parse(event.data);
+        _parseUpdateData(_rawData, charts);
+    });
+
+    // Single status update
+    source.addEventListener("delta", (event) => {
+        const delta = JSON.parse(event.data);
+        _applyDelta(delta);
+        _parseUpdateData({ [delta.id]: _rawData[delta.id] }, charts, true);
+    });
+
+    // Events stream is not available
+    source.onerror = () => {
+        if (opened) return;
+        console.error("Unable to subscribe to events. Falling back to polling");
+        source.close();
+        startPolling();
+    };
+}
+
 /**
  * Requests data from server and updates charts
  * @param {Object} charts Charts data {id1: {chart: chartInstance, data: {labels: [], ...}}, id2: ..., ...}
@@ -234,7 +357,14 @@ function requestAndRender(charts) {
     xhr.open("POST", url, true);
     xhr.timeout = 5000;
     xhr.setRequestHeader("Content-Type", "application/json");
+    if (_dataETag) xhr.setRequestHeader("If-None-Match", _dataETag);
     xhr.onload = function () {
+        // Data not changed
+        if (xhr.status === 304) {
+            console.log("Data not changed");
+            return;
+        }
+
         // Check status
         if (xhr.status !== 200) {
             console.error(`Error: ${xhr.status}`);
@@ -243,6 +373,7 @@ function requestAndRender(charts) {
 
         // Process data
         console.log("Data received");
+        _dataETag = xhr.getResponseHeader("ETag");
         _parseUpdateData(JSON.parse(xhr.responseText), charts);
     };
     xhr.ontimeout = (e) => {
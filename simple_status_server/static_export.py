@@ -0,0 +1,193 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from os import path
+from threading import Event, Thread
+from time import perf_counter
+from typing import Any
+from urllib.parse import quote
+
+from simple_status_server.page_renderer import PageCache, PageRenderer
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.status import parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "output_dir": None,
+    "interval": "1s",
+    "precompress": True,
+}
+
+# Suffixes of precompressed files (as expected by ex. nginx gzip_static / brotli_static)
+ENCODING_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def status_file_name(status_id: str) -> str:
+    """
+    >>> status_file_name("google"), status_file_name("disk /home")
+    ('google.json', 'disk%20%2Fhome.json')
+
+    Args:
+        status_id (str): ID of status
+
+    Returns:
+        str: name of status's JSON file (safe to use as file name and URL)
+    """
+    return quote(status_id, safe="") + ".json"
+
+
+class StaticExporter:
+    def __init__(self, response_cache: ResponseCache, renderer: PageRenderer, config: dict[str, Any]) -> None:
+        """Writes status page rendered on server (index.html, has stylesheet inlined), all data (data.json)
+        and data of each status (statuses/<id>.json) into output_dir, so they can be served by any static
+        file server. Files are written into hidden temporary files and renamed, unchanged files are not rewritten
+
+        Args:
+            response_cache (ResponseCache): serialized API data
+            renderer (PageRenderer): page renderer
+            config (dict[str, Any]): see CONFIG_DEFAULT
+        """
+        output_dir = config.get("output_dir", CONFIG_DEFAULT["output_dir"])
+        if not output_dir:
+            raise Exception("No output_dir specified for static export")
+        self._output_dir = str(output_dir)
+        self._interval = parse_time_cfg(config.get("interval", CONFIG_DEFAULT["interval"]))
+        self._precompress = bool(config.get("precompress", CONFIG_DEFAULT["precompress"]))
+
+        self._response_cache = response_cache
+        self._page_cache = PageCache(response_cache, renderer)
+
+        # Path -> SHA-256 of written content
+        self._hashes: dict[str, str] = {}
+        self._etag: str | None = None
+
+        self._exit_event = Event()
+        self._update_event = Event()
+        self._thread = Thread(target=self._loop, name="static-export", daemon=True)
+
+    def start(self) -> None:
+        """Exports current data and starts background export thread"""
+        logging.info(f"Exporting status page into {self._output_dir}")
+        self._remove_stale()
+        self.export()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops background thread and exports pending changes"""
+        self._exit_event.set()
+        self._update_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.export()
+
+    def notify(self) -> None:
+        """Schedules export (call it after each api_data change)"""
+        self._update_event.set()
+
+    def export(self) -> None:
+        """Writes page and data if data has changed since the last export"""
+        etag, variants = self._response_cache.get()
+        if etag == self._etag:
+            return
+        time_start = perf_counter()
+
+        _, page_variants = self._page_cache.get()
+        written = self._write_variants("index.html", page_variants)
+        written += self._write_variants("data.json", variants)
+        for status_id, data_dict in self._response_cache.api_data.items():
+            data = json.dumps(data_dict, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            written += self._write(path.join("statuses", status_file_name(status_id)), data)
+
+        self._etag = etag
+        logging.debug(f"Exported {written} files in {(perf_counter() - time_start) * 1000:.2f}ms")
+
+    def _loop(self) -> None:
+        """Exports changes at most every interval"""
+        while True:
+            self._update_event.wait()
+            if self._exit_event.is_set():
+                return
+            self._update_event.clear()
+            try:
+                self.export()
+            except Exception as e:
+                logging.error(f"Unable to export status page: {e}", exc_info=e)
+            if self._exit_event.wait(self._interval):
+                return
+
+    def _remove_stale(self) -> None:
+        """Removes files of statuses that are no longer configured"""
+        statuses_dir = path.join(self._output_dir, "statuses")
+        if not path.isdir(statuses_dir):
+            return
+        file_names = {status_file_name(status_id) for status_id in self._response_cache.api_data}
+        for file_name in os.listdir(statuses_dir):
+            if file_name.removesuffix(".gz").removesuffix(".br") not in file_names:
+                logging.info(f"Removing exported data of non-configured status: {file_name}")
+                os.remove(path.join(statuses_dir, file_name))
+
+    def _write_variants(self, relative_path: str, variants: dict[str, bytes]) -> int:
+        """Writes response and (if precompress is enabled) its compressed variants
+
+        Args:
+            relative_path (str): path inside output_dir
+            variants (dict[str, bytes]): see ResponseCache.get()
+
+        Returns:
+            int: number of written files
+        """
+        written = self._write(relative_path, variants["identity"])
+        if self._precompress:
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                if encoding in variants:
+                    written += self._write(relative_path + suffix, variants[encoding])
+        return written
+
+    def _write(self, relative_path: str, data: bytes) -> int:
+        """Atomically replaces file if its content has changed
+
+        Args:
+            relative_path (str): path inside output_dir
+            data (bytes): new content
+
+        Returns:
+            int: 1 if file was written, 0 if it's unchanged
+        """
+        file_path = path.join(self._output_dir, relative_path)
+        data_hash = hashlib.sha256(data).hexdigest()
+
+        # Existing file (ex. from previous run)
+        if file_path not in self._hashes and path.exists(file_path):
+            with open(file_path, "rb") as file_io:
+                self._hashes[file_path] = hashlib.sha256(file_io.read()).hexdigest()
+        if self._hashes.get(file_path) == data_hash:
+            return 0
+
+        # Hidden, so it's not served (ex. nginx serves dot files unless denied, but index / autoindex skip them)
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        temp_path = path.join(path.dirname(file_path), "." + path.basename(file_path) + ".tmp")
+        with open(temp_path, "wb") as temp_io:
+            temp_io.write(data)
+        os.replace(temp_path, file_path)
+        self._hashes[file_path] = data_hash
+        return 1
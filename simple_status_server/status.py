@@ -19,9 +19,14 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import logging
+import math
+from bisect import bisect_right
 from enum import Enum
 from time import time
-from typing import Any
+from typing import Any, Iterable
+
+from simple_status_server.probe import get_probe_class, is_registered
+from simple_status_server.ring_buffer import RingBuffer
 
 CONFIG_DEFAULT = {
     "target_timeout": "10s",
@@ -31,8 +36,20 @@ CONFIG_DEFAULT = {
     "value_working": "Working",
     "value_problems": "Has problems",
     "value_not_working": "Not working",
+    "value_dependency_failed": "Dependency failed",
+    "url_method": "get",
+    "retries": 0,
+    "retry_interval": "10s",
+    "backoff_factor": 2.0,
+    "jitter": 0.0,
 }
 
+# Latency of checks is stored in microseconds as 32-bit signed integers
+LATENCY_MAX = 2**31 - 1
+
+# Latency stats (min, avg, p95) of bar without measured checks
+LATENCY_NONE = (-1, -1, -1)
+
 
 def parse_time_cfg(time_cfg: str | int) -> int:
     """Parses time config (ex. interval) into seconds
@@ -81,12 +98,90 @@ def parse_time_cfg(time_cfg: str | int) -> int:
     return int(seconds)
 
 
-class Type(Enum):
-    constant = 0
-    service = 1
-    command = 2
-    path = 3
-    url = 4
+def bar_index_since(timestamps: list, since: int) -> int:
+    """Finds first bar that ended after since using binary search
+    >>> bar_index_since([(0, 10), (11, 20), (21, 30)], 15)
+    1
+    >>> bar_index_since([(0, 10), (11, 20), (21, 30)], 20)
+    2
+    >>> bar_index_since([(0, 10), (11, 20), (21, 30)], 30)
+    3
+    >>> bar_index_since([], 30)
+    0
+
+    Args:
+        timestamps (list): (start, end) timestamps of bars sorted by time
+        since (int): unix time
+
+    Returns:
+        int: index of first bar with end time greater than since (or len(timestamps) if there is no such bar)
+    """
+    return bisect_right(timestamps, since, key=lambda timestamps_: timestamps_[1])
+
+
+def slice_data_dict(data_dict: dict[str, Any], since: int) -> dict[str, Any]:
+    """Removes bars that ended before or at since from data dictionary
+    >>> slice_data_dict({"status": 2, "timestamps": [(0, 10), (11, 20)], "data": [100, 50]}, 10)
+    {'status': 2, 'timestamps': [(11, 20)], 'data': [50], 'since': 10}
+
+    Args:
+        data_dict (dict[str, Any]): see Status.get_data_dict()
+        since (int): unix time
+
+    Returns:
+        dict[str, Any]: copy of data_dict with only bars (including current one) that changed after since
+    """
+    index = bar_index_since(data_dict["timestamps"], since)
+    data_dict = {
+        **data_dict,
+        "timestamps": data_dict["timestamps"][index:],
+        "data": data_dict["data"][index:],
+        "since": since,
+    }
+    if "latency" in data_dict:
+        data_dict["latency"] = data_dict["latency"][index:]
+    return data_dict
+
+
+def latency_stats(latencies: list[int]) -> tuple[int, int, int]:
+    """Calculates min, average and 95th percentile (nearest-rank) of latencies
+    >>> latency_stats([30, 10, 20])
+    (10, 20, 30)
+    >>> latency_stats(list(range(1, 101)))
+    (1, 50, 95)
+    >>> latency_stats([])
+    (-1, -1, -1)
+
+    Args:
+        latencies (list[int]): latencies of checks (in microseconds)
+
+    Returns:
+        tuple[int, int, int]: min, average and p95 latency or LATENCY_NONE if there are no latencies
+    """
+    if not latencies:
+        return LATENCY_NONE
+    latencies = sorted(latencies)
+    p95_index = max(math.ceil(len(latencies) * 0.95) - 1, 0)
+    return latencies[0], sum(latencies) // len(latencies), latencies[p95_index]
+
+
+def latency_to_ms(stats: Iterable[int]) -> list[float] | None:
+    """Converts latency stats into server's format
+    >>> latency_to_ms((1000, 1550, 12345))
+    [1.0, 1.55, 12.35]
+    >>> latency_to_ms((-1, -1, -1)) is None
+    True
+
+    Args:
+        stats (Iterable[int]): min, average and p95 latency (in microseconds)
+
+    Returns:
+        list[float] | None: min, average and p95 latency in milliseconds or None if bar has no latencies
+    """
+    stats = list(stats)
+    if stats[0] < 0:
+        return None
+    return [round(value / 1000, 2) for value in stats]
 
 
 class StatusValue(Enum):
@@ -96,10 +191,35 @@ class StatusValue(Enum):
 
 
 class CurrentBar:
-    def __init__(self) -> None:
+    def __init__(self, capacity: int = CONFIG_DEFAULT["checks_per_bar"]) -> None:
         self.time_start: int | None = None
         self.time_end: int | None = None
-        self.data: list[bool] = []
+        self._data = RingBuffer(capacity, "B", cast=bool)
+        self._latencies = RingBuffer(capacity, "i")
+
+    @property
+    def data(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: status values of current bar
+        """
+        return self._data
+
+    @data.setter
+    def data(self, values: Iterable[bool]) -> None:
+        self._data.replace(values)
+
+    @property
+    def latencies(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: latencies (in microseconds) of measured checks of current bar
+        """
+        return self._latencies
+
+    @latencies.setter
+    def latencies(self, values: Iterable[int]) -> None:
+        self._latencies.replace(values)
 
     def from_dict(self, bar_: dict[str, Any]) -> None:
         """Parses dictionary into bar data
@@ -114,6 +234,7 @@ class CurrentBar:
         if self.time_end == 0:
             self.time_end = None
         self.data = bar_.get("data", [])
+        self.latencies = bar_.get("latencies", [])
 
     def to_dict(self) -> dict[str, Any]:
         """
@@ -126,7 +247,9 @@ class CurrentBar:
         if self.time_end is not None:
             bar_["time_end"] = self.time_end
         if self.data:
-            bar_["data"] = self.data
+            bar_["data"] = self.data.to_list()
+        if self.latencies:
+            bar_["latencies"] = self.latencies.to_list()
         return bar_
 
     def avg_value(self) -> int:
@@ -136,7 +259,14 @@ class CurrentBar:
         """
         if not self.data:
             return 0
-        return int(self.data.count(True) / len(self.data) * 100.0)
+        return int(self.data.sum / len(self.data) * 100.0)
+
+    def latency_stats(self) -> tuple[int, int, int]:
+        """
+        Returns:
+            tuple[int, int, int]: min, average and p95 latency (in microseconds) of stored checks
+        """
+        return latency_stats(self.latencies.to_list())
 
     def get_timestamps(self) -> tuple[int, int]:
         """
@@ -161,7 +291,9 @@ class Status:
             raise Exception(f"Wrong target datatype for status {status_id} specified. Excepted str or bool")
 
         self.id = status_id
-        self.type = Type[config["type"].lower()]
+        self.type = str(config["type"]).lower()
+        if not is_registered(self.type):
+            raise Exception(f"Unknown type of status {status_id} specified: {self.type}")
         self.target: str | bool = config["target"]
 
         self.label = config.get("label", status_id)
@@ -172,12 +304,108 @@ class Status:
         self.value_working: str = config.get("value_working", CONFIG_DEFAULT["value_working"])
         self.value_problems: str = config.get("value_problems", CONFIG_DEFAULT["value_problems"])
         self.value_not_working: str = config.get("value_not_working", CONFIG_DEFAULT["value_not_working"])
+        self.value_dependency_failed: str = config.get(
+            "value_dependency_failed", CONFIG_DEFAULT["value_dependency_failed"]
+        )
         self.no_intermediate_value: bool = config.get("no_intermediate_value", False)
+        self.url_method: str = str(config.get("url_method", CONFIG_DEFAULT["url_method"])).lower()
+        if self.url_method not in ("get", "head", "range"):
+            raise Exception(f"Wrong url_method for status {status_id} specified. Expected get, head or range")
+
+        if self.checks_per_bar < 1:
+            raise Exception(f"checks_per_bar of status {status_id} must be at least 1")
+        if self.bars_max < 1:
+            raise Exception(f"bars_max of status {status_id} must be at least 1")
+
+        # Adaptive scheduling (interval_max can't exceed bar duration, so each check closes at most one bar)
+        self.interval_max = parse_time_cfg(config.get("interval_max", self.interval))
+        self.interval_max = min(max(self.interval_max, self.interval), self.interval * self.checks_per_bar)
+        self.retries = int(config.get("retries", CONFIG_DEFAULT["retries"]))
+        self.retry_interval = parse_time_cfg(config.get("retry_interval", CONFIG_DEFAULT["retry_interval"]))
+        self.backoff_factor = float(config.get("backoff_factor", CONFIG_DEFAULT["backoff_factor"]))
+        self.jitter = float(config.get("jitter", CONFIG_DEFAULT["jitter"]))
+        if self.interval <= 0:
+            raise Exception(f"interval of status {status_id} must be positive")
+        if self.retries < 0:
+            raise Exception(f"retries of status {status_id} can't be negative")
+        if self.backoff_factor < 1:
+            raise Exception(f"backoff_factor of status {status_id} must be at least 1")
+        if not 0 <= self.jitter < 1:
+            raise Exception(f"jitter of status {status_id} must be within [0, 1)")
+
+        # IDs of statuses this one depends on (resolved into dependencies by link_dependencies())
+        depends_on = config.get("depends_on", [])
+        self.depends_on: list[str] = [depends_on] if isinstance(depends_on, str) else [str(id_) for id_ in depends_on]
+        self.dependencies: list[Status] = []
+
+        # ID of dependency that is not working (status is not checked until it recovers)
+        self.dependency_failed: str | None = None
+
+        self._status_values = RingBuffer(self.checks_per_bar, "B", cast=bool)
+        self.current_bar: CurrentBar = CurrentBar(self.checks_per_bar)
+        self._timestamps = RingBuffer(self.bars_max, "q", width=2)
+        self._data = RingBuffer(self.bars_max, "B")
+        self._latency = RingBuffer(self.bars_max, "i", width=3)
+        self.last_bar_closed = False
+        self.last_latency: float | None = None
+        self.last_weight = 1
+
+    @property
+    def status_values(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: last checks_per_bar status values
+        """
+        return self._status_values
+
+    @status_values.setter
+    def status_values(self, values: Iterable[bool]) -> None:
+        self._status_values.replace(values)
 
-        self.status_values: list[bool] = []
-        self.current_bar: CurrentBar = CurrentBar()
-        self.timestamps: list[tuple[int, int]] = []
-        self.data: list[int] = []
+    @property
+    def timestamps(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: (start, end) timestamps of last bars_max completed bars
+        """
+        return self._timestamps
+
+    @timestamps.setter
+    def timestamps(self, values: Iterable[tuple[int, int]]) -> None:
+        self._timestamps.replace(values)
+
+    @property
+    def data(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: values (0-100, in %) of last bars_max completed bars
+        """
+        return self._data
+
+    @data.setter
+    def data(self, values: Iterable[int]) -> None:
+        self._data.replace(values)
+
+    @property
+    def latency(self) -> RingBuffer:
+        """
+        Returns:
+            RingBuffer: min, average and p95 latency (in microseconds) of last bars_max completed bars
+            (LATENCY_NONE for bars without measured checks)
+        """
+        return self._latency
+
+    @latency.setter
+    def latency(self, values: Iterable[tuple[int, int, int]]) -> None:
+        self._latency.replace(values)
+
+    @property
+    def latency_enabled(self) -> bool:
+        """
+        Returns:
+            bool: True if latency of checks is stored for this status
+        """
+        return get_probe_class(self.type).latency
 
     @property
     def current_status(self) -> StatusValue:
@@ -185,11 +413,15 @@ class Status:
         Returns:
             StatusValue: Calculated status from status_values
         """
+        # Not checked because of failed dependency
+        if self.dependency_failed is not None:
+            return StatusValue.not_working
+
         # No values yet
         if not self.status_values:
             return StatusValue.not_working if self.no_intermediate_value else StatusValue.problems
 
-        working_count = self.status_values.count(True)
+        working_count = self.status_values.sum
 
         # All status values are true
         if working_count == len(self.status_values):
@@ -206,8 +438,11 @@ class Status:
     def current_status_text(self) -> str:
         """
         Returns:
-            str: current status value (self.value_working / self.value_problems / self.value_not_working)
+            str: current status value (self.value_working / self.value_problems / self.value_not_working
+            / self.value_dependency_failed)
         """
+        if self.dependency_failed is not None:
+            return self.value_dependency_failed
         current_status = self.current_status
         if current_status == StatusValue.working:
             return self.value_working
@@ -215,16 +450,39 @@ class Status:
             return self.value_not_working
         return self.value_problems
 
-    def get_data_dict(self) -> dict[str, Any]:
+    @property
+    def is_down(self) -> bool:
+        """
+        Returns:
+            bool: True if the last check failed or status is not checked because of failed dependency
+            (statuses that depend on it are not checked)
+        """
+        return self.dependency_failed is not None or (bool(self.status_values) and not self.status_values[-1])
+
+    def get_failed_dependency(self) -> "Status | None":
         """
+        Returns:
+            Status | None: the first dependency that is down (see is_down) or None if all of them are working
+        """
+        for dependency in self.dependencies:
+            if dependency.is_down:
+                return dependency
+        return None
+
+    def get_data_dict(self, since: int | None = None) -> dict[str, Any]:
+        """
+        Args:
+            since (int | None, optional): return only bars that changed after this unix time. Defaults to None
+
         Returns:
             dict[str, Any]: current status instance as dictionary in server's format
         """
-        timestamps = (
-            self.timestamps + [self.current_bar.get_timestamps()] if self.current_bar.data else self.timestamps
-        )
-        data = self.data + [self.current_bar.avg_value()] if self.current_bar.data else self.data
-        return {
+        timestamps = self.timestamps.to_list()
+        data = self.data.to_list()
+        if self.current_bar.data:
+            timestamps.append(self.current_bar.get_timestamps())
+            data.append(self.current_bar.avg_value())
+        data_dict = {
             "status": self.current_status.value,
             "status_text": self.current_status_text,
             "label": self.label,
@@ -232,35 +490,198 @@ class Status:
             "timestamps": timestamps,
             "data": data,
         }
+        if self.dependency_failed is not None:
+            data_dict["dependency_failed"] = self.dependency_failed
+        if self.latency_enabled:
+            latency = [latency_to_ms(stats) for stats in self.latency]
+            if self.current_bar.data:
+                latency.append(latency_to_ms(self.current_bar.latency_stats()))
+            data_dict["latency"] = latency
+        return slice_data_dict(data_dict, since) if since is not None else data_dict
+
+    def get_delta_dict(self) -> dict[str, Any]:
+        """
+        Returns:
+            dict[str, Any]: changes made by the last push_new_status() call in server's format:
+            current status, last check, current bar (timestamps, value and latency if enabled)
+            and bar closed by this check (if any)
+        """
+        delta = {
+            "status": self.current_status.value,
+            "status_text": self.current_status_text,
+            "label": self.label,
+            "bars_max": self.bars_max,
+            "check": self.get_last_check_dict(),
+        }
+        if self.dependency_failed is not None:
+            delta["dependency_failed"] = self.dependency_failed
+        if self.current_bar.data:
+            delta["current_bar"] = [self.current_bar.get_timestamps(), self.current_bar.avg_value()]
+            if self.latency_enabled:
+                delta["current_bar"].append(latency_to_ms(self.current_bar.latency_stats()))
+        if self.last_bar_closed and self.timestamps and self.data:
+            delta["closed_bar"] = [self.timestamps[-1], self.data[-1]]
+            if self.latency_enabled and self.latency:
+                delta["closed_bar"].append(latency_to_ms(self.latency[-1]))
+        return delta
+
+    def get_last_check_dict(self) -> dict[str, Any] | None:
+        """
+        Returns:
+            dict[str, Any] | None: last pushed check as compact dictionary
+            {"t": timestamp, "v": status value, "l": latency in seconds (only if measured),
+            "w": weight (only if not 1)}
+            (can be passed back into push_new_status()) or None if there are no checks in current bar
+        """
+        if not self.current_bar.data or self.current_bar.time_end is None:
+            return None
+        check = {"t": self.current_bar.time_end, "v": self.current_bar.data[-1]}
+        if self.last_latency is not None:
+            check["l"] = self.last_latency
+        if self.last_weight != 1:
+            check["w"] = self.last_weight
+        return check
+
+    def parse_check_dict(self, check: Any) -> tuple[bool, int, float | None, int]:
+        """Validates check in get_last_check_dict() format (ex. received from agent)
+        >>> status = Status("s", {"type": "constant", "target": True})
+        >>> status.parse_check_dict({"id": "s", "t": 100, "v": True, "l": 0.5, "w": 2})
+        (True, 100, 0.5, 2)
+        >>> status.parse_check_dict({"t": 100, "v": 1})
+        Traceback (most recent call last):
+        ...
+        ValueError: v must be true or false
+
+        Args:
+            check (Any): check dictionary
+
+        Raises:
+            ValueError: if any field is missing or has wrong type or value
 
-    def push_new_status(self, status_value: bool) -> None:
-        """Appends new status to the status_values and current_bar, removes old ones and updates timestamps and data
+        Returns:
+            tuple[bool, int, float | None, int]: status value, timestamp, latency and weight
+            (arguments of push_new_status())
+        """
+        if not isinstance(check, dict):
+            raise ValueError("check must be an object")
+        status_value = check.get("v")
+        if not isinstance(status_value, bool):
+            raise ValueError("v must be true or false")
+        timestamp = check.get("t")
+        if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+            raise ValueError("t must be unix time")
+        if timestamp <= 0:
+            raise ValueError("t must be positive")
+        latency = check.get("l")
+        if latency is not None:
+            if isinstance(latency, bool) or not isinstance(latency, (int, float)) or not math.isfinite(latency):
+                raise ValueError("l must be a number of seconds")
+            if latency < 0:
+                raise ValueError("l can't be negative")
+            latency = float(latency)
+        weight = check.get("w", 1)
+        if isinstance(weight, bool) or not isinstance(weight, int) or not 1 <= weight <= self.checks_per_bar:
+            raise ValueError(f"w must be an integer within [1, {self.checks_per_bar}]")
+        return status_value, int(timestamp), latency, weight
+
+    def push_new_status(
+        self, status_value: bool, timestamp: int | None = None, latency: float | None = None, weight: int = 1
+    ) -> None:
+        """Appends new status to the status_values and current_bar and updates timestamps and data
+        (ring buffers drop the oldest values automatically)
 
         Args:
             status_value (bool): current status
+            timestamp (int | None, optional): time of check (used to replay stored checks). Defaults to now
+            latency (float | None, optional): duration of check in seconds (ignored if latency is not enabled).
+            Defaults to None
+            weight (int, optional): number of samples this check represents (number of intervals passed since
+            previous check, limited to checks_per_bar so at most one bar is closed). Defaults to 1
         """
-        # New bar
-        if len(self.current_bar.data) >= self.checks_per_bar:
-            logging.debug(f"New bar completed for {self.id} status")
-            self.timestamps.append(self.current_bar.get_timestamps())
-            self.data.append(self.current_bar.avg_value())
-            self.current_bar.data.clear()
-            self.current_bar.time_start = None
-
-        # Append data
-        self.status_values.append(status_value)
-        self.current_bar.data.append(status_value)
+        self.last_bar_closed = False
+        self.last_weight = min(max(int(weight), 1), self.checks_per_bar)
+        for _ in range(self.last_weight):
+            # New bar
+            if len(self.current_bar.data) >= self.checks_per_bar:
+                logging.debug(f"New bar completed for {self.id} status")
+                self.timestamps.append(self.current_bar.get_timestamps())
+                self.data.append(self.current_bar.avg_value())
+                self.latency.append(self.current_bar.latency_stats())
+                self.current_bar.data.clear()
+                self.current_bar.latencies.clear()
+                self.current_bar.time_start = None
+                self.last_bar_closed = True
+
+            # Append data
+            self.status_values.append(status_value)
+            self.current_bar.data.append(status_value)
+
+        self.last_latency = None
+        if latency is not None and self.latency_enabled:
+            self.last_latency = round(latency, 6)
+            self.current_bar.latencies.append(min(int(latency * 1_000_000), LATENCY_MAX))
 
         # Update current bar timestamps
-        timestamp_current = int(time())
+        timestamp_current = int(time()) if timestamp is None else timestamp
         if not self.current_bar.time_start:
             self.current_bar.time_start = timestamp_current
         self.current_bar.time_end = timestamp_current
 
-        # Trim data to size
-        while len(self.status_values) > self.checks_per_bar:
-            self.status_values.pop(0)
-        while len(self.data) > self.bars_max:
-            self.data.pop(0)
-        while len(self.timestamps) > self.bars_max:
-            self.timestamps.pop(0)
+
+def push_new_status(
+    status: Status, status_value: bool, timestamp: int | None = None, latency: float | None = None, weight: int = 1
+) -> None:
+    """Pushes result of check into status without recording it into database
+    (default push callback of scheduler and workers, see Database.push())
+
+    Args:
+        status (Status): checked status
+        status_value (bool): check result
+        timestamp (int | None, optional): time of check. Defaults to now
+        latency (float | None, optional): duration of check in seconds. Defaults to None
+        weight (int, optional): number of samples this check represents. Defaults to 1
+    """
+    status.push_new_status(status_value, timestamp, latency, weight)
+
+
+def link_dependencies(statuses: list[Status]) -> None:
+    """Resolves depends_on IDs of each status into dependencies
+    >>> statuses = [Status("host", {"type": "constant", "target": True}),
+    ...     Status("site", {"type": "constant", "target": True, "depends_on": "host"})]
+    >>> link_dependencies(statuses)
+    >>> [dependency.id for dependency in statuses[1].dependencies]
+    ['host']
+    >>> statuses[0].depends_on = ["site"]
+    >>> link_dependencies(statuses)
+    Traceback (most recent call last):
+    Exception: Circular dependency: host -> site -> host
+
+    Args:
+        statuses (list[Status]): all configured statuses
+
+    Raises:
+        Exception: if dependency doesn't exist or dependencies are circular
+    """
+    statuses_by_id = {status.id: status for status in statuses}
+    for status in statuses:
+        status.dependencies = []
+        for dependency_id in status.depends_on:
+            if dependency_id not in statuses_by_id:
+                raise Exception(f"Status {status.id} depends on non-existent status {dependency_id}")
+            status.dependencies.append(statuses_by_id[dependency_id])
+
+    # Depth-first search of cycles (IDs of statuses in the current path and IDs of already checked statuses)
+    checked: set[str] = set()
+
+    def _visit(status: Status, path_: list[str]) -> None:
+        """Raises exception if status is already in path of dependencies"""
+        if status.id in path_:
+            raise Exception(f"Circular dependency: {' -> '.join(path_[path_.index(status.id) :] + [status.id])}")
+        if status.id in checked:
+            return
+        for dependency in status.dependencies:
+            _visit(dependency, path_ + [status.id])
+        checked.add(status.id)
+
+    for status in statuses:
+        _visit(status, [])
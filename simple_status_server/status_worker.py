@@ -19,23 +19,43 @@ OTHER DEALINGS IN THE SOFTWARE.
 """
 
 import logging
-import subprocess
-from os import path
 from threading import Timer
+from time import perf_counter
 from typing import Callable
 
-import requests
-
-from simple_status_server.status import Status, Type
+from simple_status_server.adaptive import AdaptiveInterval
+from simple_status_server.probe import ProbeThread, error_result
+from simple_status_server.status import Status, push_new_status
 
 
 class StatusWorker:
-    def __init__(self, status: Status, update_callback: Callable[[Status], None]) -> None:
+    def __init__(
+        self,
+        status: Status,
+        update_callback: Callable[[Status], None],
+        probe_thread: ProbeThread,
+        startup_delay: float = 0.0,
+        push_callback: Callable[..., None] | None = None,
+    ) -> None:
+        """Checks single status in a timer thread. Interval is adapted the same way as in Scheduler
+        (see AdaptiveInterval)
+
+        Args:
+            status (Status): status to check
+            update_callback (Callable[[Status], None]): called after each check with updated status
+            probe_thread (ProbeThread): probes shared by all workers
+            startup_delay (float, optional): extra delay of the first check in seconds. Defaults to 0.0
+            push_callback (Callable[..., None] | None, optional): pushes check result into status, called with
+            the same arguments as Database.push(). Defaults to None (Status.push_new_status())
+        """
         self._status = status
         self._update_callback = update_callback
+        self._push_callback = push_callback if push_callback is not None else push_new_status
+        self._probe_thread = probe_thread
+        self._policy = AdaptiveInterval(status)
 
         self._exit_flag = False
-        self._timer = Timer(status.interval if len(status.status_values) > 0 else 0, self._timer_callback)
+        self._timer = Timer(self._policy.initial_delay() + startup_delay, self._timer_callback)
 
         logging.info(f"Status {status.id} ({status.label}) registered. Interval: {status.interval:.2f}s")
 
@@ -60,61 +80,33 @@ class StatusWorker:
 
         logging.info(f"Checking {self._status.id} ({self._status.target})...")
 
-        result = False
-        try:
-            # Constant
-            if self._status.type == Type.constant:
-                result = bool(self._status.target)
-
-            # Service / command
-            elif self._status.type == Type.service or self._status.type == Type.command:
-                if self._status.type == Type.service:
-                    cmd = ["/usr/bin/systemctl", "is-active", "--quiet", str(self._status.target)]
-                else:
-                    cmd = str(self._status.target)
-                try:
-                    return_code = subprocess.check_call(
-                        cmd,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.DEVNULL,
-                        shell=self._status.type == Type.command,
-                        timeout=self._status.target_timeout,
-                    )
-                    result = return_code == 0
-                except subprocess.CalledProcessError:
-                    result = False
-            # Path
-            elif self._status.type == Type.path:
-                result = path.exists(str(self._status.target))
-
-            # URL
-            elif self._status.type == Type.url:
-                try:
-                    resp = requests.get(
-                        str(self._status.target),
-                        timeout=self._status.target_timeout,
-                        allow_redirects=True,
-                    )
-                    result = resp.status_code == 200 and len(resp.text) > 0
-                except:
-                    pass
-
         # Catch CTRL+C
+        try:
+            time_start = perf_counter()
+            try:
+                probe_result = self._probe_thread.check(self._status)
+            except Exception as e:
+                # Probes are already stopped
+                if self._exit_flag:
+                    return
+                probe_result = error_result(self._status, e)
+            latency = probe_result.latency if probe_result.latency is not None else perf_counter() - time_start
+            result = probe_result.ok
         except (SystemExit, KeyboardInterrupt):
             logging.warning(f"Received interrupt while updating {self._status.id}")
             self._exit_flag = True
             return
 
-        # Just in case
-        except Exception as e:
-            logging.error(f"{self._status.id} error: {e}", exc_info=e)
-
         # Push new status and save into database
-        logging.info(f"{self._status.id}: {result}")
-        self._status.push_new_status(result)
-        self._update_callback(self._status)
+        push, weight, delay = self._policy.on_result(result)
+        if push:
+            logging.info(f"{self._status.id}: {result}")
+            self._push_callback(self._status, result, latency=latency, weight=weight)
+            self._update_callback(self._status)
+        else:
+            logging.info(f"{self._status.id}: {result} (retrying in {delay:.2f}s)")
 
         # Restart timer
         if not self._exit_flag:
-            self._timer = Timer(self._status.interval, self._timer_callback)
+            self._timer = Timer(delay, self._timer_callback)
             self._timer.start()
@@ -0,0 +1,369 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import logging
+import ssl
+from time import monotonic
+from typing import Any, Callable
+from urllib.parse import urljoin, urlsplit
+
+from simple_status_server._version import __version__
+from simple_status_server.probe import Probe, ProbeResult
+from simple_status_server.status import Status, parse_time_cfg
+
+CONFIG_DEFAULT = {
+    "max_connections_per_host": 8,
+    "idle_timeout": "30s",
+    "max_redirects": 10,
+    "drain_limit": 65536,
+}
+
+# Methods available for url_method status config
+METHODS = ("get", "head", "range")
+
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# HTTP key: (scheme, host, port)
+_HostKey = tuple[str, str, int]
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.time_idle = monotonic()
+        self.reused = False
+
+    def is_usable(self, idle_timeout: float) -> bool:
+        """
+        Args:
+            idle_timeout (float): maximum time in seconds connection can stay in the pool
+
+        Returns:
+            bool: True if connection can be used for the next request
+        """
+        return not self.writer.is_closing() and not self.reader.at_eof() and monotonic() - self.time_idle < idle_timeout
+
+    def close(self) -> None:
+        """Closes connection without waiting"""
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class _Response:
+    def __init__(self, status_code: int, headers: dict[str, str], keep_alive: bool) -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.keep_alive = keep_alive
+
+
+class UrlProber:
+    def __init__(self, config: dict[str, Any] | None = None) -> None:
+        """Asynchronous HTTP/1.1 prober with shared keep-alive connection pool per host
+        NOTE: requests are not pipelined. Each connection carries one request at a time and is returned to the pool
+        after its response is read, so concurrent probes of one host use separate pooled connections instead
+
+        Args:
+            config (dict[str, Any] | None, optional): prober config (see CONFIG_DEFAULT). Defaults to None
+        """
+        if config is None:
+            config = {}
+        self._max_per_host = int(config.get("max_connections_per_host", CONFIG_DEFAULT["max_connections_per_host"]))
+        self._idle_timeout = parse_time_cfg(config.get("idle_timeout", CONFIG_DEFAULT["idle_timeout"]))
+        self._max_redirects = int(config.get("max_redirects", CONFIG_DEFAULT["max_redirects"]))
+        self._drain_limit = int(config.get("drain_limit", CONFIG_DEFAULT["drain_limit"]))
+
+        self._ssl_context = ssl.create_default_context()
+        self._pool: dict[_HostKey, list[_Connection]] = {}
+        self._semaphores: dict[_HostKey, asyncio.Semaphore] = {}
+
+    async def probe(self, url: str, timeout: float, method: str = "get") -> tuple[bool, str | None]:
+        """Checks URL (must be called from the same event loop every time)
+
+        Args:
+            url (str): http(s) URL to check
+            timeout (float): timeout of entire check (including redirects) in seconds
+            method (str, optional): "get" - GET request, response must be 200 with non-empty body;
+            "head" - HEAD request, response must be 200;
+            "range" - GET request of the first byte only, response must be 200 / 206 with non-empty body.
+            Defaults to "get"
+
+        Returns:
+            tuple[bool, str | None]: True if URL is working and error class if it's not
+            ("timeout", "tls", "connection", "protocol", "http_status" or "redirects")
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                for _ in range(self._max_redirects + 1):
+                    status_code, location = await self._request(url, method)
+                    if status_code in REDIRECT_CODES and location:
+                        url = urljoin(url, location)
+                        logging.debug(f"Redirected to {url}")
+                        continue
+                    return (True, None) if status_code > 0 else (False, "http_status")
+                logging.debug(f"Too many redirects for {url}")
+                return False, "redirects"
+        except TimeoutError:
+            logging.debug(f"Timeout requesting {url}")
+            return False, "timeout"
+        except ssl.SSLError as e:
+            logging.debug(f"TLS error requesting {url}: {e}")
+            return False, "tls"
+        except (OSError, asyncio.IncompleteReadError) as e:
+            logging.debug(f"Error requesting {url}: {e}")
+            return False, "connection"
+        except ValueError as e:
+            logging.debug(f"Error requesting {url}: {e}")
+            return False, "protocol"
+
+    async def close(self) -> None:
+        """Closes all idle connections"""
+        for connections in self._pool.values():
+            for connection in connections:
+                connection.close()
+        self._pool.clear()
+
+    async def _request(self, url: str, method: str) -> tuple[int, str | None]:
+        """Sends single request using pooled connection (retries once if pooled connection was closed by server)
+
+        Args:
+            url (str): URL to request
+            method (str): see probe()
+
+        Returns:
+            tuple[int, str | None]: status code (or -1 if check failed, or redirect code) and redirect location
+        """
+        url_parts = urlsplit(url)
+        scheme = url_parts.scheme.lower()
+        if scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {scheme}")
+        if not url_parts.hostname:
+            raise ValueError(f"No host in URL {url}")
+        port = url_parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, url_parts.hostname, port)
+
+        target = url_parts.path or "/"
+        if url_parts.query:
+            target += "?" + url_parts.query
+        host_header = url_parts.netloc.rsplit("@", 1)[-1]
+        headers = [
+            f"{'HEAD' if method == 'head' else 'GET'} {target} HTTP/1.1",
+            f"Host: {host_header}",
+            f"User-Agent: simple-status-server/{__version__}",
+            "Accept: */*",
+            "Accept-Encoding: identity",
+            "Connection: keep-alive",
+        ]
+        if method == "range":
+            headers.append("Range: bytes=0-0")
+        request_bytes = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._max_per_host)
+            self._semaphores[key] = semaphore
+
+        async with semaphore:
+            for attempt in range(2):
+                connection = await self._acquire(key)
+                try:
+                    connection.writer.write(request_bytes)
+                    await connection.writer.drain()
+                    response = await self._read_head(connection.reader)
+                except (OSError, asyncio.IncompleteReadError):
+                    connection.close()
+
+                    # Connection from the pool was closed by server. Try again with a new one
+                    if connection.reused and attempt == 0:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+
+                try:
+                    result, reusable = await self._read_body(connection.reader, response, method)
+                except BaseException:
+                    connection.close()
+                    raise
+                if reusable and response.keep_alive:
+                    self._release(key, connection)
+                else:
+                    connection.close()
+
+                # Redirect without location can't be followed and is counted as failed check
+                location = response.headers.get("location")
+                if response.status_code in REDIRECT_CODES and location:
+                    return response.status_code, location
+                return (response.status_code if result else -1), None
+
+        return -1, None
+
+    async def _acquire(self, key: _HostKey) -> _Connection:
+        """Returns idle connection from the pool or opens a new one
+
+        Args:
+            key (_HostKey): scheme, host and port
+
+        Returns:
+            _Connection: connection to use
+        """
+        connections = self._pool.get(key, [])
+        while connections:
+            connection = connections.pop()
+            if connection.is_usable(self._idle_timeout):
+                connection.reused = True
+                return connection
+            connection.close()
+
+        scheme, host, port = key
+        logging.debug(f"Opening new connection to {scheme}://{host}:{port}")
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self._ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+        )
+        return _Connection(reader, writer)
+
+    def _release(self, key: _HostKey, connection: _Connection) -> None:
+        """Returns connection into the pool
+
+        Args:
+            key (_HostKey): scheme, host and port
+            connection (_Connection): connection after fully read response
+        """
+        connections = self._pool.setdefault(key, [])
+        if len(connections) >= self._max_per_host:
+            connection.close()
+            return
+        connection.time_idle = monotonic()
+        connections.append(connection)
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> _Response:
+        """Reads status line and headers
+
+        Args:
+            reader (asyncio.StreamReader): connection's reader
+
+        Returns:
+            _Response: parsed status code, headers (lowercase keys) and keep-alive flag
+        """
+        status_line = (await reader.readuntil(b"\r\n")).decode("latin-1").strip()
+        parts = status_line.split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"Invalid status line: {status_line}")
+        version = parts[0]
+        status_code = int(parts[1])
+
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readuntil(b"\r\n")).decode("latin-1")
+            if line == "\r\n":
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        connection_header = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            keep_alive = "keep-alive" in connection_header
+        else:
+            keep_alive = "close" not in connection_header
+
+        # Skip interim responses
+        if 100 <= status_code < 200:
+            return await self._read_head(reader)
+
+        return _Response(status_code, headers, keep_alive)
+
+    async def _read_body(self, reader: asyncio.StreamReader, response: _Response, method: str) -> tuple[bool, bool]:
+        """Reads just enough of response body to make a decision and drains the rest if it's small enough
+
+        Args:
+            reader (asyncio.StreamReader): connection's reader
+            response (_Response): parsed response head
+            method (str): see probe()
+
+        Returns:
+            tuple[bool, bool]: check result, True if connection can be reused
+        """
+        if method == "head":
+            codes_ok = (200,)
+        elif method == "range":
+            codes_ok = (200, 206)
+        else:
+            codes_ok = (200,)
+        status_ok = response.status_code in codes_ok
+
+        # No body
+        if method == "head" or response.status_code in (204, 304):
+            return status_ok, True
+
+        # Chunked body
+        if "chunked" in response.headers.get("transfer-encoding", "").lower():
+            non_empty = False
+            drained = 0
+            while True:
+                size_line = (await reader.readuntil(b"\r\n")).split(b";", 1)[0].strip()
+                chunk_size = int(size_line, 16)
+                if chunk_size == 0:
+                    # Trailers
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    return status_ok and non_empty, True
+                non_empty = True
+
+                # Early cutoff
+                drained += chunk_size
+                if drained > self._drain_limit:
+                    return status_ok, False
+                await reader.readexactly(chunk_size + 2)
+
+        # Content-Length body
+        content_length = response.headers.get("content-length")
+        if content_length is not None:
+            length = int(content_length)
+            if length > self._drain_limit:
+                return status_ok, False
+            await reader.readexactly(length)
+            return status_ok and length > 0, True
+
+        # Body until connection close. Read single byte and close
+        return status_ok and len(await reader.read(1)) > 0, False
+
+
+class UrlProbe(Probe):
+    latency = True
+    concurrency = 64
+
+    def __init__(self, config: dict[str, Any], trigger: Callable[[Status], None]) -> None:
+        """'url' type. Checks URL using native asynchronous HTTP client (see UrlProber)"""
+        super().__init__(config, trigger)
+        self._prober = UrlProber(config)
+
+    async def probe(self, status: Status) -> ProbeResult:
+        ok, error_class = await self._prober.probe(str(status.target), status.target_timeout, status.url_method)
+        return ProbeResult(ok, error_class)
+
+    async def close(self) -> None:
+        await self._prober.close()
@@ -0,0 +1,91 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+import logging
+from os import path
+from typing import Any
+
+from simple_status_server.database import write_atomic
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.status import Status
+
+
+def get_snapshot_path(database_path: str) -> str:
+    """
+    >>> get_snapshot_path("data/database.json")
+    'data/database.json.snapshot'
+
+    Args:
+        database_path (str): path to database
+
+    Returns:
+        str: path to last-known API data that is served while database is being loaded
+    """
+    return database_path + ".snapshot"
+
+
+def load_snapshot(snapshot_path: str, statuses: list[Status]) -> dict[str, dict[str, Any]]:
+    """Reads last-known API data saved by save_snapshot(). Statuses that are not in snapshot (or if there's no
+    snapshot at all) get empty data, so the returned dictionary always has exactly one key per configured status
+
+    Args:
+        snapshot_path (str): see get_snapshot_path()
+        statuses (list[Status]): configured statuses
+
+    Returns:
+        dict[str, dict[str, Any]]: API data
+    """
+    snapshot = {}
+    if not path.exists(snapshot_path):
+        logging.debug(f"No snapshot found at {snapshot_path}")
+    else:
+        try:
+            with open(snapshot_path, "rb") as snapshot_io:
+                snapshot = json.loads(snapshot_io.read())
+            if not isinstance(snapshot, dict):
+                raise Exception(f"Wrong data type: {type(snapshot)}")
+            logging.info(f"Loaded snapshot of {len(snapshot)} statuses from {snapshot_path}")
+        except Exception as e:
+            logging.warning(f"Unable to read snapshot from {snapshot_path}: {e}")
+            snapshot = {}
+
+    api_data = {}
+    for status in statuses:
+        data_dict = snapshot.get(status.id)
+        if isinstance(data_dict, dict):
+            api_data[status.id] = {**data_dict, "label": status.label, "bars_max": status.bars_max}
+        else:
+            api_data[status.id] = status.get_data_dict()
+    return api_data
+
+
+def save_snapshot(snapshot_path: str, response_cache: ResponseCache) -> None:
+    """Writes already serialized API data into snapshot file
+
+    Args:
+        snapshot_path (str): see get_snapshot_path()
+        response_cache (ResponseCache): serialized API data
+    """
+    _, variants = response_cache.get()
+    try:
+        write_atomic(snapshot_path, variants["identity"])
+    except Exception as e:
+        logging.warning(f"Unable to save snapshot to {snapshot_path}: {e}")
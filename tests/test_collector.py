@@ -0,0 +1,114 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+import requests
+
+from simple_status_server.agent import assign_shards
+from simple_status_server.status import Status, link_dependencies
+
+CONFIG = """
+server:
+  host: 127.0.0.1
+  port: {port}
+  request_limits:
+    - 1000 per second
+database_path: "{database_path}"
+mode: collector
+statuses:
+  a:
+    type: constant
+    target: true
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def collector(tmp_path):
+    """Collector process. Yields its URL"""
+    port = _free_port()
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(CONFIG.format(port=port, database_path=tmp_path / "database.json"), encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "simple_status_server", "-c", str(config_path)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        time_end = time.monotonic() + 20
+        while True:
+            try:
+                requests.post(url + "/", json={}, timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.monotonic() > time_end or process.poll() is not None:
+                    raise
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def test_ingest(collector):
+    timestamp = int(time.time())
+    wrong_checks = [
+        {"id": "a", "t": timestamp, "v": 1},
+        {"id": "a", "t": "now", "v": False},
+        {"id": "a", "t": timestamp, "v": False, "l": "fast"},
+        {"id": "a", "t": timestamp, "v": False, "w": 0},
+        {"id": "a", "t": timestamp, "v": False, "w": 1000},
+        {"id": "a", "v": False},
+        {"id": ["a"], "t": timestamp, "v": False},
+        {"id": "unknown", "t": timestamp, "v": False},
+        "a",
+    ]
+    checks = [{"id": "a", "t": timestamp, "v": True, "l": 0.25}, {"id": "a", "t": timestamp + 1, "v": True, "w": 2}]
+    response = requests.post(collector + "/ingest", json={"checks": wrong_checks + checks}, timeout=10)
+    assert response.status_code == 200
+    assert response.json() == {"accepted": 2}
+
+    data = requests.post(collector + "/", json={"ids": ["a"]}, timeout=10).json()["a"]
+    assert data["data"][-1] == 100
+    assert data["timestamps"][-1][1] == timestamp + 1
+
+    assert requests.post(collector + "/ingest", json={"checks": "a"}, timeout=10).status_code == 400
+
+
+def test_dependencies_share_shard():
+    statuses = [
+        Status(status_id, {"type": "constant", "target": True, "depends_on": depends_on})
+        for status_id, depends_on in (("host", []), ("site", "host"), ("api", "site"), ("other", []))
+    ]
+    link_dependencies(statuses)
+    for shards in range(1, 8):
+        status_shards = assign_shards(statuses, shards)
+        assert status_shards["host"] == status_shards["site"] == status_shards["api"]
@@ -0,0 +1,67 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+from time import perf_counter
+
+import pytest
+
+from simple_status_server.command_executor import CommandExecutor, CommandProbe
+
+
+def _run_all(config: dict, commands: list[str], timeout: float = 10.0):
+    async def _run():
+        executor = CommandExecutor(config)
+        try:
+            return await asyncio.gather(*[executor.run(command, timeout) for command in commands])
+        finally:
+            await executor.close()
+
+    return asyncio.run(_run())
+
+
+@pytest.mark.parametrize("helpers", [0, 2])
+def test_results(helpers):
+    results = _run_all({"helpers": helpers}, ["true", "exit 3", "echo error >&2; false", "sleep 5"], 1.0)
+    assert [(result.ok, result.return_code, result.timed_out) for result in results] == [
+        (True, 0, False),
+        (False, 3, False),
+        (False, 1, False),
+        (False, None, True),
+    ]
+    assert results[2].stderr.strip() == "error"
+
+
+def test_helpers_run_in_parallel():
+    time_start = perf_counter()
+    results = _run_all({"helpers": 4}, [f"sleep 0.5; echo {i}" for i in range(4)])
+    assert all(result.ok for result in results)
+    assert perf_counter() - time_start < 1.5
+
+
+def test_same_command_limit():
+    time_start = perf_counter()
+    _run_all({"helpers": 4, "per_command_limit": 1}, ["sleep 0.3"] * 3)
+    assert perf_counter() - time_start >= 0.9
+
+
+def test_probe_concurrency_matches_helpers():
+    assert CommandProbe({"helpers": 7}, lambda status: None).concurrency == 7
+    assert CommandProbe({"helpers": 0}, lambda status: None).concurrency == CommandProbe.concurrency
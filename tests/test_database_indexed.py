@@ -0,0 +1,158 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import struct
+
+import pytest
+
+from simple_status_server.database import Database
+from simple_status_server.database_indexed import HEADER, MAGIC, IndexedDatabase
+from simple_status_server.status import Status
+
+
+def _statuses(*status_ids: str) -> list[Status]:
+    return [
+        Status(status_id, {"type": "constant", "target": True, "interval": "1s", "checks_per_bar": 2})
+        for status_id in status_ids
+    ]
+
+
+def _push(statuses: list[Status]) -> None:
+    for i, status in enumerate(statuses):
+        for j in range(5):
+            status.push_new_status(j % (i + 2) != 0, 1000 + j, 0.01 * j)
+
+
+def _load(database_class, statuses: list[Status], database_path: str) -> None:
+    database = database_class(statuses, database_path)
+    database.load()
+    database.close()
+
+
+def test_round_trip(tmp_path):
+    database_path = str(tmp_path / "database.idx")
+    statuses = _statuses("a", "b")
+    _push(statuses)
+    database = IndexedDatabase(statuses, database_path)
+    database.load()
+    database.save()
+    database.close()
+    with open(database_path, "rb") as database_io:
+        assert database_io.read(len(MAGIC)) == MAGIC
+
+    loaded = _statuses("a", "b")
+    _load(IndexedDatabase, loaded, database_path)
+    assert [status.get_data_dict() for status in loaded] == [status.get_data_dict() for status in statuses]
+    assert [list(status.status_values) for status in loaded] == [list(status.status_values) for status in statuses]
+
+
+def test_convert_json(tmp_path):
+    database_path = str(tmp_path / "database.json")
+    statuses = _statuses("a", "old")
+    _push(statuses)
+    Database(statuses, database_path).save()
+
+    # Legacy database is read as is and converted on save
+    loaded = _statuses("a")
+    database = IndexedDatabase(loaded, database_path)
+    database.load()
+    assert loaded[0].get_data_dict() == statuses[0].get_data_dict()
+    database.save()
+    database.close()
+    with open(database_path, "rb") as database_io:
+        assert database_io.read(len(MAGIC)) == MAGIC
+
+    loaded = _statuses("a", "old")
+    _load(IndexedDatabase, loaded, database_path)
+    assert [status.get_data_dict() for status in loaded] == [status.get_data_dict() for status in statuses]
+
+
+def test_keep_not_configured(tmp_path):
+    database_path = str(tmp_path / "database.idx")
+    statuses = _statuses("a", "b")
+    _push(statuses)
+    database = IndexedDatabase(statuses, database_path)
+    database.save()
+    database.close()
+
+    # Status b is not configured anymore, but its record is copied on save and can be read on demand
+    database = IndexedDatabase(_statuses("a"), database_path)
+    database.load()
+    database.save()
+    stored = database.read_status("b")
+    assert stored is not None and stored["data"] == list(statuses[1].data)
+    assert database.read_status("unknown") is None
+    database.close()
+
+    loaded = _statuses("a", "b")
+    _load(IndexedDatabase, loaded, database_path)
+    assert loaded[1].get_data_dict() == statuses[1].get_data_dict()
+
+
+def test_read_status_without_load(tmp_path):
+    database_path = str(tmp_path / "database.idx")
+    statuses = _statuses("a")
+    _push(statuses)
+    database = IndexedDatabase(statuses, database_path)
+    database.save()
+    database.close()
+
+    database = IndexedDatabase([], database_path)
+    stored = database.read_status("a")
+    database.close()
+    assert stored is not None and stored["data"] == list(statuses[0].data)
+
+
+def _corrupt_truncated(data: bytes) -> bytes:
+    return data[: len(data) - 5]
+
+
+def _corrupt_header(data: bytes) -> bytes:
+    return data[: HEADER.size - 4]
+
+
+def _corrupt_index(data: bytes) -> bytes:
+    _, count, index_offset, index_length = HEADER.unpack_from(data, 0)
+    return HEADER.pack(MAGIC, count + 10, index_offset, index_length) + data[HEADER.size :]
+
+
+def _corrupt_record_offset(data: bytes) -> bytes:
+    _, _, index_offset, _ = HEADER.unpack_from(data, 0)
+    status_id_length = struct.unpack_from("<H", data, index_offset)[0]
+    return data[:index_offset] + struct.pack("<HQQ", status_id_length, index_offset, 100) + data[index_offset + 18 :]
+
+
+@pytest.mark.parametrize("corrupt", [_corrupt_truncated, _corrupt_header, _corrupt_index, _corrupt_record_offset])
+def test_corrupted(tmp_path, corrupt):
+    database_path = str(tmp_path / "database.idx")
+    statuses = _statuses("a", "b")
+    _push(statuses)
+    database = IndexedDatabase(statuses, database_path)
+    database.save()
+    database.close()
+    with open(database_path, "rb") as database_io:
+        data = database_io.read()
+    with open(database_path, "wb") as database_io:
+        database_io.write(corrupt(data))
+
+    database = IndexedDatabase(_statuses("a", "b"), database_path)
+    with pytest.raises(Exception, match="truncated|corrupted"):
+        database.load()
+    database.close()
@@ -0,0 +1,84 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+
+from simple_status_server.database_log import LogDatabase
+from simple_status_server.status import Status
+
+CHECKS = 2000
+
+
+def _statuses() -> list[Status]:
+    return [
+        Status(f"status{i}", {"type": "constant", "target": True, "checks_per_bar": 10, "bars_max": 1000})
+        for i in range(4)
+    ]
+
+
+def _state(statuses: list[Status]) -> dict:
+    return {status.id: (status.get_data_dict(), list(status.current_bar.data)) for status in statuses}
+
+
+def test_replay(tmp_path):
+    database_path = str(tmp_path / "database.json")
+    statuses = _statuses()
+    database = LogDatabase(statuses, database_path, {"compact_records": 50})
+    database.load()
+    for i in range(100):
+        for status in statuses:
+            database.push(status, i % 3 != 0, 1000 + i, weight=1 + i % 2)
+        database.save()
+    database.close()
+
+    loaded = _statuses()
+    LogDatabase(loaded, database_path).load()
+    assert _state(loaded) == _state(statuses)
+
+
+def test_compaction_during_pushes(tmp_path):
+    """Each check must be either in snapshot or replayed from log, never both"""
+    database_path = str(tmp_path / "database.json")
+    statuses = _statuses()
+    database = LogDatabase(statuses, database_path, {"compact_records": 1000000})
+    database.load()
+
+    def _push(status: Status) -> None:
+        for i in range(CHECKS):
+            database.push(status, i % 2 == 0, 1000 + i)
+
+    threads = [threading.Thread(target=_push, args=(status,)) for status in statuses]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        database.save()
+        database._compact()
+    for thread in threads:
+        thread.join()
+
+    # Simulate crash: keep log without final compaction
+    database.save()
+    with database._lock:
+        database._write_buffer()
+
+    loaded = _statuses()
+    LogDatabase(loaded, database_path).load()
+    assert _state(loaded) == _state(statuses)
+    assert all(len(status.status_values) == 10 for status in loaded)
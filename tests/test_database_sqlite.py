@@ -0,0 +1,99 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+from time import time
+
+from simple_status_server.database_sqlite import SQLiteDatabase
+from simple_status_server.server import Server
+from simple_status_server.status import Status
+
+# Midnight (UTC) 3 days ago (older checks would be pruned)
+TIME_START = int(time()) // 86400 * 86400 - 3 * 86400
+
+
+def _statuses() -> list[Status]:
+    return [Status("a", {"type": "constant", "target": True, "interval": "10m", "checks_per_bar": 6})]
+
+
+def _fill(database_path: str, hours: int) -> SQLiteDatabase:
+    """Pushes check every 10 minutes (the last one of each hour fails)"""
+    statuses = _statuses()
+    database = SQLiteDatabase(statuses, database_path)
+    database.load()
+    for i in range(hours * 6):
+        database.push(statuses[0], i % 6 != 5, TIME_START + i * 600)
+        database.save()
+    return database
+
+
+def test_query_uptime(tmp_path):
+    database = _fill(str(tmp_path / "database.sqlite"), 48)
+    period, buckets = database.query_uptime("a", TIME_START + 1800, TIME_START + 3 * 3600)
+    assert period == 3600
+    assert buckets == [(TIME_START, 6, 5), (TIME_START + 3600, 6, 5), (TIME_START + 7200, 6, 5)]
+
+    period, buckets = database.query_uptime("a", TIME_START, TIME_START + 40 * 86400)
+    assert period == 86400
+    assert buckets == [(TIME_START, 144, 120), (TIME_START + 86400, 144, 120)]
+
+    assert database.query_uptime("b", TIME_START, TIME_START + 3600) == (3600, [])
+    database.close()
+
+
+def test_load(tmp_path):
+    database_path = str(tmp_path / "database.sqlite")
+    database = _fill(database_path, 3)
+    statuses = database._statuses
+    database.close()
+
+    loaded = _statuses()
+    SQLiteDatabase(loaded, database_path).load()
+    assert loaded[0].get_data_dict() == statuses[0].get_data_dict()
+    assert list(loaded[0].current_bar.data) == list(statuses[0].current_bar.data)
+
+
+def test_uptime_endpoint(tmp_path):
+    database = _fill(str(tmp_path / "database.sqlite"), 2)
+    api_data = {"a": database._statuses[0].get_data_dict()}
+    server = Server(
+        [], "key", "Title", None, "Last check:", "Greens", None, api_data, uptime_callback=database.query_uptime
+    )
+    client = server._app.test_client()
+
+    response = client.get(f"/uptime?id=a&from={TIME_START}&to={TIME_START + 7200}&apiKey=key")
+    assert response.status_code == 200
+    assert response.json == {
+        "id": "a",
+        "from": TIME_START,
+        "to": TIME_START + 7200,
+        "period": 3600,
+        "checks": 12,
+        "working": 10,
+        "uptime": 83.333,
+        "buckets": [[TIME_START, 6, 5], [TIME_START + 3600, 6, 5]],
+    }
+
+    assert client.get(f"/uptime?id=a&from={TIME_START}&apiKey=key").json["checks"] == 12
+    assert client.get("/uptime?id=a&apiKey=wrong").status_code == 403
+    assert client.get("/uptime?apiKey=key").status_code == 400
+    assert client.get("/uptime?id=b&apiKey=key").status_code == 404
+    assert client.get("/uptime?id=a&from=yesterday&apiKey=key").status_code == 400
+    assert client.get(f"/uptime?id=a&from={TIME_START}&to={TIME_START}&apiKey=key").status_code == 400
+    database.close()
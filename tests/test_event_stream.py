@@ -0,0 +1,89 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import json
+import socket
+
+import pytest
+
+from simple_status_server.event_stream import EventStream
+from simple_status_server.response_cache import ResponseCache
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def stream():
+    port = _free_port()
+    event_stream = EventStream(ResponseCache({"a": {"status": 2}}), "key", {"queue_size": 4})
+    event_stream.start("127.0.0.1", port)
+    event_stream.port = port  # type: ignore
+    yield event_stream
+    event_stream.stop()
+
+
+def _read_event(sock_io) -> tuple[str, str]:
+    """Reads single event from socket file"""
+    event, data = "", ""
+    while True:
+        line = sock_io.readline().decode("utf-8").rstrip("\n")
+        if not line:
+            return event, data
+        if line.startswith("event: "):
+            event = line[7:]
+        elif line.startswith("data: "):
+            data = line[6:]
+
+
+def test_snapshot_and_delta(stream):
+    with socket.create_connection(("127.0.0.1", stream.port), timeout=5) as sock:
+        sock.sendall(b"GET /events?apiKey=key HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        sock_io = sock.makefile("rb")
+        assert sock_io.readline() == b"HTTP/1.1 200 OK\r\n"
+        while sock_io.readline() != b"\r\n":
+            pass
+        event, data = _read_event(sock_io)
+        assert event == "snapshot"
+        assert json.loads(data) == {"a": {"status": 2}}
+
+        stream.publish("a", {"status": 0})
+        event, data = _read_event(sock_io)
+        assert event == "delta"
+        assert json.loads(data) == {"id": "a", "status": 0}
+
+
+def test_wrong_api_key(stream):
+    with socket.create_connection(("127.0.0.1", stream.port), timeout=5) as sock:
+        sock.sendall(b"GET /events?apiKey=wrong HTTP/1.1\r\n\r\n")
+        assert sock.makefile("rb").readline() == b"HTTP/1.1 403 Forbidden\r\n"
+
+
+def test_stop_with_full_queue(stream):
+    """Subscriber that doesn't read events must not break shutdown"""
+    queue: asyncio.Queue = asyncio.Queue(1)
+    queue.put_nowait(b"event")
+    stream._subscribers.add(queue)
+    stream.stop()
+    assert queue.get_nowait() is None
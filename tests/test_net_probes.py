@@ -0,0 +1,149 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import shutil
+import socket
+import ssl
+import subprocess
+import time
+
+import pytest
+
+from simple_status_server import net_probes
+from simple_status_server.net_probes import DnsProbe, TcpProbe, TlsProbe, certificate_not_after
+from simple_status_server.status import Status
+
+
+def _create_certificate(directory, days: int) -> tuple[str, str]:
+    """Creates self-signed certificate of localhost / 127.0.0.1 using openssl
+
+    Returns:
+        tuple[str, str]: paths to certificate and key
+    """
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl is not installed")
+    cert_path, key_path = str(directory / f"cert-{days}.pem"), str(directory / f"key-{days}.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", str(days), "-subj", "/CN=localhost"]
+        + ["-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", key_path, "-out", cert_path],
+        check=True,
+        capture_output=True,
+    )
+    return cert_path, key_path
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _probe(probe_class, config: dict, targets: list[str], server_ssl: ssl.SSLContext | None = None) -> list:
+    """Starts local (TLS) server and checks targets ({port} is replaced with its port)"""
+
+    async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.close()
+
+    async def _run():
+        server = await asyncio.start_server(_handle, "127.0.0.1", 0, ssl=server_ssl)
+        port = server.sockets[0].getsockname()[1]
+        statuses = [
+            Status(str(i), {"type": "tcp", "target": target.format(port=port), "target_timeout": "5s"})
+            for i, target in enumerate(targets)
+        ]
+        probe = probe_class(config, lambda _: None)
+        await probe.start(statuses)
+        try:
+            return [await probe.probe(status) for status in statuses]
+        finally:
+            await probe.close()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(_run())
+
+
+def _server_ssl(cert_path: str, key_path: str) -> ssl.SSLContext:
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+def test_tcp():
+    results = _probe(TcpProbe, {}, ["127.0.0.1:{port}", f"127.0.0.1:{_free_port()}", "127.0.0.1"])
+    assert [(result.ok, result.error_class) for result in results] == [
+        (True, None),
+        (False, "connection"),
+        (False, "target"),
+    ]
+    assert results[0].latency is not None
+
+
+def test_tls_verified(tmp_path):
+    cert_path, key_path = _create_certificate(tmp_path, 30)
+    server_ssl = _server_ssl(cert_path, key_path)
+    results = _probe(TlsProbe, {"ca_file": cert_path}, ["127.0.0.1:{port}", "localhost:{port}"], server_ssl)
+    assert [result.ok for result in results] == [True, True]
+    results = _probe(TlsProbe, {"ca_file": cert_path, "expiry_min": "60d"}, ["127.0.0.1:{port}"], server_ssl)
+    assert results[0].error_class == "expiring"
+
+    # Not trusted by system CAs
+    results = _probe(TlsProbe, {}, ["127.0.0.1:{port}"], server_ssl)
+    assert results[0].error_class == "tls"
+
+
+def test_tls_expiry_without_verification(tmp_path):
+    cert_path, key_path = _create_certificate(tmp_path, 3)
+    server_ssl = _server_ssl(cert_path, key_path)
+    results = _probe(TlsProbe, {"verify": False}, ["127.0.0.1:{port}"], server_ssl)
+    assert results[0].error_class == "expiring"
+    results = _probe(TlsProbe, {"verify": False, "expiry_min": "1d"}, ["127.0.0.1:{port}"], server_ssl)
+    assert results[0].ok
+
+
+def test_certificate_not_after(tmp_path):
+    cert_path, _ = _create_certificate(tmp_path, 10)
+    with open(cert_path, "r", encoding="utf-8") as cert_io:
+        certificate = ssl.PEM_cert_to_DER_cert(cert_io.read())
+    assert abs(certificate_not_after(certificate) - (time.time() + 10 * 86400)) < 600
+    with pytest.raises(ValueError):
+        certificate_not_after(certificate[:100])
+
+
+def test_dns():
+    results = _probe(DnsProbe, {}, ["localhost", "invalid.invalid"])
+    assert [(result.ok, result.error_class) for result in results] == [(True, None), (False, "resolve")]
+
+
+def test_resolver_per_event_loop():
+    async def _get_resolvers():
+        probes = [TcpProbe({}, lambda _: None), DnsProbe({}, lambda _: None)]
+        for probe in probes:
+            await probe.start([])
+        resolvers = [probe._resolver for probe in probes]
+        for probe in probes:
+            await probe.close()
+        return resolvers, net_probes.get_resolver()
+
+    (first, second), after_close = asyncio.run(_get_resolvers())
+    assert first is second
+    assert after_close is not first
+    assert asyncio.run(_get_resolvers())[0][0] is not first
@@ -0,0 +1,69 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import threading
+import time
+
+from simple_status_server.scheduler import Scheduler
+from simple_status_server.status import Status, push_new_status
+
+
+def _wait(condition, timeout: float = 10.0) -> bool:
+    time_end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > time_end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_watched_path_is_checked_once_per_bar(tmp_path):
+    target = tmp_path / "target"
+    status = Status("a", {"type": "path", "target": str(target), "interval": "1s", "checks_per_bar": 10})
+    pushes = []
+    lock = threading.Lock()
+
+    def _push(status: Status, status_value: bool, latency: float | None = None, weight: int = 1) -> None:
+        push_new_status(status, status_value, latency=latency, weight=weight)
+        with lock:
+            pushes.append((status_value, weight, time.monotonic()))
+
+    scheduler = Scheduler([status], lambda _: None, {"startup_spread": "0s"}, push_callback=_push)
+    scheduler.start()
+    try:
+        assert _wait(lambda: len(pushes) == 1)
+
+        # Not checked again every interval
+        time.sleep(3.5)
+        assert len(pushes) == 1
+
+        # Checked as soon as target is created. Elapsed intervals keep the previous state
+        target.touch()
+        assert _wait(lambda: len(pushes) == 3)
+        assert pushes[1][0] is False and pushes[1][1] >= 2
+        assert pushes[2][:2] == (True, 1)
+        assert pushes[2][2] - pushes[0][2] < 6
+
+        os.remove(target)
+        assert _wait(lambda: len(pushes) == 4)
+        assert pushes[3][0] is False
+    finally:
+        scheduler.stop()
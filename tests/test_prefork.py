@@ -0,0 +1,90 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import os
+import signal
+import time
+
+from simple_status_server import prefork
+from simple_status_server.metrics import Metrics
+from simple_status_server.prefork import start_supervisor, stop_workers
+from simple_status_server.shared_snapshot import SnapshotPublisher, SnapshotReader, SnapshotWriter
+
+
+def _wait(condition, timeout: float = 10.0) -> bool:
+    time_end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > time_end:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_supervisor_replaces_exited_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(prefork, "WAIT_INTERVAL", 0.1)
+    pids_dir = tmp_path / "pids"
+    pids_dir.mkdir()
+
+    def _worker(worker_index: int) -> None:
+        (pids_dir / str(os.getpid())).touch()
+        while True:
+            time.sleep(1)
+
+    def _pids() -> list[int]:
+        return [int(file.name) for file in pids_dir.iterdir()]
+
+    supervisor_pid = start_supervisor(2, _worker)
+    try:
+        assert _wait(lambda: len(_pids()) == 2)
+        killed = _pids()[0]
+        os.kill(killed, signal.SIGKILL)
+        assert _wait(lambda: len(_pids()) == 3)
+        workers = [pid for pid in _pids() if pid != killed]
+        assert all(_is_running(pid) for pid in workers)
+    finally:
+        stop_workers([supervisor_pid])
+
+    # Workers are stopped together with supervisor
+    assert _wait(lambda: not any(_is_running(pid) for pid in workers))
+
+
+def test_shared_metrics():
+    metrics = Metrics()
+    metrics.observe_check("a", "constant", 0.1, 0.0, True, None)
+    writer = SnapshotWriter()
+    try:
+        reader = SnapshotReader(writer.path)
+        SnapshotPublisher(metrics, writer).publish()
+        reader.wait()
+        worker_metrics = Metrics(lambda: reader.get()[1]["identity"].decode("utf-8"), (("worker", "1"),))
+        worker_metrics.observe_request("_data", "POST", 0.01)
+        rendered = worker_metrics.render()
+        assert 'simple_status_server_request_seconds_count{worker="1",endpoint="_data",method="POST"} 1' in rendered
+        assert 'simple_status_server_checks_total{status="a",result="true"} 1' in rendered
+    finally:
+        writer.close()
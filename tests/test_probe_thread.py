@@ -0,0 +1,88 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_status_server.probe import Probe, ProbeResult, ProbeThread, register_probe
+from simple_status_server.status import Status
+from simple_status_server.status_worker import StatusWorker
+
+
+class _SlowProbe(Probe):
+    concurrency = 2
+    running = 0
+    running_max = 0
+    checks = 0
+
+    async def probe(self, status: Status) -> ProbeResult:
+        cls = type(self)
+        cls.checks += 1
+        cls.running += 1
+        cls.running_max = max(cls.running_max, cls.running)
+        try:
+            await asyncio.sleep(0.05)
+        finally:
+            cls.running -= 1
+        return ProbeResult(bool(status.target))
+
+
+register_probe("slow", _SlowProbe)
+
+
+def _run_checks(statuses: list[Status], config: dict) -> int:
+    _SlowProbe.running_max = 0
+    probe_thread = ProbeThread(statuses, config)
+    probe_thread.start()
+    try:
+        with ThreadPoolExecutor(len(statuses)) as executor:
+            assert all(result.ok for result in executor.map(probe_thread.check, statuses))
+    finally:
+        probe_thread.stop()
+    return _SlowProbe.running_max
+
+
+def test_concurrency_limits():
+    statuses = [Status(str(i), {"type": "slow", "target": True}) for i in range(8)]
+    assert _run_checks(statuses, {}) == 2
+    assert _run_checks(statuses, {"type_limits": {"SLOW": 3}}) == 3
+    assert _run_checks(statuses, {"type_limits": {"slow": 8}, "max_concurrent": 1}) == 1
+
+
+def test_worker_retries():
+    status = Status("a", {"type": "slow", "target": False, "interval": "1s", "retries": 1, "retry_interval": "1s"})
+    pushes = []
+    _SlowProbe.checks = 0
+    probe_thread = ProbeThread([status], {})
+    probe_thread.start()
+    worker = StatusWorker(
+        status, lambda _: None, probe_thread, push_callback=lambda *args, **kwargs: pushes.append(kwargs)
+    )
+    worker.start()
+    try:
+        time_end = time.monotonic() + 10
+        while not pushes and time.monotonic() < time_end:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+        probe_thread.stop()
+    assert pushes and pushes[0]["weight"] == 1
+    assert _SlowProbe.checks == 2
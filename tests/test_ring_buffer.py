@@ -0,0 +1,124 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import random
+from collections import deque
+
+import pytest
+
+from simple_status_server.ring_buffer import RingBuffer
+from simple_status_server.status import Status
+
+
+class _ListStatus:
+    """List-based status history (how Status stored it before ring buffers)"""
+
+    def __init__(self, checks_per_bar: int, bars_max: int) -> None:
+        self.checks_per_bar = checks_per_bar
+        self.bars_max = bars_max
+        self.status_values: list[bool] = []
+        self.bar_data: list[bool] = []
+        self.bar_start: int | None = None
+        self.bar_end: int | None = None
+        self.timestamps: list[tuple[int, int]] = []
+        self.data: list[int] = []
+
+    def push_new_status(self, status_value: bool, timestamp: int) -> None:
+        if len(self.bar_data) >= self.checks_per_bar:
+            self.timestamps.append((self.bar_start, self.bar_end))  # type: ignore
+            self.data.append(int(self.bar_data.count(True) / len(self.bar_data) * 100.0))
+            self.bar_data.clear()
+            self.bar_start = None
+        self.status_values.append(status_value)
+        self.bar_data.append(status_value)
+        if not self.bar_start:
+            self.bar_start = timestamp
+        self.bar_end = timestamp
+        while len(self.status_values) > self.checks_per_bar:
+            self.status_values.pop(0)
+        while len(self.data) > self.bars_max:
+            self.data.pop(0)
+        while len(self.timestamps) > self.bars_max:
+            self.timestamps.pop(0)
+
+    def get_data_dict(self) -> dict:
+        working = self.status_values.count(True)
+        if working == len(self.status_values):
+            status = 2
+        elif working == 0:
+            status = 0
+        else:
+            status = 1
+        timestamps = self.timestamps + [(self.bar_start, self.bar_end)] if self.bar_data else self.timestamps
+        data = self.data + [int(self.bar_data.count(True) / len(self.bar_data) * 100.0)] if self.bar_data else self.data
+        return {"status": status, "timestamps": timestamps, "data": data}
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_status_matches_list_based(seed):
+    rng = random.Random(seed)
+    checks_per_bar = rng.randint(1, 15)
+    bars_max = rng.randint(1, 10)
+    status = Status("a", {"type": "constant", "target": True, "checks_per_bar": checks_per_bar, "bars_max": bars_max})
+    reference = _ListStatus(checks_per_bar, bars_max)
+
+    timestamp = 1000
+    probability = rng.random()
+    for _ in range(rng.randint(1, checks_per_bar * bars_max * 3)):
+        timestamp += rng.randint(1, 100)
+        value = rng.random() < probability
+        status.push_new_status(value, timestamp)
+        reference.push_new_status(value, timestamp)
+
+        data_dict = status.get_data_dict()
+        assert {key: data_dict[key] for key in ("status", "timestamps", "data")} == reference.get_data_dict()
+        assert list(status.status_values) == reference.status_values
+        assert list(status.current_bar.data) == reference.bar_data
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_matches_deque(seed):
+    rng = random.Random(seed)
+    capacity = rng.randint(1, 20)
+    buffer = RingBuffer(capacity, "B", cast=bool)
+    reference: deque[bool] = deque(maxlen=capacity)
+    for _ in range(200):
+        if rng.random() < 0.05:
+            values = [rng.random() < 0.5 for _ in range(rng.randint(0, 30))]
+            buffer.replace(values)
+            reference = deque(values, maxlen=capacity)
+        else:
+            value = rng.random() < 0.5
+            buffer.append(value)
+            reference.append(value)
+        assert buffer.to_list() == list(reference)
+        assert buffer.sum == sum(reference)
+        assert len(buffer) == len(reference)
+        if reference:
+            assert buffer[-1] == reference[-1]
+            assert buffer[0] == reference[0]
+
+
+def test_index_out_of_range():
+    buffer = RingBuffer(3, values=[1, 2])
+    with pytest.raises(IndexError):
+        buffer[2]
+    with pytest.raises(IndexError):
+        buffer[-3]
@@ -0,0 +1,77 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import time
+
+from simple_status_server.database import Database
+from simple_status_server.save_scheduler import SaveScheduler
+from simple_status_server.status import Status
+
+
+class _Database(Database):
+    def __init__(self, fail: int = 0) -> None:
+        super().__init__([], "")
+        self.fail = fail
+        self.saves = 0
+
+    def save(self) -> None:
+        if self.fail > 0:
+            self.fail -= 1
+            raise OSError("No space left on device")
+        self.saves += 1
+
+
+STATUS = Status("a", {"type": "constant", "target": True})
+
+
+def test_coalesce():
+    database = _Database()
+    save_scheduler = SaveScheduler(database, {"flush_interval": "10m", "flush_changes": 100})
+    for _ in range(10):
+        save_scheduler.mark_dirty(STATUS)
+    assert save_scheduler.flush()
+    assert save_scheduler.flush()
+    assert database.saves == 1
+    assert save_scheduler.get_stats()["last_flush_changes"] == 10
+
+
+def test_failed_save_keeps_changes():
+    database = _Database(fail=1)
+    save_scheduler = SaveScheduler(database, {"flush_interval": "10m"})
+    for _ in range(3):
+        save_scheduler.mark_dirty(STATUS)
+    assert not save_scheduler.flush()
+    assert database.saves == 0
+    save_scheduler.stop()
+    assert database.saves == 1
+    assert save_scheduler.get_stats()["changes_flushed"] == 3
+
+
+def test_retry_after_flush_interval():
+    database = _Database(fail=1)
+    save_scheduler = SaveScheduler(database, {"flush_interval": "1s", "flush_changes": 1})
+    save_scheduler.start()
+    save_scheduler.mark_dirty(STATUS)
+    time_end = time.monotonic() + 5
+    while database.saves == 0 and time.monotonic() < time_end:
+        time.sleep(0.01)
+    save_scheduler.stop()
+    assert database.saves == 1
+    assert database.fail == 0
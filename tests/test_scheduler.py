@@ -0,0 +1,90 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import threading
+import time
+
+from simple_status_server.scheduler import Scheduler
+from simple_status_server.status import Status, link_dependencies, push_new_status
+
+
+def _wait(condition, timeout: float = 10.0) -> bool:
+    time_end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > time_end:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_dependency_failure():
+    host = Status("host", {"type": "constant", "target": True, "interval": "1s"})
+    site = Status("site", {"type": "constant", "target": True, "interval": "1s", "depends_on": "host"})
+    link_dependencies([host, site])
+    pushes: dict[str, list[tuple[bool, int]]] = {"host": [], "site": []}
+    states: list[str | None] = []
+    lock = threading.Lock()
+
+    def _push(status: Status, status_value: bool, latency: float | None = None, weight: int = 1) -> None:
+        push_new_status(status, status_value, latency=latency, weight=weight)
+        with lock:
+            pushes[status.id].append((status_value, weight))
+
+    def _state(status: Status) -> None:
+        with lock:
+            states.append(status.dependency_failed)
+
+    scheduler = Scheduler(
+        [host, site], lambda _: None, {"startup_spread": "0s"}, state_callback=_state, push_callback=_push
+    )
+    scheduler.start()
+    try:
+        assert _wait(lambda: pushes["site"])
+
+        # Site is not checked while host is down
+        host.target = False
+        assert _wait(lambda: states == ["host"])
+        site_pushes = len(pushes["site"])
+        time.sleep(3.5)
+        assert len(pushes["site"]) == site_pushes
+
+        # Time site wasn't checked is not counted into weight of its first result after recovery
+        host.target = True
+        assert _wait(lambda: len(pushes["site"]) > site_pushes)
+        assert pushes["site"][site_pushes] == (True, 1)
+        assert states == ["host", None]
+        assert site.dependency_failed is None
+    finally:
+        scheduler.stop()
+
+
+def test_push_clears_dependency_state():
+    status = Status("site", {"type": "constant", "target": True, "interval": "1s"})
+    status.dependency_failed = "host"
+    states: list[str | None] = []
+    scheduler = Scheduler(
+        [status], lambda _: None, {"startup_spread": "0s"}, state_callback=lambda s: states.append(s.dependency_failed)
+    )
+    scheduler.start()
+    try:
+        assert _wait(lambda: states == [None])
+        assert status.dependency_failed is None
+    finally:
+        scheduler.stop()
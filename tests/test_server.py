@@ -0,0 +1,127 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import copy
+import gzip
+
+import pytest
+
+from simple_status_server.page_renderer import PageRenderer
+from simple_status_server.server import Server
+
+API_DATA = {
+    "a": {"status": 2, "timestamps": [[100, 200], [201, 300]], "data": [100, 50]},
+    "b": {"status": 0, "timestamps": [[100, 200]], "data": [0]},
+}
+
+
+@pytest.fixture
+def client():
+    return Server([], None, "Title", None, "Last check:", "Greens", None, API_DATA)._app.test_client()
+
+
+def test_data(client):
+    response = client.post("/", json={})
+    assert response.status_code == 200
+    assert response.json == API_DATA
+    assert client.post("/", json={}, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_ids(client):
+    assert client.post("/", json={"ids": ["b", "unknown"]}).json == {"b": API_DATA["b"]}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"ids": "a"},
+        {"ids": [{"id": "a"}]},
+        {"ids": ["a", 1]},
+        {"since": "yesterday"},
+        {"since": True},
+        {"since": float("nan")},
+        {"since": float("inf")},
+        {"since": float("-inf")},
+    ],
+)
+def test_wrong_request(client, body):
+    assert client.post("/", json=body).status_code == 400
+
+
+def test_since(client):
+    assert client.post("/", json={"since": 250}).status_code == 200
+    assert client.post("/", json={"since": 250.5}).status_code == 200
+
+
+@pytest.fixture
+def api_data():
+    return copy.deepcopy(API_DATA)
+
+
+@pytest.fixture
+def rendered(api_data):
+    return Server(
+        [],
+        None,
+        "Title",
+        None,
+        "Last check:",
+        "Greens",
+        None,
+        api_data,
+        page_renderer=PageRenderer("Title", None, "Last check:", "Greens", None),
+    )
+
+
+def test_rendered_page(rendered):
+    response = rendered._app.test_client().get("/")
+    assert response.status_code == 200
+    assert response.mimetype == "text/html"
+    page = response.get_data(as_text=True)
+    assert "<title>Title</title>" in page
+    assert 'id="a-title">a</h2>' in page and 'id="b-title">b</h2>' in page
+    assert page.count("<svg") == 2
+
+
+def test_rendered_page_etag(rendered, api_data):
+    client = rendered._app.test_client()
+    response = client.get("/")
+    etag = response.headers["ETag"]
+    not_modified = client.get("/", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not not_modified.data
+
+    # Page is rendered again after data change
+    api_data["b"]["status"] = 2
+    rendered.data_updated()
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_rendered_page_gzip(rendered):
+    client = rendered._app.test_client()
+    identity = client.get("/")
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == identity.headers["ETag"]
+    assert gzip.decompress(response.data) == identity.data
@@ -0,0 +1,130 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import os
+import stat
+
+import pytest
+
+from simple_status_server.service_collector import ServiceCollector, ServiceProbe
+from simple_status_server.status import Status
+
+# Emulates "systemctl show --property=ActiveState -- units" and "systemctl is-active --quiet unit".
+# States are read from "units" file next to the script, each call is appended into "calls" file
+FAKE_SYSTEMCTL = """#!/bin/sh
+dir="$(dirname "$0")"
+echo "$*" >> "$dir/calls"
+state_of() {
+    awk -v unit="$1" '$1 == unit { print $2 }' "$dir/units"
+}
+if [ "$1" = "show" ]; then
+    [ -e "$dir/broken" ] && exit 1
+    shift 3
+    first=1
+    for unit in "$@"; do
+        [ $first = 1 ] || echo
+        first=0
+        state="$(state_of "$unit")"
+        echo "ActiveState=${state:-inactive}"
+    done
+    exit 0
+fi
+if [ "$1" = "is-active" ]; then
+    [ "$(state_of "$3")" = "active" ]
+    exit $?
+fi
+exit 1
+"""
+
+UNITS = {"a.service": "active", "b.service": "failed", "c.service": "activating", "d.service": "active"}
+
+
+@pytest.fixture
+def systemctl(tmp_path, monkeypatch):
+    """Puts fake systemctl on PATH and returns its directory"""
+    script_path = tmp_path / "systemctl"
+    script_path.write_text(FAKE_SYSTEMCTL)
+    script_path.chmod(script_path.stat().st_mode | stat.S_IXUSR)
+    (tmp_path / "units").write_text("".join(f"{unit} {state}\n" for unit, state in UNITS.items()))
+    (tmp_path / "calls").write_text("")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
+    return tmp_path
+
+
+def _calls(systemctl) -> list[str]:
+    return (systemctl / "calls").read_text().splitlines()
+
+
+def _collector(**config) -> ServiceCollector:
+    return ServiceCollector({"systemctl_path": "systemctl", **config})
+
+
+def test_check_many(systemctl):
+    units = ["a.service", "b.service", "c.service", "unknown.service", "d.service"]
+    assert asyncio.run(_collector().check_many(units, 5.0)) == [True, False, False, False, True]
+    assert _calls(systemctl) == ["show --property=ActiveState -- " + " ".join(units)]
+
+
+def test_checks_within_batch_window(systemctl):
+    async def _run():
+        collector = _collector(batch_window=0.2)
+        return await asyncio.gather(
+            *[collector.check(unit, 5.0) for unit in ("a.service", "unknown.service", "a.service")]
+        )
+
+    assert asyncio.run(_run()) == [True, False, True]
+    assert _calls(systemctl) == ["show --property=ActiveState -- a.service unknown.service"]
+
+
+def test_max_batch(systemctl):
+    units = list(UNITS.keys()) + ["unknown.service"]
+    assert asyncio.run(_collector(max_batch=2).check_many(units, 5.0)) == [True, False, False, True, False]
+    assert len(_calls(systemctl)) == 3
+
+
+def test_fallback_to_is_active(systemctl):
+    (systemctl / "broken").write_text("")
+    assert asyncio.run(_collector().check_many(["a.service", "b.service", "unknown.service"], 5.0)) == [
+        True,
+        False,
+        False,
+    ]
+    calls = _calls(systemctl)
+    assert calls[0].startswith("show ")
+    assert sorted(calls[1:]) == [f"is-active --quiet {unit}" for unit in ("a.service", "b.service", "unknown.service")]
+
+
+def test_no_batch(systemctl):
+    assert asyncio.run(_collector(batch=False).check_many(["a.service", "unknown.service"], 5.0)) == [True, False]
+    assert sorted(_calls(systemctl)) == ["is-active --quiet a.service", "is-active --quiet unknown.service"]
+
+
+def test_missing_systemctl(tmp_path):
+    collector = ServiceCollector({"systemctl_path": str(tmp_path / "systemctl")})
+    assert asyncio.run(collector.check_many(["a.service"], 5.0)) == [False]
+
+
+def test_probe_batch(systemctl):
+    statuses = [Status(unit, {"type": "service", "target": unit}) for unit in ("a.service", "unknown.service")]
+    probe = ServiceProbe({"systemctl_path": "systemctl"}, lambda status: None)
+    results = asyncio.run(probe.probe_batch(statuses))
+    assert [(result.ok, result.error_class) for result in results] == [(True, None), (False, "inactive")]
+    assert len(_calls(systemctl)) == 1
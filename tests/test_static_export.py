@@ -0,0 +1,73 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import gzip
+import os
+
+from simple_status_server import response_cache, static_export
+from simple_status_server.page_renderer import PageRenderer
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.static_export import StaticExporter
+from simple_status_server.status import Status
+
+
+def _list_files(directory) -> set[str]:
+    return {
+        os.path.relpath(os.path.join(root, file_name), directory)
+        for root, _, file_names in os.walk(directory)
+        for file_name in file_names
+    }
+
+
+def test_gzip_is_reproducible(monkeypatch):
+    monkeypatch.setattr(gzip.time, "time", lambda: 1000.0)
+    _, variants = response_cache.build_variants(b"{}")
+    monkeypatch.setattr(gzip.time, "time", lambda: 2000.0)
+    assert response_cache.build_variants(b"{}")[1]["gzip"] == variants["gzip"]
+
+
+def test_export(tmp_path, monkeypatch):
+    api_data = {
+        status_id: Status(status_id, {"type": "constant", "target": True}).get_data_dict() for status_id in ("a", "b")
+    }
+    cache = ResponseCache(api_data)
+    renderer = PageRenderer("Status", None, "Last check:", "RdPu_r", None)
+    exporter = StaticExporter(cache, renderer, {"output_dir": str(tmp_path), "precompress": True})
+    exporter.export()
+    assert {"index.html", "index.html.gz", "data.json", "data.json.gz", "statuses/a.json", "statuses/b.json"} <= (
+        _list_files(tmp_path)
+    )
+    assert all(not file_name.startswith(("static", ".")) for file_name in _list_files(tmp_path))
+
+    # Only changed files are replaced, temporary files are hidden
+    replaced = []
+    replace = os.replace
+
+    def _replace(source: str, destination: str) -> None:
+        replaced.append((os.path.basename(source), os.path.relpath(destination, tmp_path)))
+        replace(source, destination)
+
+    monkeypatch.setattr(static_export.os, "replace", _replace)
+    api_data["a"]["label"] = "A"
+    cache.invalidate()
+    exporter.export()
+    assert "statuses/a.json" in [destination for _, destination in replaced]
+    assert "statuses/b.json" not in [destination for _, destination in replaced]
+    assert all(source.startswith(".") and source.endswith(".tmp") for source, _ in replaced)
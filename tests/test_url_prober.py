@@ -0,0 +1,214 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from simple_status_server import url_prober
+from simple_status_server.url_prober import UrlProber
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1  # type: ignore
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._respond(True)
+
+    def do_HEAD(self) -> None:
+        self._respond(False)
+
+    def _respond(self, with_body: bool) -> None:
+        self.server.methods.append(self.command)  # type: ignore
+        if self.path == "/ok":
+            self._send(200, b"ok", with_body)
+        elif self.path == "/empty":
+            self._send(200, b"", with_body)
+        elif self.path == "/missing":
+            self._send(404, b"not found", with_body)
+        elif self.path == "/range":
+            if self.headers.get("Range") == "bytes=0-0":
+                self._send(206, b"r", with_body, {"Content-Range": "bytes 0-0/1000"})
+            else:
+                self._send(200, b"r" * 1000, with_body)
+        elif self.path == "/close":
+            self._send(200, b"ok", with_body, {"Connection": "close"})
+            self.close_connection = True
+        elif self.path == "/drop":
+            # Keep-alive response, but connection is closed right after it
+            self._send(200, b"ok", with_body)
+            self.close_connection = True
+        elif self.path in ("/chunked", "/chunked-empty"):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            if with_body:
+                if self.path == "/chunked":
+                    self.wfile.write(b"3;ext=1\r\nabc\r\n2\r\nde\r\n")
+                self.wfile.write(b"0\r\nX-Trailer: 1\r\n\r\n")
+        elif self.path == "/redirect":
+            self._send(302, b"", with_body, {"Location": "/ok"})
+        elif self.path == "/redirect-relative":
+            self._send(301, b"", with_body, {"Location": "redirect"})
+        elif self.path == "/redirect-loop":
+            self._send(302, b"", with_body, {"Location": "/redirect-loop"})
+        elif self.path == "/redirect-no-location":
+            self._send(302, b"moved", with_body)
+        elif self.path == "/slow":
+            time.sleep(1)
+            self._send(200, b"ok", with_body)
+        else:
+            self._send(404, b"", with_body)
+
+    def _send(self, code: int, body: bytes, with_body: bool, headers: dict[str, str] | None = None) -> None:
+        self.send_response(code)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """Local HTTP/1.1 stand-in server. Counts accepted connections and received methods"""
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    http_server.daemon_threads = True
+    http_server.connections = 0  # type: ignore
+    http_server.methods = []  # type: ignore
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def _url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def _probe_all(server, paths: list[str], method: str = "get", timeout: float = 5.0, config: dict | None = None):
+    """Probes paths one by one with the same prober and returns results"""
+
+    async def _run():
+        prober = UrlProber(config)
+        try:
+            return [await prober.probe(_url(server, path), timeout, method) for path in paths]
+        finally:
+            await prober.close()
+
+    return asyncio.run(_run())
+
+
+def test_get(server):
+    assert _probe_all(server, ["/ok", "/empty", "/missing"]) == [
+        (True, None),
+        (False, "http_status"),
+        (False, "http_status"),
+    ]
+
+
+def test_keep_alive_reuse(server):
+    assert _probe_all(server, ["/ok", "/ok", "/chunked", "/ok"]) == [(True, None)] * 4
+    assert server.connections == 1
+
+
+def test_connection_close(server):
+    assert _probe_all(server, ["/close", "/close"]) == [(True, None)] * 2
+    assert server.connections == 2
+
+
+def test_pooled_connection_closed_by_server(server):
+    assert _probe_all(server, ["/drop", "/ok"]) == [(True, None)] * 2
+    assert server.connections == 2
+
+
+def test_head(server):
+    assert _probe_all(server, ["/ok", "/empty", "/missing"], "head") == [
+        (True, None),
+        (True, None),
+        (False, "http_status"),
+    ]
+    assert server.methods == ["HEAD"] * 3
+    assert server.connections == 1
+
+
+def test_range(server):
+    assert _probe_all(server, ["/range", "/ok"], "range") == [(True, None)] * 2
+    assert _probe_all(server, ["/range"]) == [(True, None)]
+
+
+def test_body_over_drain_limit_is_not_reused(server):
+    assert _probe_all(server, ["/range", "/range"], config={"drain_limit": 10}) == [(True, None)] * 2
+    assert server.connections == 2
+
+
+def test_chunked(server):
+    assert _probe_all(server, ["/chunked", "/chunked-empty", "/chunked"]) == [
+        (True, None),
+        (False, "http_status"),
+        (True, None),
+    ]
+    assert server.connections == 1
+
+
+def test_redirects(server):
+    assert _probe_all(server, ["/redirect", "/redirect-relative"]) == [(True, None)] * 2
+    assert _probe_all(server, ["/redirect-loop"], config={"max_redirects": 3}) == [(False, "redirects")]
+
+
+def test_redirect_without_location(server):
+    assert _probe_all(server, ["/redirect-no-location"]) == [(False, "http_status")]
+
+
+def test_timeout_closes_connection(server, monkeypatch):
+    closed = []
+    close = url_prober._Connection.close
+
+    def _close(connection) -> None:
+        closed.append(connection)
+        close(connection)
+
+    monkeypatch.setattr(url_prober._Connection, "close", _close)
+    assert _probe_all(server, ["/slow"], timeout=0.2) == [(False, "timeout")]
+    assert len(closed) == 1
+
+
+def test_connection_refused(server):
+    port = server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    result = asyncio.run(UrlProber().probe(f"http://127.0.0.1:{port}/ok", 5.0))
+    assert result == (False, "connection")
+
+
+def test_wrong_scheme():
+    assert asyncio.run(UrlProber().probe("ftp://127.0.0.1/", 5.0)) == (False, "protocol")
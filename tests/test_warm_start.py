@@ -0,0 +1,74 @@
+"""
+Copyright (C) 2025 Fern Lane, simple-status-server
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+See the License for the specific language governing permissions and
+limitations under the License.
+
+IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY CLAIM, DAMAGES OR
+OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,
+ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+OTHER DEALINGS IN THE SOFTWARE.
+"""
+
+import json
+
+from simple_status_server.response_cache import ResponseCache
+from simple_status_server.status import Status
+from simple_status_server.warm_start import get_snapshot_path, load_snapshot, save_snapshot
+
+
+def _statuses(*status_ids: str) -> list[Status]:
+    return [
+        Status(status_id, {"type": "constant", "target": True, "interval": "1s", "checks_per_bar": 2})
+        for status_id in status_ids
+    ]
+
+
+def _save(snapshot_path: str, statuses: list[Status]) -> dict:
+    for status in statuses:
+        for i in range(5):
+            status.push_new_status(i % 2 == 0, 1000 + i, 0.01 * i)
+    api_data = {status.id: status.get_data_dict() for status in statuses}
+    save_snapshot(snapshot_path, ResponseCache(api_data))
+    return json.loads(json.dumps(api_data))
+
+
+def test_round_trip(tmp_path):
+    snapshot_path = get_snapshot_path(str(tmp_path / "database.json"))
+    api_data = _save(snapshot_path, _statuses("a", "b"))
+    assert load_snapshot(snapshot_path, _statuses("a", "b")) == api_data
+
+
+def test_missing(tmp_path):
+    statuses = _statuses("a", "b")
+    api_data = load_snapshot(str(tmp_path / "missing.snapshot"), statuses)
+    assert api_data == {status.id: status.get_data_dict() for status in statuses}
+
+
+def test_corrupted(tmp_path):
+    snapshot_path = str(tmp_path / "database.json.snapshot")
+    _save(snapshot_path, _statuses("a"))
+    with open(snapshot_path, "rb") as snapshot_io:
+        snapshot = snapshot_io.read()
+    statuses = _statuses("a")
+    for corrupted in (snapshot[: len(snapshot) // 2], b"\x00\xff" + snapshot, b"[]", b""):
+        with open(snapshot_path, "wb") as snapshot_io:
+            snapshot_io.write(corrupted)
+        assert load_snapshot(snapshot_path, statuses) == {"a": statuses[0].get_data_dict()}
+
+
+def test_not_configured_dropped(tmp_path):
+    snapshot_path = str(tmp_path / "database.json.snapshot")
+    api_data = _save(snapshot_path, _statuses("a", "removed"))
+    loaded = load_snapshot(snapshot_path, _statuses("a", "new"))
+    assert list(loaded) == ["a", "new"]
+    assert loaded["a"] == api_data["a"]
+    assert loaded["new"]["data"] == []